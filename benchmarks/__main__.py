@@ -0,0 +1,61 @@
+import argparse
+import json
+import platform
+import subprocess
+import time
+from benchmarks.suite import run_suite
+
+def current_commit():
+    """
+    Returns the git commit of the working tree, or None outside a git checkout.
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+def flatten(results, prefix=""):
+    """
+    Flattens nested benchmark results into {'benchmark.case.metric': value}.
+    """
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+def compare(results, baseline):
+    """
+    Prints each throughput metric next to the same metric from an earlier run.
+    """
+    old = flatten(baseline["results"])
+    print(f"Compared with {baseline.get('commit') or 'baseline'}:")
+    for name, value in flatten(results).items():
+        if name.endswith("_per_second") and old.get(name):
+            print(f"  {name}: {value:,.0f} vs {old[name]:,.0f} ({value / old[name]:.2f}x)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pronto Woven Monopoly benchmarks")
+    parser.add_argument("--quick", action="store_true", help="Use small sizes, to check the benchmarks run")
+    parser.add_argument("--only", nargs="+", default=None,
+                        help="Only run these benchmarks (play_turn, rent, board_load, compact_board_load, records, full_games)")
+    parser.add_argument("--output", type=str, default="benchmark.json", help="Path of the JSON results file")
+    parser.add_argument("--compare", type=str, default=None, help="Path of an earlier JSON results file to compare with")
+    args = parser.parse_args()
+
+    results = run_suite(quick=args.quick, only=args.only)
+    report = {
+        "commit": current_commit(),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "quick": args.quick,
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    for name, value in flatten(results).items():
+        print(f"{name}: {value:,.6g}" if isinstance(value, (int, float)) else f"{name}: {value}")
+    print(f"Results saved at {args.output}")
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file))
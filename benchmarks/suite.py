@@ -0,0 +1,220 @@
+from array import array
+import json
+import math
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from actions import Actions
+from batch import BatchRunner
+from board import Board
+from dice import RandomDice, random_roll_sequences
+from game import Game
+from loader import Loader
+from records import NullRecordSink, TextRecordSink
+from turnlog import BinaryRecordSink
+
+PLAYERS = ["Peter", "Billy", "Charlotte", "Sweedal"]
+BOARD_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "board", "board.json")
+
+def make_board_data(squares, colour_size=3, seed=0):
+    """
+    Generates a board layout: GO followed by properties in colour sets of colour_size squares.
+
+    Args:
+        squares (int): The number of squares, including GO.
+        colour_size (int): The number of properties in each colour set.
+        seed (int): The seed used to pick the prices.
+
+    Returns:
+        list[dict]: The board data, in the format of board.json.
+    """
+    rng = random.Random(seed)
+    board_data = [{"name": "GO", "type": "go"}]
+    for i in range(1, squares):
+        colour = f"Colour {(i - 1) // colour_size}"
+        board_data.append({"name": f"Square {i}", "price": rng.randint(1, 6), "colour": colour, "type": "property"})
+    return board_data
+def percentiles(values, points=(50, 90, 99)):
+    """
+    Computes percentiles of a list of measurements (nearest rank).
+
+    Returns:
+        dict: The value at each percentile, keyed 'p50', 'p90', ...
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return {f"p{point}": None for point in points}
+    return {f"p{point}": ordered[max(0, math.ceil(len(ordered) * point / 100) - 1)] for point in points}
+def peak_memory(function):
+    """
+    Runs a function once under tracemalloc.
+
+    Returns:
+        int: The peak memory allocated while it ran, in bytes.
+    """
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+def timed(function):
+    """
+    Runs a function once.
+
+    Returns:
+        float: The time it took, in seconds.
+    """
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+def bench_play_turn(turns):
+    """
+    Game.play_turn on the shipped board, with and without turn records.
+    """
+    rolls = RandomDice(1, max_rolls=turns).to_list()
+    results = {}
+    for label, make_records in (("records", lambda: None), ("no_records", NullRecordSink)):
+        def run():
+            game = Game(BOARD_FILE, None, PLAYERS, dice=rolls, records=make_records())
+            players = game._players
+            for turn, steps in enumerate(rolls):
+                game._current_player = players[turn % len(players)]
+                game.play_turn(steps)
+        seconds = timed(run)
+        results[label] = {"turns": turns, "seconds": seconds, "turns_per_second": turns / seconds,
+                          "peak_memory_bytes": peak_memory(run)}
+    return results
+def bench_rent(board_sizes, calls):
+    """
+    Actions.rent with monopoly checks on generated boards of different sizes.
+    """
+    results = {}
+    for size in board_sizes:
+        board = Board(make_board_data(size))
+        owner, tenant = (Game(None, None, ["Owner", "Tenant"], board=board, dice=[])._players)
+        # The owner holds every property, so every rent payment is a monopoly check that succeeds
+        for i in range(1, size):
+            board.get_property(i).set_owner(owner)
+        squares = [board.get_property(1 + i % (size - 1)) for i in range(calls)]
+        actions = Actions()
+        def run():
+            for square in squares:
+                actions.rent(tenant, square, board)
+        seconds = timed(run)
+        results[str(size)] = {"calls": calls, "seconds": seconds, "calls_per_second": calls / seconds}
+    return results
+def bench_board_load(board_sizes, directory):
+    """
+    Loading generated board files, parsed from scratch and from the in-memory cache.
+    """
+    results = {}
+    for size in board_sizes:
+        path = os.path.join(directory, f"board_{size}.json")
+        with open(path, "w") as file:
+            json.dump(make_board_data(size), file)
+        loader = Loader()
+        cold = timed(lambda: loader.load_board(path))
+        warm = timed(lambda: loader.load_board(path))
+        results[str(size)] = {"cold_seconds": cold, "cached_seconds": warm,
+                              "peak_memory_bytes": peak_memory(lambda: Loader().load_board(path))}
+    return results
+def bench_compact_board_load(board_sizes, directory):
+    """
+    Loading compact board files of generated colour groups, and of binary price and group columns.
+    """
+    results = {}
+    for size in board_sizes:
+        prices = array("q", [1 + i % 6 for i in range(size - 1)])
+        groups = array("i", [i // 4 for i in range(size - 1)])
+        for name, column in (("prices", prices), ("groups", groups)):
+            with open(os.path.join(directory, f"{name}_{size}.bin"), "wb") as file:
+                column.tofile(file)
+        layouts = {
+            "generated": {"generate": size - 1, "group_size": 4, "price": [1, 2, 3, 4, 5, 6]},
+            "columns": {"columns": {"price": {"file": f"prices_{size}.bin", "dtype": "=i8"},
+                                    "group": {"file": f"groups_{size}.bin", "dtype": "=i4"}}},
+        }
+        for label, segment in layouts.items():
+            path = os.path.join(directory, f"compact_{label}_{size}.json")
+            with open(path, "w") as file:
+                json.dump({"segments": [{"name": "GO", "type": "go"}, segment]}, file)
+            results[f"{label}_{size}"] = {"cold_seconds": timed(lambda: Loader().load_board(path)),
+                                          "peak_memory_bytes": peak_memory(lambda: Loader().load_board(path))}
+    return results
+def bench_records(turns, directory):
+    """
+    Streaming turn records to disk as text and as a binary turn log.
+    """
+    game = Game(BOARD_FILE, None, PLAYERS, dice=[])
+    turn = {"player": "Peter", "roll": 3, "balance": 12, "position": "The Grand Tofu",
+            "seat": 0, "from": 0, "to": 3, "flags": 4, "amount": 2, "counterparty": -1}
+    results = {}
+    for label, sink in (("text", TextRecordSink(os.path.join(directory, "records.txt"))),
+                        ("binary", BinaryRecordSink(os.path.join(directory, "records.bin")))):
+        sink.begin(game._players, game._board)
+        def run():
+            for _ in range(turns):
+                sink.write(turn)
+            sink.close()
+        seconds = timed(run)
+        results[label] = {"turns": turns, "seconds": seconds, "turns_per_second": turns / seconds}
+    return results
+def bench_full_games(games, board_sizes):
+    """
+    Whole games with generated rolls, on the shipped board and on generated boards.
+    """
+    results = {}
+    boards = [("board.json", Game.get_board(BOARD_FILE))]
+    boards += [(str(size), Board(make_board_data(size))) for size in board_sizes]
+    for label, board in boards:
+        runner = BatchRunner(None, PLAYERS, board=board)
+        latencies = []
+        turns = 0
+        def run():
+            nonlocal turns
+            for _, dice in random_roll_sequences(1, games, on_exhausted="end", max_rolls=100000):
+                start = time.perf_counter()
+                turns += runner.run_game(dice)["turns"]
+                latencies.append(time.perf_counter() - start)
+        seconds = timed(run)
+        def play_batch():
+            for _, dice in random_roll_sequences(1, games, on_exhausted="end", max_rolls=100000):
+                runner.run_game(dice)
+        results[label] = {"games": games, "turns": turns, "seconds": seconds,
+                          "games_per_second": games / seconds, "turns_per_second": turns / seconds,
+                          "latency_seconds": percentiles(latencies), "peak_memory_bytes": peak_memory(play_batch)}
+    return results
+
+# Benchmark sizes: the full suite, and a quick run to check the suite itself works
+SIZES = {
+    "full": {"turns": 200000, "calls": 200000, "games": 2000, "boards": [1000, 10000, 100000], "game_boards": [1000, 10000],
+             "compact_boards": [100000, 1000000]},
+    "quick": {"turns": 2000, "calls": 2000, "games": 20, "boards": [1000], "game_boards": [1000], "compact_boards": [1000]},
+}
+
+def run_suite(quick=False, only=None):
+    """
+    Runs the benchmarks.
+
+    Args:
+        quick (bool): Use small sizes, to check the suite runs rather than to measure.
+        only (list[str], optional): The names of the benchmarks to run. Defaults to all of them.
+
+    Returns:
+        dict: The results of each benchmark, keyed by name.
+    """
+    sizes = SIZES["quick" if quick else "full"]
+    with tempfile.TemporaryDirectory() as directory:
+        benchmarks = {
+            "play_turn": lambda: bench_play_turn(sizes["turns"]),
+            "rent": lambda: bench_rent(sizes["boards"], sizes["calls"]),
+            "board_load": lambda: bench_board_load(sizes["boards"], directory),
+            "compact_board_load": lambda: bench_compact_board_load(sizes["compact_boards"], directory),
+            "records": lambda: bench_records(sizes["turns"], directory),
+            "full_games": lambda: bench_full_games(sizes["games"], sizes["game_boards"]),
+        }
+        return {name: benchmark() for name, benchmark in benchmarks.items() if not only or name in only}
@@ -1,47 +1,56 @@
+# Event codes recorded by the actions. They are bit flags so a turn's events can be combined.
+PASS_GO = 1
+RENT = 2
+BUY = 4
+
 class Actions:
     """
     This class defines the actions a player can take during their turn in the game,
     such as paying rent, buying properties, and passing GO.
+
+    The actions only report what happened as event codes (and events for the records); the
+    messages describing a turn are built from them by records.render_action when they are needed.
     """
-    def rent(self, player, landed_property, board):
+    def rent(self, player, landed_property, board, events=None):
         """
         Handles the rent payment when a player lands on a property that is owned by another player.
         
         Args:
             player (Player): The player who landed on the property and must pay rent.
             landed_property (Property): The property the player landed on.
-            board (Board): The game board, used to retrieve property sets and verify ownership.
+            board (Board): The game board, used to check whether the owner holds the whole colour set.
+            events (list, optional): If given, an event (RENT, rent, owner) is appended when rent is paid.
 
         Returns:
-            str: A message detailing the rent transaction, or an empty string if no rent is due.
+            int: RENT if rent was paid, or 0 if no rent is due.
         
         Notes:
             If the player lands on a property that is owned by another player, they must pay rent.
             If the owner has a complete set of properties (all properties of the same color), the rent is doubled.
         """
-        if landed_property.is_owned():  #check if the property is owned
-            rent = landed_property.get_rent()   # Get the standard rent for the property
-            owner = landed_property.get_owner() # Get the owner of the property
-            property_set = board.get_property_set(landed_property.get_colour()) # Get all properties of the same color
-            # Double the rent if the owner has all properties of the same color
-            if all(p.get_owner() == owner for p in property_set):
-                rent *= 2
+        # Look up the rent (doubled if the owner has all properties of the same color) in the board tables
+        tables = board.tables
+        rent, owner_id = tables.rent_due(landed_property.index)
+        if owner_id >= 0:  #check if the property is owned
+            owner = tables.owner_objects[owner_id]
              # Perform the transaction
             owner.receive(rent)
             player.pay(rent)
-            # Return a message detailing the transaction
-            return f"{player.name} pays ${rent} rent to {owner.name}."
-        return ""
-    def buy_property(self, player, landed_property):
+            if events is not None:
+                events.append((RENT, rent, owner))
+            return RENT
+        return 0
+    def buy_property(self, player, landed_property, events=None):
         """
         Handles the purchase of a property by a player if the property is not owned.
         
         Args:
             player (Player): The player who wants to buy the property.
             landed_property (Property): The property the player wants to purchase.
+            events (list, optional): If given, an event (BUY, price, None) is appended when the property is bought.
         
         Returns:
-            str: A message detailing the property purchase, or an empty string if the property is already owned.
+            int: BUY if the property was bought, or 0 if it is already owned.
         
         Notes:
             If the property is not owned by anyone, the player can buy it. After buying, the property’s ownership
@@ -50,10 +59,12 @@ class Actions:
         if not landed_property.is_owned():  # Check if the property is not owned
             player.buy_property(landed_property)     # Player buys the property
             landed_property.set_owner(player)   # Set the player's ownership of the property
-             # Return a message detailing the purchase
-            return f"{player.name} buys {landed_property.name} for ${landed_property.get_price()}."
-        return ""
-    def pass_go(self, player, steps, board_length):
+            price = landed_property.get_price()
+            if events is not None:
+                events.append((BUY, price, None))
+            return BUY
+        return 0
+    def pass_go(self, player, steps, board_length, events=None):
         """
         Handles the event when a player passes the 'GO' space on the board.
         
@@ -61,14 +72,17 @@ class Actions:
             player (Player): The player who may pass the 'GO' space.
             steps (int): The number of steps the player has moved (based on dice roll).
             board_length (int): The total number of spaces on the board.
+            events (list, optional): If given, an event (PASS_GO, 1, None) is appended when the player passes GO.
         
         Returns:
-            str: A message detailing the action of passing GO and earning $1, or an empty string if the player did not pass GO.
+            int: PASS_GO if the player passed GO and earned $1, or 0 if they did not.
         
         Notes:
             If the player moves beyond the 'GO' space, they earn $1.
         """
         if player.check_pass_go(steps, board_length):   # Check if the player has passed GO
             player.receive(1)   # Player earns $1 for passing GO
-            return f"{player.name} passes GO and earns $1!"
-        return ""
\ No newline at end of file
+            if events is not None:
+                events.append((PASS_GO, 1, None))
+            return PASS_GO
+        return 0
\ No newline at end of file
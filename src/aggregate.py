@@ -0,0 +1,351 @@
+import csv
+import json
+import math
+
+class RunningStats:
+    """
+    Count, mean, variance, minimum and maximum of a stream of numbers, updated one value at a
+    time (Welford's algorithm) without keeping the values. Two RunningStats can be merged, e.g.
+    the statistics of games played by different workers.
+    """
+    __slots__ = ("count", "mean", "_m2", "min", "max")
+    def __init__(self) -> None:
+        """
+        Initializes empty statistics.
+        """
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0     # sum of squared differences from the mean
+        self.min = None
+        self.max = None
+    def add(self, value):
+        """
+        Adds a value to the statistics.
+
+        Args:
+            value (int or float): The value.
+        """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+    def merge(self, other):
+        """
+        Adds the values summarised by other statistics (Chan et al.'s parallel algorithm).
+
+        Args:
+            other (RunningStats): The statistics to merge in.
+        """
+        if not other.count:
+            return
+        if not self.count:
+            self.count, self.mean, self._m2, self.min, self.max = other.count, other.mean, other._m2, other.min, other.max
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+    @property
+    def variance(self):
+        """
+        The sample variance, or 0.0 for fewer than two values.
+        """
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+    def to_dict(self):
+        """
+        Returns:
+            dict: The statistics, including the running sum of squares so they can be restored.
+        """
+        return {"count": self.count, "mean": self.mean, "variance": self.variance,
+                "stddev": math.sqrt(self.variance), "min": self.min, "max": self.max, "m2": self._m2}
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Restores statistics saved with to_dict.
+
+        Args:
+            data (dict): The saved statistics.
+
+        Returns:
+            RunningStats: The statistics.
+        """
+        stats = cls()
+        stats.count, stats.mean, stats._m2, stats.min, stats.max = data["count"], data["mean"], data["m2"], data["min"], data["max"]
+        return stats
+
+class Histogram:
+    """
+    Counts of values in fixed-width buckets, plus the values below the first bucket and above the
+    last one, so memory does not grow with the number of values.
+    """
+    __slots__ = ("low", "width", "counts", "underflow", "overflow")
+    def __init__(self, low, width, buckets) -> None:
+        """
+        Initializes empty buckets [low, low+width), [low+width, low+2*width), ...
+
+        Args:
+            low (int): The lowest value of the first bucket.
+            width (int): The width of each bucket.
+            buckets (int): The number of buckets.
+
+        Raises:
+            ValueError: If the width or the number of buckets is not positive.
+        """
+        if width <= 0 or buckets <= 0:
+            raise ValueError(f"Histogram of {buckets} buckets of width {width} is invalid.")
+        self.low = low
+        self.width = width
+        self.counts = [0] * buckets
+        self.underflow = 0
+        self.overflow = 0
+    def add(self, value):
+        """
+        Counts a value in its bucket.
+
+        Args:
+            value (int or float): The value.
+        """
+        bucket = (value - self.low) // self.width
+        if bucket < 0:
+            self.underflow += 1
+        elif bucket >= len(self.counts):
+            self.overflow += 1
+        else:
+            self.counts[int(bucket)] += 1
+    def merge(self, other):
+        """
+        Adds the counts of another histogram with the same buckets.
+
+        Args:
+            other (Histogram): The histogram to merge in.
+
+        Raises:
+            ValueError: If the histograms have different buckets.
+        """
+        if (other.low, other.width, len(other.counts)) != (self.low, self.width, len(self.counts)):
+            raise ValueError("Histograms with different buckets cannot be merged.")
+        self.counts = [mine + theirs for mine, theirs in zip(self.counts, other.counts)]
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+    def buckets(self):
+        """
+        Lists the buckets with their counts, including the underflow and overflow buckets.
+
+        Returns:
+            list[tuple[str, int]]: Pairs of (bucket label, count), e.g. ('[0,10)', 4).
+        """
+        high = self.low + self.width * len(self.counts)
+        rows = [(f"<{self.low}", self.underflow)]
+        rows += [(f"[{self.low + i * self.width},{self.low + (i + 1) * self.width})", count)
+                 for i, count in enumerate(self.counts)]
+        rows.append((f">={high}", self.overflow))
+        return rows
+    def to_dict(self):
+        """
+        Returns:
+            dict: The buckets and counts.
+        """
+        return {"low": self.low, "width": self.width, "counts": list(self.counts),
+                "underflow": self.underflow, "overflow": self.overflow}
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Restores a histogram saved with to_dict.
+
+        Args:
+            data (dict): The saved histogram.
+
+        Returns:
+            Histogram: The histogram.
+        """
+        histogram = cls(data["low"], data["width"], len(data["counts"]))
+        histogram.counts = list(data["counts"])
+        histogram.underflow = data["underflow"]
+        histogram.overflow = data["overflow"]
+        return histogram
+
+class ResultAggregator:
+    """
+    Summarises a stream of game results (as returned by Game.get_result or the batch runners) in
+    bounded memory: wins per seat, the distribution of game lengths, the distribution of each
+    seat's final balance and the squares each seat finishes on. Aggregators built from different
+    parts of a sweep can be merged, and exported as JSON or CSV.
+    """
+    def __init__(self, players, length_width=10, length_buckets=100, balance_low=-50, balance_width=5,
+                 balance_buckets=40) -> None:
+        """
+        Initializes empty statistics.
+
+        Args:
+            players (list): The player names, in seat order.
+            length_width (int): The width of the game length histogram buckets, in turns.
+            length_buckets (int): The number of game length histogram buckets, starting at 0 turns.
+            balance_low (int): The lowest balance of the first final balance histogram bucket.
+            balance_width (int): The width of the final balance histogram buckets, in dollars.
+            balance_buckets (int): The number of final balance histogram buckets.
+        """
+        self._players = list(players)
+        self._seats = {name: seat for seat, name in enumerate(self._players)}
+        self.games = 0
+        self.wins = [0] * len(self._players)         # games each seat won, alone or tied
+        self.outright_wins = [0] * len(self._players) # games each seat won alone
+        self.game_length = RunningStats()
+        self.length_histogram = Histogram(0, length_width, length_buckets)
+        self.balances = [RunningStats() for _ in self._players]
+        self.balance_histograms = [Histogram(balance_low, balance_width, balance_buckets) for _ in self._players]
+        # Bounded by the number of squares on the board
+        self.finishing_squares = [{} for _ in self._players]
+    def add(self, result):
+        """
+        Adds the result of one game.
+
+        Args:
+            result (dict): A result with 'turns', 'winners' and 'players' (name, balance and
+                           position of each seat, in seat order).
+
+        Raises:
+            ValueError: If the result has different players.
+        """
+        players = result["players"]
+        if [player["name"] for player in players] != self._players:
+            raise ValueError(f"Result players {[player['name'] for player in players]} do not match {self._players}.")
+        self.games += 1
+        winners = result["winners"]
+        for name in winners:
+            self.wins[self._seats[name]] += 1
+        if len(winners) == 1:
+            self.outright_wins[self._seats[winners[0]]] += 1
+        self.game_length.add(result["turns"])
+        self.length_histogram.add(result["turns"])
+        for seat, player in enumerate(players):
+            self.balances[seat].add(player["balance"])
+            self.balance_histograms[seat].add(player["balance"])
+            squares = self.finishing_squares[seat]
+            squares[player["position"]] = squares.get(player["position"], 0) + 1
+    def consume(self, results):
+        """
+        Adds results as they stream past, passing them on unchanged.
+
+        Args:
+            results (iterable): Game results.
+
+        Yields:
+            dict: The same results.
+        """
+        for result in results:
+            self.add(result)
+            yield result
+    def merge(self, other):
+        """
+        Adds the statistics of another aggregator of games with the same players and buckets.
+
+        Args:
+            other (ResultAggregator): The aggregator to merge in.
+
+        Raises:
+            ValueError: If the aggregators have different players or buckets.
+        """
+        if other._players != self._players:
+            raise ValueError(f"Cannot merge results of {other._players} into {self._players}.")
+        self.games += other.games
+        self.wins = [mine + theirs for mine, theirs in zip(self.wins, other.wins)]
+        self.outright_wins = [mine + theirs for mine, theirs in zip(self.outright_wins, other.outright_wins)]
+        self.game_length.merge(other.game_length)
+        self.length_histogram.merge(other.length_histogram)
+        for seat in range(len(self._players)):
+            self.balances[seat].merge(other.balances[seat])
+            self.balance_histograms[seat].merge(other.balance_histograms[seat])
+            squares = self.finishing_squares[seat]
+            for square, count in other.finishing_squares[seat].items():
+                squares[square] = squares.get(square, 0) + count
+    def to_dict(self):
+        """
+        Returns:
+            dict: The statistics, in a form that can be saved as JSON and restored with from_dict.
+        """
+        return {
+            "games": self.games,
+            "game_length": self.game_length.to_dict(),
+            "length_histogram": self.length_histogram.to_dict(),
+            "players": [
+                {
+                    "name": name,
+                    "wins": self.wins[seat],
+                    "outright_wins": self.outright_wins[seat],
+                    "win_rate": self.wins[seat] / self.games if self.games else 0.0,
+                    "balance": self.balances[seat].to_dict(),
+                    "balance_histogram": self.balance_histograms[seat].to_dict(),
+                    "finishing_squares": dict(self.finishing_squares[seat]),
+                }
+                for seat, name in enumerate(self._players)
+            ],
+        }
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Restores an aggregator saved with to_dict.
+
+        Args:
+            data (dict): The saved statistics.
+
+        Returns:
+            ResultAggregator: The aggregator.
+        """
+        aggregator = cls([player["name"] for player in data["players"]])
+        aggregator.games = data["games"]
+        aggregator.game_length = RunningStats.from_dict(data["game_length"])
+        aggregator.length_histogram = Histogram.from_dict(data["length_histogram"])
+        for seat, player in enumerate(data["players"]):
+            aggregator.wins[seat] = player["wins"]
+            aggregator.outright_wins[seat] = player["outright_wins"]
+            aggregator.balances[seat] = RunningStats.from_dict(player["balance"])
+            aggregator.balance_histograms[seat] = Histogram.from_dict(player["balance_histogram"])
+            aggregator.finishing_squares[seat] = dict(player["finishing_squares"])
+        return aggregator
+    def rows(self):
+        """
+        Flattens the statistics into (metric, player, key, value) rows, e.g. for a spreadsheet.
+
+        Yields:
+            tuple: One statistic per row. Statistics of the whole game have an empty player.
+        """
+        yield "games", "", "", self.games
+        for key, value in self.game_length.to_dict().items():
+            if key != "m2":
+                yield "game_length", "", key, value
+        for bucket, count in self.length_histogram.buckets():
+            yield "game_length_histogram", "", bucket, count
+        for seat, name in enumerate(self._players):
+            yield "wins", name, "", self.wins[seat]
+            yield "outright_wins", name, "", self.outright_wins[seat]
+            yield "win_rate", name, "", self.wins[seat] / self.games if self.games else 0.0
+            for key, value in self.balances[seat].to_dict().items():
+                if key != "m2":
+                    yield "balance", name, key, value
+            for bucket, count in self.balance_histograms[seat].buckets():
+                yield "balance_histogram", name, bucket, count
+            for square, count in sorted(self.finishing_squares[seat].items()):
+                yield "finishing_square", name, square, count
+    def write(self, file_name):
+        """
+        Writes the statistics to a file: CSV rows (see rows) if the file name ends in .csv,
+        otherwise JSON.
+
+        Args:
+            file_name (str): The file to write to.
+        """
+        with open(file_name, "w", newline="") as file:
+            if file_name.endswith(".csv"):
+                writer = csv.writer(file)
+                writer.writerow(["metric", "player", "key", "value"])
+                writer.writerows(self.rows())
+            else:
+                json.dump(self.to_dict(), file, indent=2)
+                file.write("\n")
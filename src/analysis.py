@@ -0,0 +1,287 @@
+import argparse
+from dice import RandomDice, END
+from game import Game, DEFAULT_PLAYERS
+from records import RecordSink
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure Python versions are used without it
+    np = None
+
+def roll_distribution(faces=6, count=1):
+    """
+    Works out the probability of each total when rolling fair dice and adding them up, as RandomDice does.
+
+    Args:
+        faces (int): The number of faces of each die.
+        count (int): The number of dice rolled each turn.
+
+    Returns:
+        list[float]: The probability of each total, indexed by the total (so the first count entries are 0).
+
+    Raises:
+        ValueError: If the number of faces or dice is not positive.
+    """
+    if faces <= 0 or count <= 0:
+        raise ValueError("Dice faces and count must be positive.")
+    distribution = [1.0]
+    for _ in range(count):
+        rolled = [0.0] * (len(distribution) + faces)
+        for total, probability in enumerate(distribution):
+            for face in range(1, faces + 1):
+                rolled[total + face] += probability / faces
+        distribution = rolled
+    return distribution
+
+class LandingSink(RecordSink):
+    """
+    Counts the squares landed on and the turns taken by each seat, for comparing sampled games
+    with the analysis.
+    """
+    def __init__(self, board_len, num_players) -> None:
+        """
+        Args:
+            board_len (int): The number of squares on the board.
+            num_players (int): The number of players.
+        """
+        self.landings = [0] * board_len
+        self.turn_counts = {}     # turns taken -> number of players who took that many turns in a game
+        self._turns = [0] * num_players
+    def write(self, turn):
+        self.landings[turn["to"]] += 1
+        self._turns[turn["seat"]] += 1
+    def close(self):
+        for turns in self._turns:
+            if turns:
+                self.turn_counts[turns] = self.turn_counts.get(turns, 0) + 1
+        self._turns = [0] * len(self._turns)
+
+class LandingAnalysis:
+    """
+    Treats a player's position as a Markov chain: from each square the player moves to the
+    square the dice total away, wrapping past GO. From this the chance of landing on each
+    square can be worked out without simulating games.
+
+    On boards without jumps (no jail or chance cards) every square is reached from as many
+    squares as it leads to, so in the long run every square is equally likely. The differences
+    between squares come from every player starting on GO: the landing probabilities over the
+    first turns of a game, which is what landing_probabilities(turns) and expected_landings give.
+    """
+    def __init__(self, board, faces=6, count=1) -> None:
+        """
+        Args:
+            board (Board): The game board.
+            faces (int): The number of faces of each die.
+            count (int): The number of dice rolled each turn.
+
+        Raises:
+            ValueError: If a roll could move a player more than once around the board, which the game does not allow.
+        """
+        self._board = board
+        self._board_len = board.get_board_len()
+        self._squares = [board.get_property(i) for i in range(self._board_len)]
+        self._faces = faces
+        self._count = count
+        distribution = roll_distribution(faces, count)
+        if len(distribution) - 1 > self._board_len:
+            raise ValueError(f"Rolls up to {len(distribution) - 1} can move off a board of {self._board_len} squares.")
+        # (steps, probability) of each possible roll
+        self._rolls = [(steps, probability) for steps, probability in enumerate(distribution) if probability]
+    def transition_matrix(self):
+        """
+        Builds the transition matrix of the chain.
+
+        Returns:
+            numpy.ndarray or list[list[float]]: matrix[i][j] is the probability of moving from square i to square j.
+        """
+        size = self._board_len
+        matrix = np.zeros((size, size)) if np is not None else [[0.0] * size for _ in range(size)]
+        for square in range(size):
+            for steps, probability in self._rolls:
+                matrix[square][(square + steps) % size] += probability
+        return matrix
+    def step(self, distribution):
+        """
+        Moves a distribution over squares by one roll.
+
+        Args:
+            distribution (list or numpy.ndarray): The probability of being on each square.
+
+        Returns:
+            list or numpy.ndarray: The probability of landing on each square after the roll.
+        """
+        if np is not None:
+            distribution = np.asarray(distribution, dtype=float)
+            return sum(probability * np.roll(distribution, steps) for steps, probability in self._rolls)
+        size = self._board_len
+        moved = [0.0] * size
+        for square, weight in enumerate(distribution):
+            if weight:
+                for steps, probability in self._rolls:
+                    moved[(square + steps) % size] += weight * probability
+        return moved
+    def stationary(self, tolerance=1e-12, max_iterations=100000):
+        """
+        Computes the long-run probability of landing on each square.
+
+        With NumPy, solves pi P = pi with the probabilities adding up to one as a least squares
+        problem. Without it, uses power iteration from GO until the distribution stops changing.
+        Each iteration stays put with probability 1/2, which has the same long-run probabilities
+        but also converges when the chain is periodic (e.g. a die that only ever rolls 2).
+
+        Args:
+            tolerance (float): Without NumPy, the largest change in any probability at convergence.
+            max_iterations (int): Without NumPy, the largest number of iterations.
+
+        Returns:
+            list[float]: The probability of each square.
+        """
+        size = self._board_len
+        if np is not None:
+            system = np.vstack([self.transition_matrix().T - np.eye(size), np.ones(size)])
+            target = np.zeros(size + 1)
+            target[-1] = 1.0
+            return np.linalg.lstsq(system, target, rcond=None)[0].tolist()
+        distribution = [1.0] + [0.0] * (size - 1)
+        for _ in range(max_iterations):
+            previous = distribution
+            distribution = [(stay + moved) / 2 for stay, moved in zip(previous, self.step(previous))]
+            if max(abs(new - old) for new, old in zip(distribution, previous)) < tolerance:
+                break
+        return distribution
+    def expected_landings(self, turn_counts):
+        """
+        Computes how many times each square is expected to be landed on, given how many turns each
+        player took in a set of games. Every player starts on GO.
+
+        Args:
+            turn_counts (dict): Number of turns -> number of players who took that many turns.
+
+        Returns:
+            list[float]: The expected number of landings on each square.
+        """
+        size = self._board_len
+        longest = max(turn_counts, default=0)
+        # Players still moving at each turn: those who took at least that many turns
+        moving = [0] * (longest + 2)
+        for turns, players in turn_counts.items():
+            moving[turns] += players
+        for turns in range(longest - 1, 0, -1):
+            moving[turns] += moving[turns + 1]
+        distribution = [1.0] + [0.0] * (size - 1)
+        expected = [0.0] * size
+        for turn in range(1, longest + 1):
+            distribution = self.step(distribution)
+            expected = [running + moving[turn] * weight for running, weight in zip(expected, distribution)]
+        return [float(landings) for landings in expected]
+    def landing_probabilities(self, turns=None):
+        """
+        Computes the probability that a landing is on each square.
+
+        Args:
+            turns (int, optional): Average over the first turns of a player starting on GO. Defaults
+                                   to the long-run probabilities (see stationary).
+
+        Returns:
+            list[float]: The probability of each square.
+        """
+        if turns is None:
+            return self.stationary()
+        return [landings / turns for landings in self.expected_landings({turns: 1})]
+    def expected_rent(self, probabilities=None):
+        """
+        Computes the rent each property is expected to earn per turn of an opponent.
+
+        Args:
+            probabilities (list[float], optional): The landing probability of each square.
+                                                   Defaults to the long-run probabilities.
+
+        Returns:
+            list[dict]: One row per property: its index, name, colour, landing probability, rent, and
+                        expected rent per opponent turn with and without the whole colour set.
+        """
+        if probabilities is None:
+            probabilities = self.stationary()
+        return [
+            {
+                "square": index,
+                "name": square.name,
+                "colour": square.get_colour(),
+                "probability": probabilities[index],
+                "rent": square.get_rent(),
+                "expected_rent": probabilities[index] * square.get_rent(),
+                "expected_monopoly_rent": probabilities[index] * square.get_rent() * 2,
+            }
+            for index, square in enumerate(self._squares) if square.type != "go"
+        ]
+    def simulate(self, games, seed=0, players=None, max_rolls=10000):
+        """
+        Plays games with seeded dice of the same kind, counting the squares landed on.
+
+        Args:
+            games (int): The number of games to play.
+            seed (int): The seed of the dice.
+            players (list, optional): The player names. Defaults to DEFAULT_PLAYERS.
+            max_rolls (int): The most rolls played in a game.
+
+        Returns:
+            LandingSink: The landing counts and the number of turns each player took.
+        """
+        players = list(players or DEFAULT_PLAYERS)
+        sink = LandingSink(self._board_len, len(players))
+        game = Game(None, None, players, board=self._board.copy(), dice=[], records=sink)
+        for index in range(games):
+            game.reset(RandomDice(seed, index, self._faces, self._count, max_rolls, END))
+            game.play_game()
+            sink.close()
+        return sink
+    def compare(self, sink):
+        """
+        Compares the squares landed on in sampled games with the analysis.
+
+        Args:
+            sink (LandingSink): The landings of the sampled games, e.g. from simulate.
+
+        Returns:
+            dict: 'squares', one row per square with the expected and sampled share of landings, and
+                  'total_variation', half the sum of the absolute differences of the shares.
+        """
+        expected = self.expected_landings(sink.turn_counts)
+        expected_total = sum(expected) or 1.0
+        sampled_total = sum(sink.landings) or 1
+        rows = [
+            {
+                "square": index,
+                "name": square.name,
+                "expected": expected[index] / expected_total,
+                "sampled": sink.landings[index] / sampled_total,
+            }
+            for index, square in enumerate(self._squares)
+        ]
+        return {"squares": rows, "total_variation": sum(abs(row["expected"] - row["sampled"]) for row in rows) / 2}
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Landing probabilities and expected rent of a board")
+    parser.add_argument("board_file", type=str, help="Path to the board JSON file")
+    parser.add_argument("--dice-faces", type=int, default=6, help="The number of faces of each die")
+    parser.add_argument("--dice-count", type=int, default=1, help="The number of dice rolled each turn")
+    parser.add_argument("--turns", type=int, default=None,
+                        help="Average over the first TURNS turns from GO instead of the long run")
+    parser.add_argument("--simulate", type=int, default=0, metavar="GAMES",
+                        help="Also play this many seeded games and compare the squares landed on")
+    parser.add_argument("--seed", type=int, default=0, help="With --simulate, the seed of the dice")
+    args = parser.parse_args()
+
+    try:
+        analysis = LandingAnalysis(Game.get_board(args.board_file), args.dice_faces, args.dice_count)
+        print(f"{'Square':<28}{'Landing':>10}{'Rent':>6}{'Expected':>10}{'Set':>10}")
+        for row in analysis.expected_rent(analysis.landing_probabilities(args.turns)):
+            print(f"{row['name']:<28}{row['probability']:>10.4f}{row['rent']:>6}"
+                  f"{row['expected_rent']:>10.4f}{row['expected_monopoly_rent']:>10.4f}")
+        if args.simulate:
+            comparison = analysis.compare(analysis.simulate(args.simulate, args.seed))
+            print(f"\n{'Square':<28}{'Expected':>10}{'Sampled':>10}")
+            for row in comparison["squares"]:
+                print(f"{row['name']:<28}{row['expected']:>10.4f}{row['sampled']:>10.4f}")
+            print(f"\nTotal variation distance: {comparison['total_variation']:.4f}")
+    except Exception as e:
+        print(f"Error: {e}")
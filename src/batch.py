@@ -0,0 +1,121 @@
+import json
+import os
+import sys
+from game import Game
+from records import NullRecordSink
+
+def read_roll_sequences(rolls_path):
+    """
+    Reads many dice roll sequences from a directory of rolls JSON files or from a JSONL file
+    (one JSON list of rolls per line).
+
+    Args:
+        rolls_path (str): A directory containing rolls JSON files, or a JSONL file.
+
+    Yields:
+        tuple[str, list]: The name of the sequence (file name or line number) and its dice rolls.
+
+    Raises:
+        FileNotFoundError: If the path does not exist.
+        ValueError: If a sequence is not a list of integers.
+    """
+    if os.path.isdir(rolls_path):
+        for file_name in sorted(os.listdir(rolls_path)):
+            if file_name.endswith(".json"):
+                yield file_name, Game.get_dice(os.path.join(rolls_path, file_name))
+        return
+    if not os.path.exists(rolls_path):
+        raise FileNotFoundError(f"Rolls path '{rolls_path}' does not exist.")
+    with open(rolls_path) as file:
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            dice_data = json.loads(line)
+            if not isinstance(dice_data, list) or not all(isinstance(roll, int) for roll in dice_data):
+                raise ValueError(f"Rolls on line {line_number} must be a list of integers.")
+            yield f"line {line_number}", dice_data
+
+class BatchRunner:
+    """
+    Plays many games on the same board within one process. The board is loaded once and the
+    players and properties are reset in place between games.
+    """
+    def __init__(self, board_file_name, players, board=None, jump_ahead=True, max_turns=None,
+                 stop_when_decided=False) -> None:
+        """
+        Loads the board and creates the players shared by every game of the batch.
+
+        Args:
+            board_file_name (str): The file name containing the board layout (e.g., 'board.json').
+            players (list): A list of player names to be included in each game.
+            board (Board, optional): An already loaded board. When given, board_file_name is not read.
+            jump_ahead (bool): Resolve the turns played once every property is owned from fixed rent tables
+                               (see Game._jump_ahead). The results are the same either way.
+            max_turns (int, optional): Stop each game after this many turns (see Game.play_outcome).
+            stop_when_decided (bool): Stop each game once its winner can no longer change (see Game.play_outcome).
+        """
+        if board is None:
+            board = Game.get_board(board_file_name)
+        # Only the result of each game is kept, so no turn records are built
+        self._game = Game(None, None, players, board=board, dice=[], records=NullRecordSink(),
+                          jump_ahead=jump_ahead)
+        self._max_turns = max_turns
+        self._stop_when_decided = stop_when_decided
+    def run_outcome(self, dice):
+        """
+        Plays a single game with the given dice rolls for its outcome only.
+
+        Args:
+            dice (list or DiceSource): The dice rolls for each turn.
+
+        Returns:
+            GameOutcome: The outcome of the game, as returned by Game.play_outcome.
+        """
+        self._game.reset(dice)
+        return self._game.play_outcome(self._max_turns, self._stop_when_decided)
+    def run_game(self, dice):
+        """
+        Plays a single game with the given dice rolls.
+
+        Args:
+            dice (list or DiceSource): The dice rolls for each turn.
+
+        Returns:
+            dict: The result of the game, as returned by Game.get_result, with why the game stopped
+                  (see GameOutcome) when it can be stopped early.
+        """
+        outcome = self.run_outcome(dice)
+        result = self._game.get_result()
+        if self._max_turns is not None or self._stop_when_decided:
+            result["stopped"] = outcome.stopped
+        return result
+    def run(self, roll_sequences, start=0):
+        """
+        Plays one game per dice roll sequence.
+
+        Args:
+            roll_sequences (iterable): Pairs of (sequence name, dice rolls), e.g. from read_roll_sequences.
+            start (int): The index of the first game, e.g. when a sweep is resumed part way through.
+
+        Yields:
+            dict: One result row per game, tagged with its index and sequence name.
+        """
+        for index, (source, dice) in enumerate(roll_sequences, start):
+            result = self.run_game(dice)
+            yield {"game": index, "source": source, **result}
+
+def write_results(results, output_file_name=None):
+    """
+    Writes result rows as JSON lines.
+
+    Args:
+        results (iterable): The result rows to write.
+        output_file_name (str, optional): The file to write to. Defaults to stdout.
+    """
+    file = open(output_file_name, "w") if output_file_name else sys.stdout
+    try:
+        for result in results:
+            file.write(json.dumps(result) + "\n")
+    finally:
+        if output_file_name:
+            file.close()
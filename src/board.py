@@ -1,34 +1,58 @@
 from property import Property
+from tables import BoardTables
 
 class Board:
     """
     The Board class represents the layout of the game board, including all properties, 
     their types, and positions.
+
+    The squares and their owners are kept in flat tables (see BoardTables); the Property
+    objects returned by get_property are views of them, created the first time a square is asked for.
     """
+    __slots__ = ("_positions", "_tables")
     def __init__(self, positions) -> None:
         """
-        Initializes the board with a list of positions and creates Property objects 
-        for each position. This method is called when the board data is loaded.
+        Initializes the board with a list of positions. This method is called when the
+        board data is loaded.
 
         Args:
             positions (list): List of dictionaries containing board data, with each 
                                dictionary representing a property (name, type, price, etc.).
         """
-        self._positions = []
-        # Create Property objects for each position
-        for i,position in enumerate(positions):
-            name = position["name"]
-            property_type = position["type"]
-            # For "go" type properties, price and color are not applicable
-            if property_type == "go":
-                price = None
-                colour = None
-            else:
-                price = position["price"]
-                colour =  position["colour"]
-            # Create a new Property object and append to the positions list
-            new_property = Property(name, price, colour, property_type, i)
-            self._positions.append(new_property)
+        self._tables = BoardTables(positions)
+        # Property views are created on demand by get_property
+        self._positions = [None] * len(positions)
+    @classmethod
+    def from_tables(cls, tables):
+        """
+        Creates a board from already built tables, e.g. those of a compact board file.
+
+        Args:
+            tables (BoardTables): The tables. They are used by the board, not copied.
+
+        Returns:
+            Board: The board.
+        """
+        board = cls.__new__(cls)
+        board._tables = tables
+        board._positions = [None] * len(tables.names)
+        return board
+    def copy(self):
+        """
+        Creates a copy of the board with the same layout and no properties owned.
+        The layout tables are shared; only the ownership tables are new.
+
+        Returns:
+            Board: The copy.
+        """
+        return Board.from_tables(self._tables.copy())
+    @property
+    def tables(self):
+        """
+        The flat per-square tables of the board (see BoardTables), for the actions and engines
+        that resolve landings on them directly.
+        """
+        return self._tables
     def get_property(self, position):
         """
         Retrieves the property at the specified position index on the board.
@@ -47,7 +71,10 @@ class Board:
             raise ValueError("Board data is invalid.")
         if position < 0 or position >= len(self._positions):
             raise IndexError(f"Position {position} is out of bounds. Board size: {len(self._positions)}")
-        return self._positions[position]
+        square = self._positions[position]
+        if square is None:
+            square = self._positions[position] = Property(self, position)
+        return square
     def get_board_len(self):
         """
         Retrieves the length of the board, which is the number of properties on the board.
@@ -73,9 +100,33 @@ class Board:
         Returns:
             list[Property]: A list of Property objects that have the specified colour.
         """
-        property_set = []
-        # Loop through all properties on the board and collect those with matching colour
-        for position in self._positions:
-            if colour == position.get_colour():
-                property_set.append(position)
-        return property_set
\ No newline at end of file
+        return [self.get_property(i) for i in self._tables.squares(colour)]
+    def has_monopoly(self, owner, colour):
+        """
+        Checks whether a player owns every property of the specified colour.
+
+        Args:
+            owner (Player): The player to check.
+            colour (str): The colour of the property set.
+
+        Returns:
+            bool: True if the player owns the whole colour set, otherwise False.
+        """
+        tables = self._tables
+        if colour is None:
+            # GO squares are never owned, so this only holds on a board without them
+            return tables.num_properties == len(tables.names)
+        colour_id = tables.colour_id(colour)
+        if colour_id < 0:
+            return True
+        owner_id = tables.owner_id(owner, create=False)
+        return owner_id >= 0 and tables.has_monopoly(owner_id, colour_id)
+    def all_owned(self):
+        """
+        Checks whether every property on the board has an owner. From then on ownership
+        can no longer change, so neither can the rent of any square.
+
+        Returns:
+            bool: True if no property is left to buy, otherwise False.
+        """
+        return self._tables.unowned == 0
@@ -0,0 +1,560 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from itertools import chain, compress, repeat
+from operator import not_
+from string import Formatter
+import ast
+import os
+import re
+import sys
+from tables import GO, BoardTables
+
+# Flattened periodic name segments are kept when the repeated squares are at most this many
+MAX_PERIOD = 4096
+# Array type codes of the integer column types, by kind and size in bytes
+TYPE_CODES = {("i", 1): "b", ("i", 2): "h", ("i", 4): "i", ("i", 8): "q",
+              ("u", 1): "B", ("u", 2): "H", ("u", 4): "I", ("u", 8): "Q"}
+NPY_MAGIC = b"\x93NUMPY"
+
+class SquareNames:
+    """
+    The names of the squares of a compact board, formatted from templates when they are read
+    instead of being kept as one string per square.
+
+    The names are held as segments that each start at a square and cycle through a tuple of
+    templates: square i of a segment starting at square s is named
+    templates[(i - s) % len(templates)].format(index=i).
+    """
+    __slots__ = ("_starts", "_templates", "_length")
+    def __init__(self, segments, length) -> None:
+        """
+        Args:
+            segments (list[tuple[int, tuple[str]]]): (first square, templates) of each segment, in board order.
+            length (int): The number of squares.
+        """
+        self._starts = [start for start, _ in segments]
+        self._templates = [templates for _, templates in segments]
+        self._length = length
+    def __len__(self):
+        return self._length
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(f"Square {index} is out of bounds. Board size: {self._length}")
+        return self.template(index).format(index=index)
+    def __iter__(self):
+        # Segment by segment, without looking up each square's segment
+        stops = self._starts[1:] + [self._length]
+        for start, stop, templates in zip(self._starts, stops, self._templates):
+            period = len(templates)
+            for i in range(start, stop):
+                yield templates[(i - start) % period].format(index=i)
+    def template(self, index):
+        """
+        Returns:
+            str: The template of a square's name, before it is formatted.
+        """
+        segment = bisect_right(self._starts, index) - 1
+        templates = self._templates[segment]
+        return templates[(index - self._starts[segment]) % len(templates)]
+
+def read_column(spec, directory):
+    """
+    Reads an integer column of a compact board: a NumPy .npy file, or a raw binary file of
+    fixed-width integers. NumPy is not needed to read either.
+
+    Args:
+        spec (str or dict): The path of a .npy file, or {"file": path, "dtype": dtype} for a raw
+                            binary file, with a NumPy style dtype such as "<i4" or "u1".
+        directory (str): The directory relative paths are resolved from.
+
+    Returns:
+        array: The column.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the column is not a one-dimensional integer column.
+    """
+    if isinstance(spec, str):
+        path, dtype = spec, None
+    elif isinstance(spec, dict) and isinstance(spec.get("file"), str) and isinstance(spec.get("dtype"), str):
+        path, dtype = spec["file"], spec["dtype"]
+    else:
+        raise ValueError(f"Invalid column in board file: {spec}")
+    path = os.path.join(directory, path)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Column file '{path}' does not exist.")
+    with open(path, "rb") as file:
+        if dtype is None:
+            dtype, count = _read_npy_header(file, path)
+        else:
+            count = None
+        typecode, swap = _type_code(dtype, path)
+        column = array(typecode)
+        data = file.read() if count is None else file.read(count * column.itemsize)
+    if len(data) % column.itemsize or (count is not None and len(data) != count * column.itemsize):
+        raise ValueError(f"Column file '{path}' is truncated.")
+    column.frombytes(data)
+    if swap:
+        column.byteswap()
+    return column
+def _read_npy_header(file, path):
+    """
+    Reads the header of a .npy file, leaving the file at the start of the data.
+
+    Returns:
+        tuple[str, int]: The dtype and the number of values.
+    """
+    if file.read(len(NPY_MAGIC)) != NPY_MAGIC:
+        raise ValueError(f"Column file '{path}' is not a .npy file.")
+    major = file.read(2)[0]
+    # Version 1 has a two-byte header length, later versions four bytes
+    size = 2 if major == 1 else 4
+    header_len = int.from_bytes(file.read(size), "little")
+    try:
+        header = ast.literal_eval(file.read(header_len).decode("latin1"))
+        dtype, shape = header["descr"], header["shape"]
+    except (ValueError, SyntaxError, KeyError, TypeError):
+        raise ValueError(f"Column file '{path}' has an invalid header.")
+    if not isinstance(dtype, str) or not isinstance(shape, tuple) or len(shape) != 1:
+        raise ValueError(f"Column file '{path}' must hold a one-dimensional integer column.")
+    return dtype, shape[0]
+def _type_code(dtype, path):
+    """
+    Works out the array type code of a NumPy style integer dtype.
+
+    Returns:
+        tuple[str, bool]: The type code, and whether the bytes must be swapped to the machine's order.
+    """
+    order = dtype[0] if dtype[:1] in ("<", ">", "=", "|") else "="
+    kind = dtype.lstrip("<>=|")
+    typecode = TYPE_CODES.get((kind[:1], int(kind[1:]) if kind[1:].isdigit() else 0))
+    if typecode is None or array(typecode).itemsize != int(kind[1:]):
+        raise ValueError(f"Column file '{path}' has unsupported type {dtype}; integer columns are supported.")
+    machine = "<" if sys.byteorder == "little" else ">"
+    return typecode, order in ("<", ">") and order != machine and array(typecode).itemsize > 1
+
+class ColourNames:
+    """
+    The names of the colours of a compact board, formatted from templates when they are read.
+
+    The names are held as segments of consecutive colour ids sharing a template: colour c of
+    a segment whose first colour is f is named template.format(group=groups[c - f]). Colours
+    named in single squares are segments of one colour, whose groups are (name,) and whose
+    template is "{group}". A colour is looked up by name by matching the name against each
+    template, so the names never need to be formatted all at once.
+    """
+    __slots__ = ("_starts", "_segments", "_length", "_named", "_patterns")
+    def __init__(self, segments, length) -> None:
+        """
+        Args:
+            segments (list[tuple[int, str, sequence]]): (first colour, template, group numbers) of each
+                                                         segment, in colour order. Group numbers are a range
+                                                         or a sorted list of integers, or (name,) for a
+                                                         colour named in a single square.
+            length (int): The number of colours.
+        """
+        self._starts = [start for start, _, _ in segments]
+        self._segments = segments
+        self._length = length
+        # Colours named in single squares, by name
+        self._named = {groups[0]: start for start, _, groups in segments if isinstance(groups, tuple)}
+        self._patterns = [None if isinstance(groups, tuple) else _template_pattern(template)
+                          for _, template, groups in segments]
+    def __len__(self):
+        return self._length
+    def __getitem__(self, colour):
+        if colour < 0:
+            colour += self._length
+        if not 0 <= colour < self._length:
+            raise IndexError(f"Colour {colour} is out of bounds. Number of colours: {self._length}")
+        start, template, groups = self._segments[bisect_right(self._starts, colour) - 1]
+        return template.format(group=groups[colour - start])
+    def find(self, name):
+        """
+        Looks a colour up by name.
+
+        Args:
+            name (str): The colour name.
+
+        Returns:
+            int: The colour id, or -1 if no colour has the name.
+        """
+        colour = self._named.get(name)
+        if colour is not None:
+            return colour
+        for segment, pattern in enumerate(self._patterns):
+            if pattern is not None:
+                position = self._position(segment, pattern, name)
+                if position >= 0:
+                    return self._starts[segment] + position
+        return -1
+    def check_unique(self):
+        """
+        Checks that no two colours have the same name, which would make colours impossible to look
+        up by name. Only the names of the smaller of each two segments that could share names are
+        formatted.
+
+        Raises:
+            ValueError: If two colours have the same name.
+        """
+        templated = [segment for segment, pattern in enumerate(self._patterns) if pattern is not None]
+        for segment in templated:
+            _, template, groups = self._segments[segment]
+            if "group" not in self._patterns[segment].groupindex and len(groups) > 1:
+                raise ValueError(f"Colour template '{template}' gives every colour group the same name.")
+            for name in self._named:
+                if self._position(segment, self._patterns[segment], name) >= 0:
+                    raise ValueError(f"Colour '{name}' is also made by the colour template '{template}'.")
+        for i, first in enumerate(templated):
+            for second in templated[i + 1:]:
+                if not _may_overlap(self._segments[first][1], self._segments[second][1]):
+                    continue
+                small, large = sorted((first, second), key=lambda segment: len(self._segments[segment][2]))
+                _, template, groups = self._segments[small]
+                for group in groups:
+                    name = template.format(group=group)
+                    if self._position(large, self._patterns[large], name) >= 0:
+                        raise ValueError(f"Colour '{name}' is made by more than one segment; give each "
+                                         f"generate or columns segment its own colour template.")
+    def _position(self, segment, pattern, name):
+        """
+        Matches a name against the template of a segment.
+
+        Returns:
+            int: The position of the named colour within the segment, or -1 if the segment does not make it.
+        """
+        match = pattern.fullmatch(name) if isinstance(name, str) else None
+        if match is None:
+            return -1
+        _, template, groups = self._segments[segment]
+        if "group" not in pattern.groupindex:
+            position = 0
+        else:
+            try:
+                group = int(match["group"])
+            except ValueError:
+                return -1
+            if isinstance(groups, range):
+                position = group - groups.start if group in groups else -1
+            else:
+                position = bisect_left(groups, group)
+                if position == len(groups) or groups[position] != group:
+                    position = -1
+        # Format specifications (e.g. padding) can make a name that only looks like the template's
+        if position < 0 or template.format(group=groups[position]) != name:
+            return -1
+        return position
+def _template_pattern(template):
+    """
+    Compiles a regular expression matching the names formatted from a colour template.
+
+    Returns:
+        Pattern: The expression, capturing the group number as 'group' if the template has one.
+    """
+    parts = []
+    seen = False
+    for literal, field, _, _ in Formatter().parse(template):
+        parts.append(re.escape(literal))
+        if field is not None:
+            # Later uses of the group must match the same text
+            parts.append("(?P=group)" if seen else "(?P<group>.*?)")
+            seen = True
+    return re.compile("".join(parts))
+def _may_overlap(first, second):
+    """
+    Checks whether two colour templates could make the same name, from the text around their fields.
+
+    Returns:
+        bool: False if the names of the two templates cannot be the same.
+    """
+    def ends(template):
+        parsed = list(Formatter().parse(template)) or [("", None, None, None)]
+        return parsed[0][0], parsed[-1][0] if parsed[-1][1] is None else ""
+    (first_prefix, first_suffix), (second_prefix, second_suffix) = ends(first), ends(second)
+    return ((first_prefix.startswith(second_prefix) or second_prefix.startswith(first_prefix))
+            and (first_suffix.endswith(second_suffix) or second_suffix.endswith(first_suffix)))
+
+class _Builder:
+    """
+    Collects the columns of a compact board as its segments are expanded.
+    """
+    def __init__(self, directory) -> None:
+        """
+        Starts an empty board.
+
+        Args:
+            directory (str): The directory the column files are read from.
+        """
+        self.directory = directory
+        self.name_segments = []
+        self.colour_segments = []
+        self.types = array("b")
+        self.prices = array("q")
+        self.colours = array("i")
+        self.colour_sizes = array("i")
+        self.type_names = ["go"]
+        self._type_codes = {"go": GO}
+        # Ids of the colours named in single squares
+        self._colour_ids = {}
+    def type_code(self, property_type):
+        """
+        Gets the code of a square type, giving it one if it is new.
+
+        Args:
+            property_type (str): The type name.
+
+        Returns:
+            int: The type code.
+        """
+        if property_type not in self._type_codes:
+            self._type_codes[property_type] = len(self.type_names)
+            self.type_names.append(property_type)
+        return self._type_codes[property_type]
+    def colour_id(self, colour):
+        """
+        Gets the id of a colour named in a single square, shared by every square naming it.
+
+        Args:
+            colour (str): The colour name.
+
+        Returns:
+            int: The colour id.
+        """
+        if colour not in self._colour_ids:
+            self._colour_ids[colour] = len(self.colour_sizes)
+            self.colour_segments.append((len(self.colour_sizes), "{group}", (colour,)))
+            self.colour_sizes.append(0)
+        return self._colour_ids[colour]
+    def new_colours(self, template, groups, sizes):
+        """
+        Adds colours named from a template, one per group number.
+
+        Args:
+            template (str): The colour name template, formatted with the group number.
+            groups (sequence): The group numbers, a range or a sorted list.
+            sizes (array): The number of squares of each colour.
+
+        Returns:
+            int: The id of the first of the new colours; the others follow it.
+        """
+        first = len(self.colour_sizes)
+        self.colour_segments.append((first, template, groups))
+        self.colour_sizes.extend(sizes)
+        return first
+    def add(self, segment):
+        """
+        Expands one segment onto the end of the board.
+        """
+        if not isinstance(segment, dict):
+            raise ValueError(f"Invalid segment in board file: {segment}")
+        if "repeat" in segment:
+            self._add_repeat(segment)
+        elif "generate" in segment:
+            self._add_generated(segment)
+        elif "columns" in segment:
+            self._add_columns(segment)
+        else:
+            self._add_square(segment)
+    def _add_square(self, square):
+        """
+        Adds a single square, as in board.json.
+
+        Args:
+            square (dict): The square's name, type, and price and colour for properties.
+
+        Raises:
+            ValueError: If the square is invalid.
+        """
+        if not all(key in square for key in ("name", "type")) or not isinstance(square["name"], str):
+            raise ValueError(f"Invalid property structure in board file: {square}")
+        start = len(self.types)
+        # The name is used as it is, so braces are escaped from formatting
+        self.name_segments.append((start, (square["name"].replace("{", "{{").replace("}", "}}"),)))
+        self.types.append(self.type_code(square["type"]))
+        if square["type"] == "go":
+            self.prices.append(0)
+            self.colours.append(-1)
+            return
+        if not isinstance(square.get("price"), int) or "colour" not in square:
+            raise ValueError(f"Invalid property structure in board file: {square}")
+        colour = self.colour_id(square["colour"])
+        self.prices.append(square["price"])
+        self.colours.append(colour)
+        self.colour_sizes[colour] += 1
+    def _add_repeat(self, segment):
+        """
+        Adds the squares of the inner segments, copied the given number of times.
+
+        Args:
+            segment (dict): The repeat segment: the number of copies and the inner segments.
+
+        Raises:
+            ValueError: If the segment is invalid.
+        """
+        times = segment["repeat"]
+        inner = segment.get("segments")
+        if not isinstance(times, int) or times <= 0 or not isinstance(inner, list):
+            raise ValueError(f"Invalid repeat segment in board file: {segment}")
+        start = len(self.types)
+        first_segment = len(self.name_segments)
+        sizes_before = self.colour_sizes[:]
+        for item in inner:
+            self.add(item)
+        period = len(self.types) - start
+        if period == 0:
+            return
+        for column in (self.types, self.prices, self.colours):
+            column.extend(column[start:] * (times - 1))
+        # The copies are in the same colour groups, which grow by the squares added once per copy
+        for colour, size in enumerate(self.colour_sizes):
+            added = size - (sizes_before[colour] if colour < len(sizes_before) else 0)
+            if added:
+                self.colour_sizes[colour] = size + added * (times - 1)
+        segments = self.name_segments[first_segment:]
+        if period <= MAX_PERIOD:
+            # One segment cycling through the template of each repeated square
+            names = SquareNames([(first - start, templates) for first, templates in segments], period)
+            templates = tuple(names.template(i) for i in range(period))
+            self.name_segments[first_segment:] = [(start, templates)]
+        else:
+            for copy in range(1, times):
+                self.name_segments.extend((first + copy * period, templates) for first, templates in segments)
+    def _add_generated(self, segment):
+        """
+        Adds properties in consecutive colour groups of group_size squares.
+
+        Args:
+            segment (dict): The generate segment: the number of properties, group size, prices and templates.
+
+        Raises:
+            ValueError: If the segment is invalid.
+        """
+        count = segment["generate"]
+        group_size = segment.get("group_size", 1)
+        name = segment.get("name", "Square {index}")
+        colour = segment.get("colour", "Colour {group}")
+        price = segment.get("price")
+        property_type = segment.get("type", "property")
+        prices = price if isinstance(price, list) else [price]
+        if (not isinstance(count, int) or count <= 0 or not isinstance(group_size, int) or group_size <= 0
+                or not prices or not all(isinstance(value, int) for value in prices) or property_type == "go"):
+            raise ValueError(f"Invalid generate segment in board file: {segment}")
+        self._check_templates(segment, name, colour)
+        self.name_segments.append((len(self.types), (name,)))
+        self.types.extend(array("b", [self.type_code(property_type)]) * count)
+        self.prices.extend((array("q", prices) * (count // len(prices) + 1))[:count])
+        groups = (count + group_size - 1) // group_size
+        sizes = array("i", [group_size]) * groups
+        sizes[-1] = count - group_size * (groups - 1)
+        first = self.new_colours(colour, range(1, groups + 1), sizes)
+        # Each colour id repeated group_size times
+        ids = range(first, first + groups)
+        self.colours.extend(array("i", chain.from_iterable(zip(*[ids] * group_size)))[:count])
+    def _add_columns(self, segment):
+        """
+        Adds squares read from binary columns: prices, colour groups and optionally GO flags.
+
+        Args:
+            segment (dict): The columns segment: the column files and templates.
+
+        Raises:
+            ValueError: If the segment or its columns are invalid.
+            FileNotFoundError: If a column file does not exist.
+        """
+        columns = segment["columns"]
+        name = segment.get("name", "Square {index}")
+        colour = segment.get("colour", "Colour {group}")
+        property_type = segment.get("type", "property")
+        if not isinstance(columns, dict) or "price" not in columns or "group" not in columns or property_type == "go":
+            raise ValueError(f"Invalid columns segment in board file: {segment}")
+        self._check_templates(segment, name, colour)
+        prices = read_column(columns["price"], self.directory)
+        groups = read_column(columns["group"], self.directory)
+        go = read_column(columns["go"], self.directory) if "go" in columns else None
+        count = len(prices)
+        if len(groups) != count or (go is not None and len(go) != count):
+            raise ValueError(f"Columns of a segment must have the same length: {segment}")
+        start = len(self.types)
+        self.name_segments.append((start, (name,)))
+        # Colour groups are only made for the values used by properties
+        sizes = Counter(groups if go is None else compress(groups, map(not_, go)))
+        used = sorted(sizes)
+        first = self.new_colours(colour, used, array("i", [sizes[group] for group in used]))
+        ids = dict(zip(used, range(first, first + len(used))))
+        self.types.extend(array("b", [self.type_code(property_type)]) * count)
+        self.prices.extend(prices if prices.typecode == "q" else array("q", prices))
+        self.colours.extend(array("i", map(ids.get, groups, repeat(-1))))
+        if go is not None:
+            for i in compress(range(start, start + count), go):
+                self.types[i] = GO
+                self.prices[i] = 0
+                self.colours[i] = -1
+    @staticmethod
+    def _check_templates(segment, name, colour):
+        """
+        Checks that the name and colour templates of a segment can be formatted.
+
+        Raises:
+            ValueError: If either template is invalid.
+        """
+        try:
+            name.format(index=0)
+            colour.format(group=0)
+        except (KeyError, IndexError, ValueError, AttributeError):
+            raise ValueError(f"Invalid name or colour template in board file: {segment}")
+
+def is_compact(board_data):
+    """
+    Checks whether parsed board data is in the compact format rather than a list of squares.
+    """
+    return isinstance(board_data, dict)
+def build_tables(board_data, directory="."):
+    """
+    Builds the tables of a board in the compact format. A compact board file is a JSON object
+    whose "segments" are expanded in order:
+
+        {"name": "GO", "type": "go"}                    a single square, as in board.json
+        {"repeat": 3, "segments": [...]}                the inner segments' squares, copied 3 times
+        {"generate": 1000, "group_size": 4, "price": [1, 2, 3],
+         "name": "Street {index}", "colour": "Block {group}"}
+                                                        1000 properties in colour groups of 4 squares,
+                                                        with prices cycling through the list
+        {"columns": {"price": "prices.npy", "group": "groups.npy", "go": "go.npy"},
+         "name": "Lot {index}", "colour": "Block {group}"}
+                                                        one property per value of the price column,
+                                                        coloured by the group column, and GO squares
+                                                        where the optional go column is not 0
+
+    {index} in a name is the square's index on the board and {group} in a colour is its group
+    number (counted from 1 in generate segments, the column's value in columns segments).
+    Each generate and columns segment makes colour groups of its own, so their colour names must
+    not be made by any other segment; single squares with the same colour are in the same colour
+    group wherever they are. The squares of a repeat are
+    copies, in the same colour groups as the squares they copy.
+
+    Args:
+        board_data (dict): The parsed compact board file.
+        directory (str): The directory the column files are read from (that of the board file).
+
+    Returns:
+        BoardTables: The tables, with no square owned.
+
+    Raises:
+        ValueError: If the board data is invalid, has no squares or two colour groups have the same name.
+    """
+    segments = board_data.get("segments")
+    if not isinstance(segments, list):
+        raise ValueError("Board data is invalid.")
+    builder = _Builder(directory)
+    for segment in segments:
+        builder.add(segment)
+    if len(builder.types) == 0:
+        raise ValueError("Board data is invalid.")
+    names = SquareNames(builder.name_segments, len(builder.types))
+    colour_names = ColourNames(builder.colour_segments, len(builder.colour_sizes))
+    colour_names.check_unique()
+    return BoardTables.from_columns(names, builder.types, builder.type_names, builder.prices, builder.colours,
+                                    colour_names, builder.colour_sizes)
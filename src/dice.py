@@ -0,0 +1,338 @@
+from abc import ABC, abstractmethod
+from itertools import islice
+import mmap
+import os
+import random
+import re
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional and only used for generating rolls in blocks
+    np = None
+
+# What a dice source does when it runs out of rolls
+END = "end"        # the game ends
+WRAP = "wrap"      # the rolls start again from the beginning
+ERROR = "error"    # an IndexError is raised
+
+class DiceSource(ABC):
+    """
+    A dice source hands out the dice rolls of a game one at a time, so rolls can be read lazily
+    instead of being loaded into memory all at once. Subclasses provide the rolls themselves
+    by implementing _rolls; this class counts them and applies the behaviour chosen for when they run out.
+    """
+    def __init__(self, on_exhausted=ERROR) -> None:
+        """
+        Args:
+            on_exhausted (str): What to do when the rolls run out: END, WRAP or ERROR.
+
+        Raises:
+            ValueError: If the behaviour is not one of END, WRAP or ERROR.
+        """
+        if on_exhausted not in (END, WRAP, ERROR):
+            raise ValueError(f"Unknown behaviour when the rolls run out: {on_exhausted}")
+        self._on_exhausted = on_exhausted
+        self._iterator = None
+        self.position = 0   # number of rolls handed out so far
+    def next_roll(self):
+        """
+        Retrieves the next dice roll.
+
+        Returns:
+            int: The next roll, or None if the rolls have run out and the game should end.
+
+        Raises:
+            IndexError: If the rolls have run out and the source was created with ERROR.
+            ValueError: If the source is invalid, or has no rolls at all and was created with WRAP.
+        """
+        if self._iterator is None:
+            self._iterator = self._rolls()
+        try:
+            roll = next(self._iterator)
+        except StopIteration:
+            if self._on_exhausted == END:
+                return None
+            if self._on_exhausted == ERROR:
+                raise IndexError(f"Rolls ran out after {self.position} rolls.")
+            self._iterator = self._rolls()
+            roll = next(self._iterator, None)
+            if roll is None:
+                raise ValueError("Rolls are empty.")
+        self.position += 1
+        return roll
+    def rewind(self):
+        """
+        Starts handing out the rolls again from the beginning.
+        """
+        self._iterator = None
+        self.position = 0
+    def seek(self, position):
+        """
+        Continues handing out the rolls from the given number of rolls into the sequence, applying
+        the behaviour chosen for when the rolls run out along the way.
+
+        Args:
+            position (int): The number of rolls to skip from the beginning.
+        """
+        self.rewind()
+        for _ in range(position):
+            if self.next_roll() is None:
+                break
+    def remaining(self):
+        """
+        Bounds the number of turns the dice still allow before the game ends.
+
+        Returns:
+            int: The number of rolls left if the source ends the game when they run out, or None
+                 if it does not (the rolls start again or raise an error) or the number is unknown.
+        """
+        return None
+    def to_list(self):
+        """
+        Reads all the rolls, from the beginning, into a list.
+
+        Returns:
+            list: A list of integers representing the dice rolls for each turn.
+        """
+        return list(self._rolls())
+    @abstractmethod
+    def _rolls(self):
+        """
+        Returns an iterator over the rolls, from the beginning.
+        """
+
+class ListDice(DiceSource):
+    """
+    Dice rolls held in a list.
+    """
+    def __init__(self, rolls, on_exhausted=ERROR) -> None:
+        """
+        Args:
+            rolls (list): A list of integers representing the dice rolls for each turn.
+            on_exhausted (str): What to do when the rolls run out: END, WRAP or ERROR.
+        """
+        super().__init__(on_exhausted)
+        self._list = rolls
+    def remaining(self):
+        if self._on_exhausted != END:
+            return None
+        return max(len(self._list) - self.position, 0)
+    def seek(self, position):
+        if position <= len(self._list):
+            # Skip straight to the position rather than handing out each roll
+            self._iterator = islice(self._list, position, None)
+            self.position = position
+        else:
+            super().seek(position)
+    def _rolls(self):
+        return iter(self._list)
+
+class JsonStreamDice(DiceSource):
+    """
+    Dice rolls read lazily from a rolls JSON file (a JSON list of integers), a chunk at a time.
+    """
+    _TOKEN = re.compile(r"-?\d+|\S")
+    def __init__(self, file_name, on_exhausted=ERROR, chunk_size=1 << 16) -> None:
+        """
+        Args:
+            file_name (str): The file name containing the dice roll values (e.g., 'rolls.json').
+            on_exhausted (str): What to do when the rolls run out: END, WRAP or ERROR.
+            chunk_size (int): The number of characters read from the file at a time.
+
+        Raises:
+            FileNotFoundError: If the dice file does not exist.
+        """
+        super().__init__(on_exhausted)
+        if not os.path.exists(file_name):
+            raise FileNotFoundError(f"Rolls file '{file_name}' does not exist.")
+        self._file_name = file_name
+        self._chunk_size = chunk_size
+    def _rolls(self):
+        invalid = ValueError("Rolls file must contain a list of integers.")
+        started = closed = False
+        expect_roll = True  # a roll may follow '[' or ','
+        leftover = ""
+        with open(self._file_name) as file:
+            while True:
+                chunk = file.read(self._chunk_size)
+                text = leftover + chunk
+                # Keep a number cut off by the end of the chunk for the next chunk
+                end = len(text)
+                if chunk:
+                    while end > 0 and (text[end - 1].isdigit() or text[end - 1] == "-"):
+                        end -= 1
+                leftover = text[end:]
+                for token in self._TOKEN.findall(text, 0, end):
+                    if closed:
+                        raise invalid
+                    if not started:
+                        if token != "[":
+                            raise invalid
+                        started = True
+                    elif token == "]":
+                        closed = True
+                    elif token == ",":
+                        if expect_roll:
+                            raise invalid
+                        expect_roll = True
+                    elif expect_roll and token[-1].isdigit():
+                        expect_roll = False
+                        yield int(token)
+                    else:
+                        raise invalid
+                if not chunk:
+                    break
+        if not closed:
+            raise invalid
+
+class LineDice(DiceSource):
+    """
+    Dice rolls read lazily from a text file with one integer per line.
+    """
+    def __init__(self, file_name, on_exhausted=ERROR) -> None:
+        """
+        Args:
+            file_name (str): The file name containing one dice roll per line.
+            on_exhausted (str): What to do when the rolls run out: END, WRAP or ERROR.
+
+        Raises:
+            FileNotFoundError: If the dice file does not exist.
+        """
+        super().__init__(on_exhausted)
+        if not os.path.exists(file_name):
+            raise FileNotFoundError(f"Rolls file '{file_name}' does not exist.")
+        self._file_name = file_name
+    def _rolls(self):
+        with open(self._file_name) as file:
+            for line_number, line in enumerate(file, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield int(line)
+                except ValueError:
+                    raise ValueError(f"Roll on line {line_number} is not an integer.")
+
+class BinaryDice(DiceSource):
+    """
+    Dice rolls read from a binary file with one unsigned byte per roll. The file is memory-mapped,
+    so only the pages in use are loaded.
+    """
+    def __init__(self, file_name, on_exhausted=ERROR) -> None:
+        """
+        Args:
+            file_name (str): The file name containing one byte per dice roll.
+            on_exhausted (str): What to do when the rolls run out: END, WRAP or ERROR.
+
+        Raises:
+            FileNotFoundError: If the dice file does not exist.
+        """
+        super().__init__(on_exhausted)
+        if not os.path.exists(file_name):
+            raise FileNotFoundError(f"Rolls file '{file_name}' does not exist.")
+        self._file_name = file_name
+        self._data = None
+    def _rolls(self):
+        if self._data is None:
+            with open(self._file_name, "rb") as file:
+                size = file.seek(0, 2)
+                # mmap cannot map an empty file
+                self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        return iter(memoryview(self._data))
+
+class RandomDice(DiceSource):
+    """
+    Dice rolls generated on the fly from a seeded pseudo-random number generator, without any
+    rolls file. The rolls only depend on the seed and the game index, so every game of a batch
+    gets its own rolls and playing the same game again gives the same rolls.
+    """
+    def __init__(self, seed, game_index=0, faces=6, count=1, max_rolls=None, on_exhausted=ERROR,
+                 use_numpy=False, block_size=4096) -> None:
+        """
+        Args:
+            seed (int): The seed of the sweep.
+            game_index (int): The index of the game within the sweep.
+            faces (int): The number of faces of each die.
+            count (int): The number of dice rolled and added up each turn.
+            max_rolls (int, optional): The number of rolls before the rolls run out. Defaults to no limit.
+            on_exhausted (str): What to do when max_rolls is reached: END, WRAP or ERROR.
+            use_numpy (bool): Generate the rolls in blocks with NumPy. The rolls are still reproducible,
+                              but are not the same as without NumPy.
+            block_size (int): The number of rolls generated at a time with NumPy.
+
+        Raises:
+            ValueError: If the dice settings are not positive.
+            ImportError: If use_numpy is set and NumPy is not installed.
+        """
+        super().__init__(on_exhausted)
+        if faces <= 0 or count <= 0 or block_size <= 0 or (max_rolls is not None and max_rolls < 0):
+            raise ValueError("Dice faces, count, block size and maximum rolls must be positive.")
+        if use_numpy and np is None:
+            raise ImportError("Generating rolls with NumPy requires NumPy.")
+        self._seed = seed
+        self._game_index = game_index
+        self._faces = faces
+        self._count = count
+        self._max_rolls = max_rolls
+        self._use_numpy = use_numpy
+        self._block_size = block_size
+    def remaining(self):
+        if self._on_exhausted != END or self._max_rolls is None:
+            return None
+        return max(self._max_rolls - self.position, 0)
+    def to_list(self):
+        if self._max_rolls is None:
+            raise ValueError("Rolls without a maximum number of rolls cannot be read into a list.")
+        return super().to_list()
+    def _rolls(self):
+        rolls = self._numpy_rolls() if self._use_numpy else self._python_rolls()
+        return rolls if self._max_rolls is None else islice(rolls, self._max_rolls)
+    def _python_rolls(self):
+        # Seeding with a string is stable across runs and platforms
+        rng = random.Random(f"{self._seed}:{self._game_index}")
+        faces = self._faces
+        dice = range(self._count)
+        while True:
+            yield sum(rng.randrange(faces) for _ in dice) + self._count
+    def _numpy_rolls(self):
+        rng = np.random.default_rng([self._seed, self._game_index])
+        while True:
+            block = rng.integers(1, self._faces + 1, size=(self._block_size, self._count)).sum(axis=1)
+            yield from block.tolist()
+
+def random_roll_sequences(seed, games, start=0, **settings):
+    """
+    Creates the dice of a sweep of games with generated rolls, for the batch and parallel runners.
+
+    Args:
+        seed (int): The seed of the sweep.
+        games (int): The number of games.
+        start (int): The index of the first game. The dice of a game only depend on the seed and its
+                     index, so part of a sweep can be played on its own.
+        **settings: Further RandomDice settings (faces, count, max_rolls, on_exhausted, use_numpy).
+
+    Yields:
+        tuple[str, RandomDice]: The name of the game and its dice.
+    """
+    for game_index in range(start, start + games):
+        yield f"seed {seed} game {game_index}", RandomDice(seed, game_index, **settings)
+
+def open_dice(file_name, on_exhausted=ERROR):
+    """
+    Opens a file of dice rolls as a dice source, choosing the format from the file extension:
+    '.json' for a JSON list, '.bin' or '.u8' for one byte per roll, and anything else for one
+    integer per line.
+
+    Args:
+        file_name (str): The file name containing the dice rolls.
+        on_exhausted (str): What to do when the rolls run out: END, WRAP or ERROR.
+
+    Returns:
+        DiceSource: A dice source reading the file lazily.
+    """
+    extension = os.path.splitext(file_name)[1].lower()
+    if extension == ".json":
+        return JsonStreamDice(file_name, on_exhausted)
+    if extension in (".bin", ".u8"):
+        return BinaryDice(file_name, on_exhausted)
+    return LineDice(file_name, on_exhausted)
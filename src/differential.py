@@ -0,0 +1,344 @@
+import argparse
+import json
+import random
+import sys
+import time
+from batch import BatchRunner
+from board import Board
+from dice import ListDice
+from game import Game
+from records import MemoryRecordSink, NullRecordSink
+from state import StateActions
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the vectorized engine is skipped without it
+    np = None
+
+def random_board(rng, max_squares=40, max_price=8):
+    """
+    Generates a random board: GO followed by properties in colour groups of random sizes, with
+    random prices. Groups are sometimes split around the board and some boards have more than
+    one GO square.
+
+    Args:
+        rng (random.Random): The random number generator.
+        max_squares (int): The largest number of squares.
+        max_price (int): The highest price of a property.
+
+    Returns:
+        list[dict]: The board data, in the format of board.json.
+    """
+    squares = rng.randint(2, max_squares)
+    board_data = [{"name": "GO", "type": "go"}]
+    colour = 0
+    left_in_group = 0
+    for i in range(1, squares):
+        if rng.random() < 0.05:
+            board_data.append({"name": f"GO {i}", "type": "go"})
+            continue
+        if left_in_group == 0:
+            colour += 1
+            left_in_group = rng.randint(1, 4)
+        left_in_group -= 1
+        # Now and then reuse an earlier colour, so a group is spread over the board
+        group = rng.randint(1, colour) if rng.random() < 0.1 else colour
+        board_data.append({"name": f"Square {i}", "price": rng.randint(0, max_price),
+                           "colour": f"Colour {group}", "type": "property"})
+    return board_data
+def random_case(rng, max_squares=40, max_players=6, tapes=4, tape_length=400):
+    """
+    Generates a random test case: a board, players and several roll tapes. Rolls never move a
+    player more than once around the board.
+
+    Returns:
+        dict: The case, with 'board', 'players' and 'tapes'.
+    """
+    board_data = random_board(rng, max_squares)
+    faces = min(rng.choice((2, 3, 6, 6, 6, 12)), len(board_data))
+    players = [f"P{seat}" for seat in range(rng.randint(1, max_players))]
+    return {
+        "board": board_data,
+        "players": players,
+        "tapes": [[rng.randint(1, faces) for _ in range(rng.randint(0, tape_length))] for _ in range(tapes)],
+    }
+def _outcome(balances, positions, turns, players):
+    """
+    Builds the outcome compared between engines.
+    """
+    balances = [int(balance) for balance in balances]
+    best = max(balances)
+    return {"turns": int(turns), "balances": balances, "positions": [int(position) for position in positions],
+            "winners": [name for name, balance in zip(players, balances) if balance == best]}
+def _game_outcome(game):
+    """
+    Reads the outcome of a finished Game.
+    """
+    return {"turns": game._current_turn,
+            "balances": [player.get_balance() for player in game._players],
+            "positions": [player.get_current_position() for player in game._players],
+            "winners": game.determine_winner()}
+def _error(error):
+    """
+    The outcome of a game that raised an error: only the kind of error is compared.
+    """
+    return {"error": type(error).__name__}
+
+def reference_engine(board_data, players, tapes):
+    """
+    The reference: Game and Actions with full turn records, as played by Game.start_game.
+    """
+    outcomes = []
+    for tape in tapes:
+        game = Game(None, None, players, board=Board(board_data), dice=list(tape), records=MemoryRecordSink())
+        try:
+            game.play_game()
+            outcomes.append(_game_outcome(game))
+        except Exception as e:
+            outcomes.append(_error(e))
+    return outcomes
+def _game_engine(jump_ahead):
+    """
+    Game without turn records, with or without jumping ahead.
+    """
+    def engine(board_data, players, tapes):
+        outcomes = []
+        for tape in tapes:
+            game = Game(None, None, players, board=Board(board_data), dice=list(tape), records=NullRecordSink(),
+                        jump_ahead=jump_ahead)
+            try:
+                game.play_game()
+                outcomes.append(_game_outcome(game))
+            except Exception as e:
+                outcomes.append(_error(e))
+        return outcomes
+    return engine
+def outcome_engine(board_data, players, tapes):
+    """
+    Game.play_outcome, without a turn cap or early stopping. The game's record sink is left unused.
+    """
+    game = Game(None, None, players, board=Board(board_data), dice=[], records=MemoryRecordSink(), jump_ahead=True)
+    outcomes = []
+    for tape in tapes:
+        game.reset(list(tape))
+        try:
+            outcome = game.play_outcome()
+            outcomes.append({"turns": outcome.turns, "balances": list(outcome.balances),
+                             "positions": list(outcome.positions), "winners": list(outcome.winners)})
+        except Exception as e:
+            outcomes.append(_error(e))
+    return outcomes
+def batch_engine(board_data, players, tapes):
+    """
+    BatchRunner: one board and one set of players reset in place between games.
+    """
+    runner = BatchRunner(None, players, board=Board(board_data))
+    outcomes = []
+    for tape in tapes:
+        try:
+            runner.run_game(list(tape))
+            outcomes.append(_game_outcome(runner._game))
+        except Exception as e:
+            outcomes.append(_error(e))
+    return outcomes
+def state_engine(board_data, players, tapes):
+    """
+    StateActions playing on an array-backed GameState.
+    """
+    actions = StateActions(Board(board_data))
+    outcomes = []
+    for tape in tapes:
+        state = actions.new_state(len(players))
+        try:
+            actions.play_game(state, ListDice(list(tape)))
+            outcomes.append(_outcome(state.balances, state.positions, state.turn, players))
+        except Exception as e:
+            outcomes.append(_error(e))
+    return outcomes
+def vectorized_engine(board_data, players, tapes):
+    """
+    VectorizedRunner playing the tapes in lockstep. A block fails as a whole when one of its
+    games fails, so the games are then played one at a time to find out which.
+    """
+    from vectorized import VectorizedRunner
+    runner = VectorizedRunner(None, players, board=Board(board_data))
+    try:
+        balances, positions, turns = runner.play_block([list(tape) for tape in tapes])
+        return [_outcome(balances[i], positions[i], turns[i], players) for i in range(len(tapes))]
+    except Exception:
+        if len(tapes) == 1:
+            raise
+    outcomes = []
+    for tape in tapes:
+        try:
+            outcomes.extend(vectorized_engine(board_data, players, [tape]))
+        except Exception as e:
+            outcomes.append(_error(e))
+    return outcomes
+
+# Engines compared with the reference
+ENGINES = {
+    "object": _game_engine(jump_ahead=False),
+    "jump_ahead": _game_engine(jump_ahead=True),
+    "outcome": outcome_engine,
+    "batch": batch_engine,
+    "state": state_engine,
+}
+if np is not None:
+    ENGINES["vectorized"] = vectorized_engine
+
+def compare(case, engines, reference=reference_engine):
+    """
+    Plays a case's tapes on the reference and on each engine.
+
+    Args:
+        case (dict): The case, with 'board', 'players' and 'tapes'.
+        engines (dict): Engine name -> engine function.
+        reference (callable): The reference engine.
+
+    Returns:
+        list[dict]: One mismatch per engine and tape that disagrees with the reference, with the
+                    engine name, the tape and both outcomes.
+    """
+    board_data, players, tapes = case["board"], case["players"], case["tapes"]
+    expected = reference(board_data, players, tapes)
+    mismatches = []
+    for name, engine in engines.items():
+        try:
+            outcomes = engine(board_data, players, tapes)
+        except Exception as e:
+            outcomes = [_error(e)] * len(tapes)
+        for tape, want, got in zip(tapes, expected, outcomes):
+            if want != got:
+                mismatches.append({"engine": name, "tape": tape, "expected": want, "actual": got})
+    return mismatches
+def _fails(board_data, players, tape, engine, reference):
+    """
+    Checks whether a single game still shows a mismatch.
+    """
+    try:
+        got = engine(board_data, players, [tape])[0]
+    except Exception as e:
+        got = _error(e)
+    return reference(board_data, players, [tape])[0] != got
+def shrink(board_data, players, tape, engine, reference=reference_engine, max_attempts=5000):
+    """
+    Shrinks a failing game to a smaller one that still fails: fewer and smaller rolls, fewer
+    squares, fewer players, lower prices and fewer colours. Each step keeps a change only if the
+    engine still disagrees with the reference, until no change helps.
+
+    Args:
+        board_data (list): The board of the failing game.
+        players (list): The players of the failing game.
+        tape (list): The rolls of the failing game.
+        engine (callable): The engine that disagrees with the reference.
+        reference (callable): The reference engine.
+        max_attempts (int): The most candidate games tried.
+
+    Returns:
+        dict: The smallest failing game found, with 'board', 'players' and 'tape'.
+    """
+    best = {"board": [dict(square) for square in board_data], "players": list(players), "tape": list(tape)}
+    attempts = 0
+    def try_candidate(candidate):
+        nonlocal attempts, best
+        if attempts >= max_attempts:
+            return False
+        attempts += 1
+        # Rolls must not move a player more than once around the board
+        size = len(candidate["board"])
+        candidate["tape"] = [min(roll, size) for roll in candidate["tape"]]
+        if _fails(candidate["board"], candidate["players"], candidate["tape"], engine, reference):
+            best = candidate
+            return True
+        return False
+    def variants():
+        board, players, tape = best["board"], best["players"], best["tape"]
+        # Drop chunks of rolls, largest first
+        chunk = len(tape) // 2
+        while chunk >= 1:
+            for start in range(0, len(tape), chunk):
+                yield {"board": board, "players": players, "tape": tape[:start] + tape[start + chunk:]}
+            chunk //= 2
+        for seat in range(len(players) - 1, 0, -1):
+            yield {"board": board, "players": players[:seat] + players[seat + 1:], "tape": tape}
+        for index in range(len(board) - 1, 0, -1):
+            yield {"board": board[:index] + board[index + 1:], "players": players, "tape": tape}
+        for index, roll in enumerate(tape):
+            if roll > 1:
+                yield {"board": board, "players": players, "tape": tape[:index] + [roll - 1] + tape[index + 1:]}
+        for index, square in enumerate(board):
+            if square["type"] != "go":
+                if square["price"] > 0:
+                    smaller = dict(square, price=square["price"] // 2)
+                    yield {"board": board[:index] + [smaller] + board[index + 1:], "players": players, "tape": tape}
+                if square["colour"] != "Colour 1":
+                    merged = dict(square, colour="Colour 1")
+                    yield {"board": board[:index] + [merged] + board[index + 1:], "players": players, "tape": tape}
+    improved = True
+    while improved and attempts < max_attempts:
+        improved = False
+        for candidate in variants():
+            if try_candidate(candidate):
+                improved = True
+                break
+    return best
+def run(cases, seed=0, engines=None, max_squares=40, max_players=6, tapes_per_case=4, shrink_failures=True,
+        reference=reference_engine):
+    """
+    Compares the engines with the reference on random cases.
+
+    Args:
+        cases (int): The number of random cases (boards), each with tapes_per_case roll tapes.
+        seed (int): The seed the cases are generated from.
+        engines (dict, optional): Engine name -> engine function. Defaults to ENGINES.
+        max_squares (int): The largest board generated.
+        max_players (int): The most players generated.
+        tapes_per_case (int): The number of roll tapes played on each board.
+        shrink_failures (bool): Shrink the first mismatch to a minimal failing game.
+        reference (callable): The reference engine.
+
+    Returns:
+        dict: The number of cases and games played, the time taken, the mismatches found (at most
+              one per case) and, if any, the shrunk first mismatch.
+    """
+    engines = ENGINES if engines is None else engines
+    rng = random.Random(seed)
+    mismatches = []
+    start = time.perf_counter()
+    for index in range(cases):
+        case = random_case(rng, max_squares, max_players, tapes_per_case)
+        found = compare(case, engines, reference)
+        if found:
+            mismatches.append({"case": index, "board": case["board"], "players": case["players"], **found[0]})
+    report = {"cases": cases, "games": cases * tapes_per_case, "engines": sorted(engines),
+              "seconds": time.perf_counter() - start, "mismatches": mismatches}
+    if mismatches and shrink_failures:
+        first = mismatches[0]
+        report["shrunk"] = shrink(first["board"], first["players"], first["tape"], engines[first["engine"]], reference)
+        report["shrunk"]["engine"] = first["engine"]
+    return report
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the fast engines with the reference Game on random boards and rolls")
+    parser.add_argument("--cases", type=int, default=1000, help="Number of random boards")
+    parser.add_argument("--tapes", type=int, default=4, help="Number of roll tapes played on each board")
+    parser.add_argument("--seed", type=int, default=0, help="Seed the cases are generated from")
+    parser.add_argument("--max-squares", type=int, default=40, help="Largest board generated")
+    parser.add_argument("--max-players", type=int, default=6, help="Most players generated")
+    parser.add_argument("--engines", type=str, default=None,
+                        help=f"Comma-separated engines to compare (default: all of {','.join(ENGINES)})")
+    args = parser.parse_args()
+
+    engines = ENGINES
+    if args.engines:
+        unknown = [name for name in args.engines.split(",") if name not in ENGINES]
+        if unknown:
+            parser.error(f"unknown engines: {', '.join(unknown)}")
+        engines = {name: ENGINES[name] for name in args.engines.split(",")}
+    report = run(args.cases, args.seed, engines, args.max_squares, args.max_players, args.tapes)
+    print(f"{report['games']} games on {report['cases']} boards compared with {', '.join(report['engines'])} "
+          f"in {report['seconds']:.1f}s: {len(report['mismatches'])} mismatching boards")
+    if report["mismatches"]:
+        print("Smallest failing game:")
+        print(json.dumps(report["shrunk"], indent=2))
+        sys.exit(1)
@@ -1,33 +1,69 @@
-import json
+from collections import namedtuple
 import argparse
-import os
-from board import Board
+import loader
 from player import Player
-from actions import Actions
+from actions import Actions, PASS_GO
+from dice import DiceSource, ListDice, RandomDice, END, WRAP, ERROR, open_dice, random_roll_sequences
+from ledger import Ledger
+from tables import GO
+from records import MemoryRecordSink, NullRecordSink, TextRecordSink
+
+# Why a game stopped
+BANKRUPT = "bankrupt"           # a player is bankrupt
+OUT_OF_ROLLS = "rolls"          # the rolls ran out and the dice source ended the game
+TURN_CAP = "cap"                # the turn cap was reached
+DECIDED = "decided"             # the winner could no longer change
+
+# The result of a game played with Game.play_outcome
+GameOutcome = namedtuple("GameOutcome", ["turns", "winners", "balances", "positions", "stopped"])
+
+# Returned by Game._jump_ahead when it reaches the turn it was asked to stop at
+_PAUSED = object()
 
 class Game:
     """
     Represents a Monopoly game. Manages the board, players, dice rolls, game actions, and determines the winner.
     """
-    def __init__(self, board_file_name, dice_file_name, players) -> None:
+    def __init__(self, board_file_name, dice_file_name, players, board=None, dice=None, records=None, jump_ahead=False) -> None:
         """
         Initializes the game with the provided board layout, dice rolls, and players.
         
         Args:
             board_file_name (str): The file name containing the board layout (e.g., 'board.json').
             dice_file_name (str): The file name containing the dice roll values (e.g., 'rolls.json').
-            players (list): A list of player names to be included in the game.
+            players (list): A list of player names to be included in the game, in turn order. Any number of players can play.
+            board (Board, optional): An already loaded board. When given, board_file_name is not read.
+            dice (list or DiceSource, optional): Already loaded dice rolls, or a source that hands them
+                                                 out one at a time. When given, dice_file_name is not read.
+            records (RecordSink, optional): Where the record of each turn goes. Defaults to keeping the
+                                            records in memory and writing them to ./records/records.txt at the end.
+            jump_ahead (bool): Once every property is owned, resolve the remaining turns from fixed rent tables
+                               instead of playing them one by one (see _jump_ahead). Only used when no records are kept.
+
+        Raises:
+            ValueError: If there are no players.
         """
+        if not players:
+            raise ValueError("A game needs at least one player.")
+        self._ledger = Ledger()
         self._players = self.set_player(players)
-        self._board = self.get_board(board_file_name)
-        self._dice = self.get_dice(dice_file_name)
+        self._seats = {player: seat for seat, player in enumerate(self._players)}
+        self._board = board if board is not None else self.get_board(board_file_name)
+        self._dice = dice if dice is not None else self.get_dice(dice_file_name)
         self._current_player = None
         self._current_turn = 0
-        self._turns = []
+        self._dice_source = None
+        self._jump_ahead_enabled = jump_ahead
+        # GO passes and rents paid in the turns played by the last call of _jump_ahead
+        self._jumped_events = (0, 0)
+        self._records = records if records is not None else MemoryRecordSink()
+        self._records.begin(self._players, self._board)
         self._game_actions = Actions()
-    def get_board(self, board_file_name):
+    @staticmethod
+    def get_board(board_file_name):
         """
         Loads the board layout from the specified JSON file and validates its structure.
+        The file is only parsed and validated again once it changes (see Loader).
         
         Args:
             board_file_name (str): The file name containing the board layout (e.g., 'board.json').
@@ -40,28 +76,15 @@ class Game:
             ValueError: If the board file contains invalid data or structure.
         """
         try:
-            if not os.path.exists(board_file_name):
-                raise FileNotFoundError(f"Board file '{board_file_name}' does not exist.")
-            with open(board_file_name) as file:
-                board_data = json.load(file)
-            
-            # Validate board structure
-            for prop in board_data:
-                if not all(key in prop for key in ("name", "type")):
-                    raise ValueError(f"Invalid property structure in board file: {prop}")
-                
-            if len(board_data)>0:
-                new_board = Board(board_data)
-            else:
-                raise ValueError("Board data is invalid.")
-            
-            return new_board
+            return loader.default_loader.load_board(board_file_name)
         except Exception as e:
             raise ValueError(f"Error loading board file: {e}")
 
-    def get_dice(self, dice_file_name):
+    @staticmethod
+    def get_dice(dice_file_name):
         """
         Loads the dice rolls from the specified JSON file and validates its structure.
+        The file is only parsed and validated again once it changes (see Loader).
         
         Args:
             dice_file_name (str): The file name containing the dice roll values (e.g., 'rolls.json').
@@ -74,17 +97,7 @@ class Game:
             ValueError: If the dice file is not structured correctly.
         """
         try:
-            if not os.path.exists(dice_file_name):
-                raise FileNotFoundError(f"Rolls file '{dice_file_name}' does not exist.")
-            
-            with open(dice_file_name) as file:
-                dice_data = json.load(file)
-            
-            # Validate rolls structure
-            if not isinstance(dice_data, list) or not all(isinstance(roll, int) for roll in dice_data):
-                raise ValueError("Rolls file must contain a list of integers.")
-            
-            return dice_data
+            return loader.default_loader.load_dice(dice_file_name)
         except Exception as e:
             raise ValueError(f"Error loading rolls file: {e}")
     def set_player(self, players_name):
@@ -99,20 +112,18 @@ class Game:
         """
         players = []
         for player_name in players_name:
-            new_player = Player(player_name)
+            new_player = Player(player_name, self._ledger)
             players.append(new_player)
         return players
     def check_bankrupt(self):
         """
         Checks if any player is bankrupt (balance is less than or equal to zero).
+        The ledger counts bankrupt players as balances change, so no players are scanned.
         
         Returns:
             bool: True if any player is bankrupt, otherwise False.
         """
-        for player in self._players:
-            if player.get_balance()<=0:
-                return True
-        return False
+        return self._ledger.has_bankrupt()
     def determine_winner(self):
         """
         Determines the winner(s) based on the highest balance among the players.
@@ -120,11 +131,8 @@ class Game:
         Returns:
             list[str]: A list of player names who have the highest balance.
         """
-        # Find the maximum balance among players
-        max_balance = max(player.get_balance() for player in self._players)
-        # Find all players with the maximum balance
-        winners = [player.name for player in self._players if player.get_balance() == max_balance]
-        return winners
+        # The ledger keeps the players ranked as balances change, so this works at any turn
+        return [player.name for player in self._ledger.leaders()]
 
     def declare_winner(self):
         """
@@ -139,7 +147,8 @@ class Game:
             print(player.name+" end up with: $"+str(player.get_balance())+" at "+ finish_space + "\n")
         
         print("The Winner is "+ ''.join(self.determine_winner()))
-        print("Details of each turns has saved at records.txt")
+        if self._records.enabled:
+            print("Details of each turns has saved at records.txt")
     def play_turn(self, steps):
         """
         Simulates a player's turn, including rolling the dice, moving, paying rent, and potentially buying a property.
@@ -152,68 +161,582 @@ class Game:
         """
         if (steps<=0):
             raise ValueError(f"Rolls {steps} is out of bounds.")
-        # Prepare the action message
-        action = f"\n{self._current_player.name}'s turn! Rolling dice: {steps} \n"
+        # Turns are recorded as events; the sinks that show action messages build them from the events
+        events = [] if self._records.enabled else None
         player = self._current_player
         previous_position = player.get_current_position()
-        action += self._game_actions.pass_go(player, steps, self._board.get_board_len())
+        self._game_actions.pass_go(player, steps, self._board.get_board_len(), events)
         new_position = player.move(steps, self._board.get_board_len())
         landed_property = self._board.get_property(new_position)
-        action += f"{player.name} moves from {previous_position} to {new_position} ({landed_property.name})\n"
+        tables = self._board.tables
         # Perform actions based on the property type
-        if landed_property.type != "go":
-            action += self._game_actions.rent(player, landed_property, self._board)
-            action += self._game_actions.buy_property(player, landed_property)
+        if tables.types[new_position] != GO:
+            if not self._game_actions.rent(player, landed_property, self._board, events):
+                self._game_actions.buy_property(player, landed_property, events)
             # add more actions if needed
+        if events is None:
+            return
+        # Combine the events of the turn
+        flags = 0
+        amount = 0
+        counterparty = -1
+        for code, value, other in events:
+            flags |= code
+            if code != PASS_GO:
+                amount = value
+            if other is not None:
+                counterparty = self._seats[other]
         # Record turn
-        self._turns.append({
+        self._records.write({
             "player": self._current_player.name,
             "roll": steps,
             "balance": self._current_player.get_balance(),
-            "position": landed_property.name,
-            "action": action
+            "position": tables.names[new_position],
+            "seat": self._seats[player],
+            "from": previous_position,
+            "to": new_position,
+            "flags": flags,
+            "amount": amount,
+            "counterparty": counterparty,
         })
     def start_game(self):
         """
         Starts the game by initializing the first player and looping through turns until a player is bankrupt.
         Once the game is over, it declares the winner and records the turn details.
         """
+        self.play_game()
+        self.declare_winner()
+        self.records_turns()
+    def play_game(self):
+        """
+        Plays the game from GO until a player is bankrupt, without printing or writing any records.
+        If the dice rolls run out first, the dice source decides whether the game ends there,
+        the rolls start again, or an IndexError is raised.
+        """
         # start at Go
         self._current_player = self._players[0]
         self._current_turn = 0
-        # Loop through turns until a player is bankrupt
+        self._dice_source = self._dice if isinstance(self._dice, DiceSource) else ListDice(self._dice)
+        self._play_turns()
+    def play_outcome(self, max_turns=None, stop_when_decided=False):
+        """
+        Plays the game from GO for its outcome only: no turn records are built, whatever the
+        record sink, and nothing is printed or written.
+
+        With stop_when_decided, the game stops as soon as one player is so far ahead that no
+        one can catch up in the turns that can still be played. That needs a bound on those
+        turns: the turn cap, or the rolls left of a dice source that ends the game when they
+        run out (see DiceSource.remaining). The outcome then holds the balances and squares at
+        the turn the game stopped, and errors the remaining rolls would have raised are not raised.
+
+        Args:
+            max_turns (int, optional): Stop after this many turns. Defaults to no cap.
+            stop_when_decided (bool): Stop once the winner can no longer change.
+
+        Returns:
+            GameOutcome: The number of turns played, the winner(s), each player's balance and
+                         square (in seat order), and why the game stopped.
+        """
+        records = self._records
+        self._records = NullRecordSink()
+        try:
+            self._current_player = self._players[0]
+            self._current_turn = 0
+            self._dice_source = self._dice if isinstance(self._dice, DiceSource) else ListDice(self._dice)
+            stopped = self._play_turns(max_turns, stop_when_decided)
+        finally:
+            self._records = records
+        return GameOutcome(self._current_turn, tuple(self.determine_winner()),
+                           tuple(player.get_balance() for player in self._players),
+                           tuple(player.get_current_position() for player in self._players), stopped)
+    def resume_game(self):
+        """
+        Continues the game from its current turn (e.g. after restore or fork) until a player is
+        bankrupt, without printing or writing any records.
+        """
+        if self._dice_source is None:
+            self._dice_source = self._dice if isinstance(self._dice, DiceSource) else ListDice(self._dice)
+            self._dice_source.seek(self._current_turn)
+        self._play_turns()
+    def _play_turns(self, max_turns=None, stop_when_decided=False):
+        """
+        Plays turns from the current player until a player is bankrupt or the rolls run out, or
+        the game is stopped early (see play_outcome).
+
+        Returns:
+            str: Why the game stopped: BANKRUPT, OUT_OF_ROLLS, TURN_CAP or DECIDED.
+        """
+        players = self._players
+        num_players = len(players)
+        seat = self._current_turn % num_players
+        # Turns played without records only change balances and positions, so they can be jumped over
+        jump_ahead = self._jump_ahead_enabled and not self._records.enabled
+        # The next turn at which to check whether the winner is decided, and the next turn to stop at
+        cap = max_turns if max_turns is not None else float("inf")
+        stop_turn = min(cap, self._current_turn) if stop_when_decided else cap
+        if stop_when_decided:
+            tables = self._board.tables
+            step = 1 + max(max(tables.prices, default=0), 4 * max(tables.rents, default=0))
+        # Loop through turns until a player is bankrupt or the rolls run out
         while self.check_bankrupt() is not True:
-            self.play_turn(self._dice[self._current_turn])
+            if self._current_turn >= stop_turn:
+                if self._current_turn >= cap:
+                    return TURN_CAP
+                wait = self._turns_until_decided(max_turns, step)
+                if wait == 0:
+                    return DECIDED
+                stop_turn = min(cap, self._current_turn + wait) if wait is not None else cap
+            if jump_ahead and self._board.all_owned():
+                # Returns the roll it could not resolve, or None once the game is over
+                steps = self._jump_ahead(stop_turn)
+                seat = self._current_turn % num_players
+                if steps is _PAUSED:
+                    continue
+            else:
+                steps = self._dice_source.next_roll()
+            if steps is None:
+                break
+            self.play_turn(steps)
             self._current_turn += 1
-            self._current_player= self._players[self._current_turn%4]
-        self.declare_winner()
-        self.records_turns()
+            # Pass the turn to the next seat, back to the first after the last
+            seat += 1
+            if seat == num_players:
+                seat = 0
+            self._current_player = players[seat]
+        return BANKRUPT if self.check_bankrupt() else OUT_OF_ROLLS
+    def _turns_until_decided(self, max_turns, step):
+        """
+        Works out whether the leader can still be caught. In one turn the gap between the two
+        highest balances changes by at most one plus the largest of any price and four times any
+        rent (a doubled rent paid by one of them to the other), so a leader further ahead than
+        that times the turns left has won. The gap can also grow by no more than that per turn,
+        which gives the earliest turn at which it is worth checking again.
+
+        Args:
+            max_turns (int, optional): The turn cap.
+            step (int): The most the gap can change in one turn.
+
+        Returns:
+            int: 0 if the winner is decided, otherwise the number of turns before it can be, or
+                 None if it cannot be as no bound on the turns left is known.
+        """
+        if len(self._players) == 1:
+            return 0
+        bounds = [self._dice_source.remaining()]
+        if max_turns is not None:
+            bounds.append(max_turns - self._current_turn)
+        bounds = [bound for bound in bounds if bound is not None]
+        if not bounds:
+            return None
+        second, best = sorted(player.get_balance() for player in self._players)[-2:]
+        margin = best - second - min(bounds) * step
+        if margin > 0:
+            return 0
+        return -margin // (2 * step) + 1
+    def _jump_ahead(self, stop_turn=None):
+        """
+        Plays turns once every property is owned. Ownership can no longer change, so neither can
+        monopolies: every turn is a move, $1 for passing GO, and a fixed rent paid to a fixed
+        seat. The rents (doubled for monopolies) are worked out once per square, and the turns
+        are played on plain lists of balances and positions that are written back to the players
+        at the end. Only the player whose turn it is can lose money, so only they are checked
+        for bankruptcy. The GO passes and rents paid are left in _jumped_events.
+
+        Args:
+            stop_turn (int or float, optional): Stop before playing this turn, returning _PAUSED.
+
+        Returns:
+            int: A roll the fast path cannot play (it is invalid or moves the player off the board),
+                 to be played normally so it fails the same way, or None if a player is bankrupt or
+                 the rolls ran out.
+        """
+        board = self._board
+        board_len = board.get_board_len()
+        players = self._players
+        num_players = len(players)
+        # The rent paid on each square and the seat it is paid to (GO squares cost nothing)
+        tables = board.tables
+        # Seats of the owners known to the board (owners that are not players never own a square in a game)
+        seats = [self._seats.get(owner) for owner in tables.owner_objects]
+        rents = [0] * board_len
+        owners = [None] * board_len
+        for square in range(board_len):
+            if tables.types[square] != GO:
+                rents[square], owner_id = tables.rent_due(square)
+                owners[square] = seats[owner_id]
+        balances = [player.get_balance() for player in players]
+        positions = [player.get_current_position() for player in players]
+        next_roll = self._dice_source.next_roll
+        turn = self._current_turn
+        seat = turn % num_players
+        if stop_turn is None:
+            stop_turn = -1
+        # Counted as Actions would count them, for profiling
+        go_passes = rents_paid = 0
+        try:
+            while True:
+                if turn == stop_turn:
+                    return _PAUSED
+                steps = next_roll()
+                if steps is None or steps <= 0:
+                    return steps
+                position = positions[seat] + steps
+                if position >= board_len:
+                    position -= board_len
+                    if position >= board_len:
+                        return steps
+                    balances[seat] += 1
+                    go_passes += 1
+                positions[seat] = position
+                owner = owners[position]
+                if owner is not None:
+                    rent = rents[position]
+                    balances[owner] += rent
+                    balances[seat] -= rent
+                    rents_paid += 1
+                turn += 1
+                bankrupt = balances[seat] <= 0
+                seat += 1
+                if seat == num_players:
+                    seat = 0
+                if bankrupt:
+                    return None
+        finally:
+            # Write the balances back through the players so the ledger sees them
+            for player, balance, position in zip(players, balances, positions):
+                if player.get_balance() != balance:
+                    player._balance = balance
+                player._current_position = position
+            self._current_turn = turn
+            self._current_player = players[seat]
+            self._jumped_events = (go_passes, rents_paid)
+    def reset(self, dice):
+        """
+        Prepares the game for a new round on the same board with a new sequence of dice rolls.
+        Players and properties are reset in place rather than being rebuilt.
+
+        Args:
+            dice (list or DiceSource): The dice rolls for the new game.
+        """
+        for player in self._players:
+            # Only the properties that were bought need their owner cleared
+            for owned_property in player._owned_properties:
+                owned_property.set_owner(None)
+            player.reset()
+        self._dice = dice
+        self._dice_source = None
+        self._current_player = None
+        self._current_turn = 0
+        self._records.reset()
+    def snapshot(self):
+        """
+        Captures the complete state of the game: players, balances, positions, ownership, the
+        turn index and how many dice rolls have been used. The snapshot only holds names and
+        integers, so it can be saved as JSON.
+
+        Returns:
+            dict: The snapshot.
+        """
+        return {
+            "players": [
+                {
+                    "name": player.name,
+                    "balance": player.get_balance(),
+                    "position": player.get_current_position(),
+                    "properties": [owned_property.index for owned_property in player._owned_properties],
+                }
+                for player in self._players
+            ],
+            "turn": self._current_turn,
+            "dice_position": self._dice_source.position if self._dice_source is not None else self._current_turn,
+        }
+    def restore(self, snapshot, seek_dice=True):
+        """
+        Puts the game back in the state captured by a snapshot, ready for resume_game.
+
+        Args:
+            snapshot (dict): A snapshot taken by Game.snapshot, of a game on the same board with the same number of players.
+            seek_dice (bool): Continue the game's dice from where the snapshot left off. When False the dice
+                              are used from their first roll, e.g. to try a different continuation.
+
+        Raises:
+            ValueError: If the snapshot has a different number of players.
+        """
+        if len(snapshot["players"]) != len(self._players):
+            raise ValueError(f"Snapshot has {len(snapshot['players'])} players, the game has {len(self._players)}.")
+        for player in self._players:
+            for owned_property in player._owned_properties:
+                owned_property.set_owner(None)
+        for player, saved in zip(self._players, snapshot["players"]):
+            player._balance = saved["balance"]
+            player._current_position = saved["position"]
+            player._owned_properties = [self._board.get_property(index) for index in saved["properties"]]
+            for owned_property in player._owned_properties:
+                owned_property.set_owner(player)
+        self._current_turn = snapshot["turn"]
+        self._current_player = self._players[self._current_turn % len(self._players)]
+        self._dice_source = self._dice if isinstance(self._dice, DiceSource) else ListDice(self._dice)
+        if seek_dice:
+            self._dice_source.seek(snapshot["dice_position"])
+        else:
+            self._dice_source.rewind()
+    @classmethod
+    def from_snapshot(cls, board, snapshot, dice, records=None):
+        """
+        Creates a game in the state captured by a snapshot, ready for resume_game.
+
+        Args:
+            board (Board): The board the snapshot was taken on. Its properties must not be owned.
+            snapshot (dict): A snapshot taken by Game.snapshot.
+            dice (list or DiceSource): The dice rolls of the game, continued from where the snapshot left off.
+            records (RecordSink, optional): Where the record of each turn goes.
+
+        Returns:
+            Game: The restored game.
+        """
+        game = cls(None, None, [saved["name"] for saved in snapshot["players"]], board=board, dice=dice, records=records)
+        game.restore(snapshot)
+        return game
+    def fork(self, dice=None, records=None):
+        """
+        Creates an independent copy of the game in its current state, e.g. to try many different
+        rolls from the same turn without replaying the turns before it. The copy has its own
+        board and players; the dice rolls list is shared, not copied.
+
+        The fork copies eagerly rather than on write: the board layout tables are shared, but the
+        copy gets a new ownership table (one slot per square) and new players at once, and the
+        owned squares are set again from a snapshot. A fork therefore costs time and memory in
+        proportion to the board length, even if the branch never buys a square. Copy on write would
+        need a check on every ownership write and rent lookup, which the turn loops read directly,
+        so it would slow every turn of every game to save a copy made once per branch.
+
+        Args:
+            dice (list or DiceSource, optional): The rolls to continue the copy with, from their first roll.
+                                                 Defaults to continuing this game's own rolls.
+            records (RecordSink, optional): Where the copy's turn records go. Defaults to no records.
+
+        Returns:
+            Game: The copy, ready for resume_game.
+
+        Raises:
+            ValueError: If no dice are given and this game reads its rolls from a dice source,
+                        which cannot be shared between games.
+        """
+        if dice is None and isinstance(self._dice, DiceSource):
+            raise ValueError("A game playing from a dice source can only be forked with new dice.")
+        game = Game(None, None, [player.name for player in self._players], board=self._board.copy(),
+                    dice=dice if dice is not None else self._dice,
+                    records=records if records is not None else NullRecordSink(), jump_ahead=self._jump_ahead_enabled)
+        game.restore(self.snapshot(), seek_dice=dice is None)
+        return game
+    def get_result(self):
+        """
+        Summarises the outcome of a finished game.
+
+        Returns:
+            dict: The number of turns played, the winner(s), and each player's final balance and square.
+        """
+        return {
+            "turns": self._current_turn,
+            "winners": self.determine_winner(),
+            "players": [
+                {
+                    "name": player.name,
+                    "balance": player.get_balance(),
+                    "position": self._board.get_property(player.get_current_position()).name,
+                }
+                for player in self._players
+            ],
+        }
     def records_turns(self):
         """
-        Saves the details of each turn (including player actions, rolls, and balances) to a text file.
+        Finishes the records of the game. Depending on the record sink, the details of each turn
+        (including player actions, rolls, and balances) are written to a text file now, have
+        already been streamed to it, or were not kept at all.
         
         Returns:
             None
         """
-        with open("./records/records.txt", "w") as file:
-            file.write("Game Turns:\n")
-            file.write("-"*20+"\n")
-            for i, turn in enumerate(self._turns):
-                file.write(
-                    f"Turn {i}: Player: {turn['player']}, "
-                    f"Roll: {turn['roll']}, Position: {turn['position']}, "
-                    f"Balance: ${turn['balance']}, Position: {turn['action']}\n"
-                )
+        self._records.close()
+# The players of the original game, used when no players are given
+DEFAULT_PLAYERS = ["Peter", "Billy", "Charlotte", "Sweedal"]
+def player_names(names=None, count=None):
+    """
+    Works out the names of the players from the command line options.
+
+    Args:
+        names (str, optional): Comma-separated player names, in turn order.
+        count (int, optional): The number of players, named 'Player 1', 'Player 2', ...
+
+    Returns:
+        list[str]: The player names. Defaults to DEFAULT_PLAYERS.
+
+    Raises:
+        ValueError: If there are fewer than two players or two players share a name.
+    """
+    if names is not None:
+        players = [name.strip() for name in names.split(",") if name.strip()]
+    elif count is not None:
+        players = [f"Player {seat + 1}" for seat in range(count)]
+    else:
+        players = list(DEFAULT_PLAYERS)
+    if len(players) < 2:
+        raise ValueError(f"At least 2 players are needed, got {len(players)}.")
+    if len(set(players)) != len(players):
+        raise ValueError("Player names must be unique.")
+    return players
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Pronto Woven Monopoly Game")
     parser.add_argument("board_file", type=str, help="Path to the board JSON file")
-    parser.add_argument("rolls_file", type=str, help="Path to the rolls JSON file")
+    parser.add_argument("rolls_file", type=str, nargs="?", default=None,
+                        help="Path to the rolls JSON file (with --batch: a directory of rolls files or a JSONL file). "
+                             "Not needed with --seed")
+    players_group = parser.add_mutually_exclusive_group()
+    players_group.add_argument("--players", type=str, default=None,
+                               help="Comma-separated player names, in turn order (default: Peter,Billy,Charlotte,Sweedal)")
+    players_group.add_argument("--num-players", type=int, default=None,
+                               help="Play with this many players, named 'Player 1', 'Player 2', ...")
+    parser.add_argument("--records", type=str, default=None,
+                        help="Path of the file the turn records are streamed to (default: ./records/records.txt, "
+                             "or ./records/records.bin with --records-format binary)")
+    parser.add_argument("--flush-interval", type=int, default=64,
+                        help="Number of turns buffered before the records are written to disk")
+    parser.add_argument("--records-format", choices=["text", "binary"], default="text",
+                        help="Write the turn records as text, or as a compact binary turn log")
+    parser.add_argument("--no-records", action="store_true",
+                        help="Do not keep any turn records")
+    parser.add_argument("--stream-rolls", action="store_true",
+                        help="Read the rolls lazily: a JSON list (.json), one byte per roll (.bin, .u8) or one roll per line")
+    parser.add_argument("--on-exhausted", choices=[END, WRAP, ERROR], default=ERROR,
+                        help="What to do when the rolls run out: end the game, start the rolls again, or stop with an error")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Generate the rolls from this seed instead of reading a rolls file")
+    parser.add_argument("--games", type=int, default=1,
+                        help="With --seed and --batch, the number of games to play")
+    parser.add_argument("--dice-faces", type=int, default=6, help="With --seed, the number of faces of each die")
+    parser.add_argument("--dice-count", type=int, default=1, help="With --seed, the number of dice rolled each turn")
+    parser.add_argument("--max-rolls", type=int, default=None,
+                        help="With --seed, the number of rolls generated per game before the rolls run out")
+    parser.add_argument("--numpy-dice", action="store_true",
+                        help="With --seed, generate the rolls in blocks with NumPy")
+    parser.add_argument("--cache-dir", type=str, default=None,
+                        help="Directory where parsed board and rolls files are cached between runs")
+    parser.add_argument("--batch", action="store_true",
+                        help="Play one game per rolls sequence and print one JSON result row per game")
+    parser.add_argument("--output", type=str, default=None,
+                        help="With --batch, write the result rows to this file instead of stdout")
+    parser.add_argument("--summary", type=str, default=None,
+                        help="With --batch, write win rates, game lengths, final balances and finishing squares "
+                             "to this file (CSV if it ends in .csv, otherwise JSON). The result rows are then only "
+                             "written with --output")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="With --batch, play games on this many worker processes")
+    parser.add_argument("--chunk-size", type=int, default=64,
+                        help="With --workers, the number of games sent to a worker at a time")
+    parser.add_argument("--max-turns", type=int, default=None,
+                        help="With --batch, stop each game after this many turns")
+    parser.add_argument("--stop-when-decided", action="store_true",
+                        help="With --batch, stop each game once its winner can no longer change (needs --max-turns, "
+                             "or --max-rolls with --on-exhausted end)")
+    parser.add_argument("--checkpoint", type=str, default=None,
+                        help="With --seed and --batch, save the progress of the sweep to this file every so often, "
+                             "and resume from it if it exists. Needs --output or --summary")
+    parser.add_argument("--checkpoint-every", type=int, default=10000,
+                        help="With --checkpoint, the number of games played between checkpoints")
+    parser.add_argument("--engine", choices=["object", "vectorized"], default="object",
+                        help="With --batch, the simulation engine (vectorized requires NumPy)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print counters and the time spent in each phase of the game")
+    parser.add_argument("--profile-stats", type=str, default=None,
+                        help="With --profile, also run under cProfile and save the stats to this file")
     args = parser.parse_args()
+    if args.rolls_file is None and args.seed is None:
+        parser.error("a rolls file or --seed is required")
+    if args.engine == "vectorized" and (args.max_turns is not None or args.stop_when_decided):
+        parser.error("--max-turns and --stop-when-decided are not supported by the vectorized engine")
+    if args.checkpoint is not None:
+        if not args.batch or args.seed is None or args.engine == "vectorized":
+            parser.error("--checkpoint needs --batch and --seed, and the object engine")
+        if args.output is None and args.summary is None:
+            parser.error("--checkpoint needs --output or --summary")
+    try:
+        players = player_names(args.players, args.num_players)
+    except ValueError as e:
+        parser.error(str(e))
+    dice_settings = {"faces": args.dice_faces, "count": args.dice_count, "max_rolls": args.max_rolls,
+                     "on_exhausted": args.on_exhausted, "use_numpy": args.numpy_dice}
 
+    profile = profiler = None
+    if args.profile:
+        import cProfile
+        import game as game_module
+        from profiling import Instrumentation
+        profile = Instrumentation(game_classes={Game, game_module.Game})
+        profile.install()
+        if args.profile_stats:
+            profiler = cProfile.Profile()
+            profiler.enable()
     try:
+        loader.default_loader.cache_dir = args.cache_dir
         # Initialize and play the game
-        players = ["Peter", "Billy", "Charlotte", "Sweedal"]
-        game = Game(args.board_file, args.rolls_file, players)
-        game.start_game()
+        if args.checkpoint is not None:
+            from sweep import SweepRunner
+            sweep = SweepRunner(args.board_file, players, args.seed, args.games, args.checkpoint,
+                                args.checkpoint_every, args.output, dice_settings, args.workers, args.chunk_size,
+                                args.max_turns, args.stop_when_decided)
+            aggregator = sweep.run()
+            if args.summary:
+                aggregator.write(args.summary)
+        elif args.batch:
+            from batch import BatchRunner, read_roll_sequences, write_results
+            if args.engine == "vectorized":
+                from vectorized import VectorizedRunner
+                runner = VectorizedRunner(args.board_file, players)
+            elif args.workers:
+                from parallel import ParallelRunner
+                runner = ParallelRunner(args.board_file, players, args.workers, args.chunk_size,
+                                        max_turns=args.max_turns, stop_when_decided=args.stop_when_decided)
+            else:
+                runner = BatchRunner(args.board_file, players, max_turns=args.max_turns,
+                                     stop_when_decided=args.stop_when_decided)
+            if args.seed is not None:
+                roll_sequences = random_roll_sequences(args.seed, args.games, **dice_settings)
+            else:
+                roll_sequences = read_roll_sequences(args.rolls_file)
+            results = runner.run(roll_sequences)
+            if args.summary:
+                from aggregate import ResultAggregator
+                aggregator = ResultAggregator(players)
+                results = aggregator.consume(results)
+                if args.output is None:
+                    # Only the summary is wanted
+                    for _ in results:
+                        pass
+            if args.output is not None or not args.summary:
+                write_results(results, args.output)
+            if args.summary:
+                aggregator.write(args.summary)
+        else:
+            if args.no_records:
+                records = NullRecordSink()
+            elif args.records_format == "binary":
+                from turnlog import BinaryRecordSink
+                records = BinaryRecordSink(args.records or "./records/records.bin", args.flush_interval)
+            else:
+                records = TextRecordSink(args.records or "./records/records.txt", args.flush_interval)
+            if args.seed is not None:
+                dice = RandomDice(args.seed, 0, **dice_settings)
+            elif args.stream_rolls:
+                dice = open_dice(args.rolls_file, args.on_exhausted)
+            else:
+                dice = ListDice(Game.get_dice(args.rolls_file), args.on_exhausted)
+            game = Game(args.board_file, None, players, dice=dice, records=records, jump_ahead=True)
+            game.start_game()
     except Exception as e:
-        print(f"Error: {e}")
\ No newline at end of file
+        print(f"Error: {e}")
+    if profile is not None:
+        profile.uninstall()
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile_stats)
+        print(profile.summary())
\ No newline at end of file
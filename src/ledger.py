@@ -0,0 +1,89 @@
+from heapq import heapify, heappop, heappush
+
+class Ledger:
+    """
+    The Ledger class keeps track of the players' balances as they change, so the game can tell
+    whether a player is bankrupt and who is leading at any turn without scanning every player.
+    Players notify the ledger whenever their balance changes.
+    """
+    __slots__ = ("_players", "_seats", "_holders", "_heap", "_bankrupt")
+    def __init__(self) -> None:
+        """
+        Initializes an empty ledger.
+        """
+        self._players = []      # registered players, in seat order
+        self._seats = {}        # player -> seat
+        self._holders = {}      # balance -> seats of the players with that balance
+        self._heap = []         # negated balances, may contain balances nobody holds any more
+        self._bankrupt = 0      # number of players with a balance of zero or less
+    def register(self, player):
+        """
+        Adds a player to the ledger. Players are ranked in the order they are registered.
+
+        Args:
+            player (Player): The player to track.
+        """
+        seat = len(self._players)
+        self._players.append(player)
+        self._seats[player] = seat
+        self._add(seat, player.get_balance())
+    def update(self, player, previous_balance, balance):
+        """
+        Records a change in a player's balance. Called by Player whenever its balance is set.
+
+        Args:
+            player (Player): The player whose balance changed.
+            previous_balance (int): The balance before the change.
+            balance (int): The balance after the change.
+        """
+        seat = self._seats.get(player)
+        if seat is None:
+            return
+        self._remove(seat, previous_balance)
+        self._add(seat, balance)
+    def has_bankrupt(self):
+        """
+        Checks if any player is bankrupt (balance is less than or equal to zero).
+
+        Returns:
+            bool: True if any player is bankrupt, otherwise False.
+        """
+        return self._bankrupt > 0
+    def leaders(self):
+        """
+        Retrieves the player(s) with the highest balance.
+
+        Returns:
+            list[Player]: The players with the highest balance, in seat order.
+        """
+        if not self._players:
+            return []
+        # Drop balances nobody holds any more
+        while -self._heap[0] not in self._holders:
+            heappop(self._heap)
+        return [self._players[seat] for seat in sorted(self._holders[-self._heap[0]])]
+    def _add(self, seat, balance):
+        """
+        Adds a seat to the holders of a balance.
+        """
+        holders = self._holders.get(balance)
+        if holders is None:
+            holders = self._holders[balance] = set()
+            heappush(self._heap, -balance)
+            # Rebuild the heap if stale balances pile up
+            if len(self._heap) > 4 * len(self._holders) + 16:
+                self._heap = [-held for held in self._holders]
+                heapify(self._heap)
+        holders.add(seat)
+        if balance <= 0:
+            self._bankrupt += 1
+    def _remove(self, seat, balance):
+        """
+        Removes a seat from the holders of a balance.
+        """
+        holders = self._holders[balance]
+        holders.discard(seat)
+        if not holders:
+            del self._holders[balance]
+        if balance <= 0:
+            self._bankrupt -= 1
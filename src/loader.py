@@ -0,0 +1,185 @@
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import pickle
+from board import Board
+from compact import build_tables, is_compact
+
+def validate_board(board_data):
+    """
+    Checks the structure of board data, as read from a board file.
+
+    Args:
+        board_data (list): The board data, one dictionary per square.
+
+    Raises:
+        ValueError: If the board data is not a non-empty list of valid squares.
+    """
+    if not isinstance(board_data, list):
+        raise ValueError("Board data is invalid.")
+    for prop in board_data:
+        if not isinstance(prop, dict) or not all(key in prop for key in ("name", "type")):
+            raise ValueError(f"Invalid property structure in board file: {prop}")
+        if prop["type"] != "go" and not all(key in prop for key in ("price", "colour")):
+            raise ValueError(f"Invalid property structure in board file: {prop}")
+    if len(board_data) <= 0:
+        raise ValueError("Board data is invalid.")
+def validate_dice(dice_data):
+    """
+    Checks the structure of dice rolls, as read from a rolls file.
+
+    Args:
+        dice_data (list): The dice rolls.
+
+    Raises:
+        ValueError: If the rolls are not a list of integers.
+    """
+    if not isinstance(dice_data, list) or not all(isinstance(roll, int) for roll in dice_data):
+        raise ValueError("Rolls file must contain a list of integers.")
+
+class Loader:
+    """
+    Loads and validates board and rolls files. Each file is parsed and validated once: the
+    result is cached in memory, keyed by the file's path, modification time and size, so a
+    file is only read again after it changes. Parsed files can also be cached on disk so that
+    later runs skip parsing and validation too. The column files of a compact board are cached
+    with it, keyed by the board file: touch the board file after changing them.
+    """
+    def __init__(self, max_entries=32, cache_dir=None) -> None:
+        """
+        Args:
+            max_entries (int): The number of parsed files kept in memory; the least recently used is dropped first.
+            cache_dir (str, optional): A directory for the on-disk cache. Defaults to no on-disk cache.
+        """
+        self._max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._cache = OrderedDict()
+    def load_board(self, board_file_name):
+        """
+        Loads the board layout from the specified JSON file, either a list of squares or a compact
+        board (see compact.build_tables).
+
+        Args:
+            board_file_name (str): The file name containing the board layout (e.g., 'board.json').
+
+        Returns:
+            Board: A new Board object, with no properties owned.
+
+        Raises:
+            FileNotFoundError: If the board file does not exist.
+            ValueError: If the board file contains invalid data or structure.
+        """
+        if not os.path.exists(board_file_name):
+            raise FileNotFoundError(f"Board file '{board_file_name}' does not exist.")
+        board_data = self._load("board", board_file_name, self._parse_board)
+        if isinstance(board_data, list):
+            return Board(board_data)
+        # A compact board is cached as its tables, whose layout the new board shares
+        return Board.from_tables(board_data.copy())
+    def load_dice(self, dice_file_name):
+        """
+        Loads the dice rolls from the specified JSON file.
+
+        Args:
+            dice_file_name (str): The file name containing the dice roll values (e.g., 'rolls.json').
+
+        Returns:
+            list: A new list of integers representing the dice rolls for each turn.
+
+        Raises:
+            FileNotFoundError: If the dice file does not exist.
+            ValueError: If the dice file is not structured correctly.
+        """
+        if not os.path.exists(dice_file_name):
+            raise FileNotFoundError(f"Rolls file '{dice_file_name}' does not exist.")
+        return list(self._load("rolls", dice_file_name, self._parse_dice))
+    def clear(self):
+        """
+        Empties the in-memory cache.
+        """
+        self._cache.clear()
+    def _parse_board(self, file_name):
+        """
+        Reads and validates a board file. A board file in the compact format (see
+        compact.build_tables) is expanded into its tables.
+
+        Returns:
+            list[dict] or BoardTables: The board data, one dictionary per square, or the tables of a compact board.
+        """
+        with open(file_name) as file:
+            board_data = json.load(file)
+        if is_compact(board_data):
+            return build_tables(board_data, os.path.dirname(os.path.abspath(file_name)))
+        validate_board(board_data)
+        return board_data
+    def _parse_dice(self, file_name):
+        """
+        Reads and validates a rolls file.
+
+        Returns:
+            tuple: The dice rolls.
+        """
+        with open(file_name) as file:
+            dice_data = json.load(file)
+        validate_dice(dice_data)
+        return tuple(dice_data)
+    def _load(self, kind, file_name, parse):
+        """
+        Returns the parsed content of a file from the in-memory cache, the on-disk cache, or by
+        parsing the file, in that order.
+
+        Args:
+            kind (str): The kind of file ('board' or 'rolls').
+            file_name (str): The file to load.
+            parse (callable): Reads and validates the file.
+
+        Returns:
+            The parsed content, which must not be modified by the caller.
+        """
+        stat = os.stat(file_name)
+        key = (kind, os.path.abspath(file_name), stat.st_mtime_ns, stat.st_size)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        data = self._read_disk_cache(key)
+        if data is None:
+            data = parse(file_name)
+            self._write_disk_cache(key, data)
+        self._cache[key] = data
+        if len(self._cache) > self._max_entries:
+            self._cache.popitem(last=False)
+        return data
+    def _disk_cache_path(self, key):
+        """
+        Returns the path of the on-disk cache entry of a file, which only depends on its kind and path.
+        """
+        digest = hashlib.sha1(f"{key[0]}:{key[1]}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{key[0]}-{digest}.pickle")
+    def _read_disk_cache(self, key):
+        """
+        Returns the cached content of a file from disk, or None if it is missing or out of date.
+        """
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._disk_cache_path(key), "rb") as file:
+                cached_key, data = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return None
+        return data if cached_key == key else None
+    def _write_disk_cache(self, key, data):
+        """
+        Saves the parsed content of a file to disk, replacing any older entry atomically.
+        """
+        if self.cache_dir is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._disk_cache_path(key)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as file:
+            pickle.dump((key, data), file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, path)
+
+# Loader used by Game.get_board and Game.get_dice
+default_loader = Loader()
@@ -0,0 +1,109 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import os
+from game import Game
+from batch import BatchRunner
+
+# Batch runner of the current worker process, created once by _init_worker
+_worker_runner = None
+
+def _init_worker(board, players, max_turns=None, stop_when_decided=False):
+    """
+    Sets up a worker process with its own batch runner on the already parsed board.
+
+    Args:
+        board (Board): The board layout shared by every game.
+        players (list): A list of player names to be included in each game.
+        max_turns (int, optional): Stop each game after this many turns.
+        stop_when_decided (bool): Stop each game once its winner can no longer change.
+    """
+    global _worker_runner
+    _worker_runner = BatchRunner(None, players, board=board, max_turns=max_turns, stop_when_decided=stop_when_decided)
+def _run_chunk(chunk):
+    """
+    Plays a chunk of games in a worker process.
+
+    Args:
+        chunk (list): Tuples of (game index, sequence name, dice rolls).
+
+    Returns:
+        list[dict]: One result row per game, in the order of the chunk.
+    """
+    return [{"game": index, "source": source, **_worker_runner.run_game(dice)} for index, source, dice in chunk]
+
+class ParallelRunner:
+    """
+    Plays many games on the same board across a pool of worker processes. The board is parsed
+    once in the parent process and handed to each worker when it starts. Results are returned
+    in input order, so the output does not depend on how the games were scheduled.
+    """
+    def __init__(self, board_file_name, players, workers=None, chunk_size=64, board=None, max_turns=None,
+                 stop_when_decided=False) -> None:
+        """
+        Loads the board and stores the pool settings.
+
+        Args:
+            board_file_name (str): The file name containing the board layout (e.g., 'board.json').
+            players (list): A list of player names to be included in each game.
+            workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+            chunk_size (int): The number of games sent to a worker at a time.
+            board (Board, optional): An already loaded board. When given, board_file_name is not read.
+            max_turns (int, optional): Stop each game after this many turns (see BatchRunner).
+            stop_when_decided (bool): Stop each game once its winner can no longer change (see BatchRunner).
+
+        Raises:
+            ValueError: If the number of workers or the chunk size is not positive.
+        """
+        if workers is not None and workers <= 0:
+            raise ValueError(f"Number of workers {workers} is invalid.")
+        if chunk_size <= 0:
+            raise ValueError(f"Chunk size {chunk_size} is invalid.")
+        self._board = board if board is not None else Game.get_board(board_file_name)
+        self._players = list(players)
+        self._workers = workers or os.cpu_count() or 1
+        self._chunk_size = chunk_size
+        self._max_turns = max_turns
+        self._stop_when_decided = stop_when_decided
+    def _chunks(self, roll_sequences, start=0):
+        """
+        Splits the roll sequences into chunks of games, numbering the games in input order.
+
+        Args:
+            roll_sequences (iterable): Pairs of (sequence name, dice rolls).
+            start (int): The index of the first game.
+
+        Yields:
+            list: Tuples of (game index, sequence name, dice rolls).
+        """
+        numbered = ((index, source, dice) for index, (source, dice) in enumerate(roll_sequences, start))
+        while True:
+            chunk = list(islice(numbered, self._chunk_size))
+            if not chunk:
+                return
+            yield chunk
+    def run(self, roll_sequences, start=0):
+        """
+        Plays one game per dice roll sequence on the worker pool.
+
+        Only a few chunks per worker are in flight at a time, so arbitrarily long streams of
+        roll sequences can be processed in bounded memory.
+
+        Args:
+            roll_sequences (iterable): Pairs of (sequence name, dice rolls), e.g. from read_roll_sequences.
+            start (int): The index of the first game, e.g. when a sweep is resumed part way through.
+
+        Yields:
+            dict: One result row per game, in the same order as the roll sequences.
+        """
+        with ProcessPoolExecutor(max_workers=self._workers, initializer=_init_worker,
+                                 initargs=(self._board, self._players, self._max_turns,
+                                           self._stop_when_decided)) as executor:
+            pending = deque()
+            for chunk in self._chunks(roll_sequences, start):
+                pending.append(executor.submit(_run_chunk, chunk))
+                # Wait for the oldest chunk once enough work is queued
+                if len(pending) >= self._workers * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
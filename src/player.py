@@ -5,15 +5,41 @@ class Player:
     provides methods to move the player, manage the player's balance, and track 
     the properties they own.
     """
-    def __init__(self, name) -> None:
+    __slots__ = ("name", "_ledger", "_cash", "_current_position", "_owned_properties")
+    def __init__(self, name, ledger=None) -> None:
         """
         Initializes a new player with the given name, sets the initial balance, 
         position, and an empty list for owned properties.
 
         Args:
             name (str): The name of the player.
+            ledger (Ledger, optional): The ledger notified whenever the player's balance changes.
         """
         self.name = name
+        self._ledger = None
+        self._balance = 16
+        self._current_position = 0
+        self._owned_properties = []
+        if ledger is not None:
+            ledger.register(self)
+            self._ledger = ledger
+    @property
+    def _balance(self):
+        """
+        The player's balance. Setting it notifies the ledger, if any.
+        """
+        return self._cash
+    @_balance.setter
+    def _balance(self, amount):
+        previous = getattr(self, "_cash", amount)
+        self._cash = amount
+        if self._ledger is not None:
+            self._ledger.update(self, previous, amount)
+    def reset(self):
+        """
+        Restores the player to the state of a fresh game (starting balance, standing on GO,
+        no properties) so the same Player object can be reused across games.
+        """
         self._balance = 16
         self._current_position = 0
         self._owned_properties = []
@@ -73,7 +99,7 @@ class Player:
         Args:
             property (Property): The property to be purchased by the player.
         """
-        self._balance -= property._price    # Deduct price from balance
+        self._balance -= property.get_price()    # Deduct price from balance
         self._owned_properties.append(property) # Add property to owned list
     def get_balance(self):
         """
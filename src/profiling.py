@@ -0,0 +1,159 @@
+from time import perf_counter
+from actions import Actions
+from game import Game
+from records import RecordSink
+
+class Instrumentation:
+    """
+    Opt-in instrumentation of the game: counts turns, rents paid, purchases and GO passes, and
+    accumulates the time spent loading, in each kind of action and writing records. While it is
+    installed, the methods of Game, Actions and the record sinks are replaced by timed wrappers;
+    when it is not installed the original methods run untouched, so there is no overhead.
+    Turns resolved by Game._jump_ahead are counted as turns and as jumped turns, and their rents
+    and GO passes are counted with the others.
+
+    Example:
+        with Instrumentation() as profile:
+            Game("board/board.json", "rolls/rolls_1.json", players).start_game()
+        print(profile.summary())
+    """
+    def __init__(self, game_classes=(Game,)) -> None:
+        """
+        Initializes empty counters and timings.
+
+        Args:
+            game_classes (iterable): The Game classes to instrument. When game.py runs as a script its
+                                     Game class is a different object from game.Game, so both are needed.
+        """
+        self._game_classes = list(game_classes)
+        self.counters = {"turns": 0, "rents_paid": 0, "purchases": 0, "go_passes": 0, "turns_jumped_ahead": 0}
+        self.timings = {"loading board": 0.0, "loading rolls": 0.0, "turns": 0.0, "passing GO": 0.0,
+                        "rent": 0.0, "buying": 0.0, "recording": 0.0, "jumping ahead": 0.0, "finishing records": 0.0}
+        self._originals = []
+    def install(self):
+        """
+        Replaces the instrumented methods with timed wrappers.
+        """
+        if self._originals:
+            return
+        for game_class in self._game_classes:
+            self._patch(game_class, "get_board", lambda f: staticmethod(self._timed("loading board", f)))
+            self._patch(game_class, "get_dice", lambda f: staticmethod(self._timed("loading rolls", f)))
+            self._patch(game_class, "play_turn", lambda f: self._timed("turns", f, "turns"))
+            self._patch(game_class, "records_turns", lambda f: self._timed("finishing records", f))
+            self._patch(game_class, "_jump_ahead", self._jumped)
+        self._patch(Actions, "pass_go", lambda f: self._action("passing GO", f, 3, "go_passes"))
+        self._patch(Actions, "rent", lambda f: self._action("rent", f, 3, "rents_paid"))
+        self._patch(Actions, "buy_property", lambda f: self._action("buying", f, 2, "purchases"))
+        for sink_class in self._sink_classes(RecordSink):
+            if "write" in sink_class.__dict__:
+                self._patch(sink_class, "write", lambda f: self._timed("recording", f))
+    def uninstall(self):
+        """
+        Puts the original methods back.
+        """
+        for owner, name, original in reversed(self._originals):
+            setattr(owner, name, original)
+        self._originals = []
+    def __enter__(self):
+        self.install()
+        return self
+    def __exit__(self, *exc_info):
+        self.uninstall()
+    def summary(self):
+        """
+        Formats the counters and timings.
+
+        Returns:
+            str: A human-readable summary.
+        """
+        timings = self.timings
+        # Time spent in a turn outside the actions and records is moving the player
+        moving = timings["turns"] - timings["passing GO"] - timings["rent"] - timings["buying"] - timings["recording"]
+        lines = ["Profile", "-"*40]
+        lines += [f"{name.replace('_', ' ').capitalize()}: {count}" for name, count in self.counters.items()]
+        lines.append("")
+        for phase, seconds in (("Loading board", timings["loading board"]), ("Loading rolls", timings["loading rolls"]),
+                               ("Turns (total)", timings["turns"]), ("  moving", moving),
+                               ("  passing GO", timings["passing GO"]), ("  rent", timings["rent"]),
+                               ("  buying", timings["buying"]), ("  recording", timings["recording"]),
+                               ("Jumping ahead", timings["jumping ahead"]),
+                               ("Finishing records", timings["finishing records"])):
+            lines.append(f"{phase}: {seconds * 1000:.3f} ms")
+        if self.counters["turns"]:
+            seconds = timings["turns"] + timings["jumping ahead"]
+            lines.append(f"Average turn: {seconds / self.counters['turns'] * 1e6:.2f} us")
+        return "\n".join(lines)
+    def _patch(self, owner, name, make_wrapper):
+        """
+        Replaces a method of a class, remembering the original.
+        """
+        original = owner.__dict__[name]
+        function = original.__func__ if isinstance(original, staticmethod) else original
+        self._originals.append((owner, name, original))
+        setattr(owner, name, make_wrapper(function))
+    def _timed(self, phase, function, counter=None):
+        """
+        Wraps a function to add its running time to a phase, and count its calls.
+        """
+        timings = self.timings
+        counters = self.counters
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                timings[phase] += perf_counter() - start
+                if counter is not None:
+                    counters[counter] += 1
+        return wrapper
+    def _action(self, phase, function, arguments, counter):
+        """
+        Wraps an Actions method to time it and count the times it takes effect, whether or not the
+        caller collects events.
+
+        Args:
+            arguments (int): The number of arguments of the method before events.
+        """
+        timings = self.timings
+        counters = self.counters
+        def wrapper(actions, *args, **kwargs):
+            events = kwargs.pop("events", args[arguments] if len(args) > arguments else None)
+            happened = []
+            start = perf_counter()
+            try:
+                return function(actions, *args[:arguments], happened, **kwargs)
+            finally:
+                timings[phase] += perf_counter() - start
+                if happened:
+                    counters[counter] += 1
+                    if events is not None:
+                        events.extend(happened)
+        return wrapper
+    def _jumped(self, function):
+        """
+        Wraps Game._jump_ahead to time it and count the turns it plays, with their GO passes and rents.
+        """
+        timings = self.timings
+        counters = self.counters
+        def wrapper(game, *args):
+            turn = game._current_turn
+            start = perf_counter()
+            try:
+                return function(game, *args)
+            finally:
+                timings["jumping ahead"] += perf_counter() - start
+                counters["turns"] += game._current_turn - turn
+                counters["turns_jumped_ahead"] += game._current_turn - turn
+                go_passes, rents_paid = game._jumped_events
+                counters["go_passes"] += go_passes
+                counters["rents_paid"] += rents_paid
+        return wrapper
+    def _sink_classes(self, base):
+        """
+        Lists a record sink class and all its subclasses that are currently imported.
+        """
+        classes = [base]
+        for subclass in base.__subclasses__():
+            classes += self._sink_classes(subclass)
+        return classes
@@ -1,28 +1,45 @@
+from tables import GO
+
 class Property:
     """
     The Property class represents a property on the game board. Each property has
     a name, price, rent value, color, type, index on the board, and an owner (if any).
     This class allows the game to check if the property is owned, get rent and price values,
     and manage ownership.
+
+    A property is a view of one square of its board's tables (see BoardTables): its details
+    and owner are read from and written to the tables.
     """
-    def __init__(self, name, price, color, property_type, index) -> None:
+    __slots__ = ("_board", "_index")
+    def __init__(self, board, index) -> None:
         """
-        Initializes a new property with the specified details.
+        Initializes a view of a square of the board.
 
         Args:
-            name (str): The name of the property.
-            price (int): The purchase price of the property.
-            color (str): The color of the property (used for groups of properties).
-            property_type (str): The type of the property (e.g., "go").
+            board (Board): The board the property is on.
             index (int): The position of the property on the board (its index).
         """
-        self.name = name
-        self._price = price
-        self._rent = price
-        self._color = color
-        self.type = property_type
+        self._board = board
         self._index = index
-        self._owner = None
+    @property
+    def index(self):
+        """
+        The position of the property on the board (its index in the board tables).
+        """
+        return self._index
+    @property
+    def name(self):
+        """
+        The name of the property.
+        """
+        return self._board._tables.names[self._index]
+    @property
+    def type(self):
+        """
+        The type of the property (e.g., "go").
+        """
+        tables = self._board._tables
+        return tables.type_names[tables.types[self._index]]
     def is_owned(self):
         """
         Checks if this property has an owner.
@@ -30,7 +47,7 @@ class Property:
         Returns:
             bool: True if the property has an owner, False otherwise.
         """
-        return True if self._owner is not None else False
+        return self._board._tables.owners[self._index] >= 0
     def get_rent(self):
         """
         Getter for the rent value of the property.
@@ -38,7 +55,8 @@ class Property:
         Returns:
             int: The amount of rent that needs to be paid for this property.
         """
-        return self._rent
+        tables = self._board._tables
+        return tables.rents[self._index] if tables.types[self._index] != GO else None
     def get_price(self):
         """
         Getter for the price of the property.
@@ -46,7 +64,8 @@ class Property:
         Returns:
             int: The purchase price of the property.
         """
-        return self._price
+        tables = self._board._tables
+        return tables.prices[self._index] if tables.types[self._index] != GO else None
     def get_owner(self):
         """
         Getter for the owner of the property.
@@ -54,7 +73,7 @@ class Property:
         Returns:
             Player: The player who owns this property. Returns None if no owner.
         """
-        return self._owner
+        return self._board._tables.owner(self._index)
     def set_owner(self, player):
         """
         Sets the owner of the property.
@@ -62,7 +81,7 @@ class Property:
         Args:
             player (Player): The player who is purchasing the property.
         """
-        self._owner = player
+        self._board._tables.set_owner(self._index, player)
     def get_colour(self):
         """
         Getter for the color of the property, used to group similar properties.
@@ -70,5 +89,6 @@ class Property:
         Returns:
             str: The color group of the property.
         """
-        return self._color
-    
\ No newline at end of file
+        tables = self._board._tables
+        colour = tables.colours[self._index]
+        return tables.colour_names[colour] if colour >= 0 else None
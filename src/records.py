@@ -0,0 +1,166 @@
+from abc import ABC, abstractmethod
+from actions import BUY, PASS_GO, RENT
+
+def render_action(turn, players):
+    """
+    Builds the message describing a turn from its events, as shown in the text records.
+
+    Args:
+        turn (dict): The turn record (see RecordSink.write).
+        players (list[str]): The player names, in seat order, to name the owner rent is paid to.
+
+    Returns:
+        str: The action message.
+    """
+    name = turn["player"]
+    flags = turn["flags"]
+    action = f"\n{name}'s turn! Rolling dice: {turn['roll']} \n"
+    if flags & PASS_GO:
+        action += f"{name} passes GO and earns $1!"
+    action += f"{name} moves from {turn['from']} to {turn['to']} ({turn['position']})\n"
+    if flags & RENT:
+        action += f"{name} pays ${turn['amount']} rent to {players[turn['counterparty']]}."
+    if flags & BUY:
+        action += f"{name} buys {turn['position']} for ${turn['amount']}."
+    return action
+def format_turn(index, turn, players=None):
+    """
+    Formats a turn record as a line of the records text file.
+
+    Args:
+        index (int): The number of the turn, starting from 0.
+        turn (dict): The turn record. Its action message is built with render_action unless it has one.
+        players (list[str], optional): The player names, in seat order (see render_action).
+
+    Returns:
+        str: The formatted turn, ending with a newline.
+    """
+    action = turn["action"] if "action" in turn else render_action(turn, players)
+    return (
+        f"Turn {index}: Player: {turn['player']}, "
+        f"Roll: {turn['roll']}, Position: {turn['position']}, "
+        f"Balance: ${turn['balance']}, Position: {action}\n"
+    )
+
+RECORDS_HEADER = "Game Turns:\n" + "-"*20 + "\n"
+
+class RecordSink(ABC):
+    """
+    A record sink receives the record of each turn as soon as it is played.
+    Subclasses decide whether the records are kept, streamed to disk or dropped, and must
+    implement write.
+    """
+    # Whether the game needs to build turn records for this sink at all
+    enabled = True
+    def begin(self, players, board):
+        """
+        Called once by the game before any turn is played.
+
+        Args:
+            players (list[Player]): The players, in seat order.
+            board (Board): The game board.
+        """
+    @abstractmethod
+    def write(self, turn):
+        """
+        Receives the record of a turn.
+
+        Args:
+            turn (dict): The turn record: player, roll, position and balance as in the text records,
+                         plus the player's seat, the squares moved from and to, the event flags, the
+                         amount of rent paid or price paid, and the seat of the rent's owner. The
+                         action message is not included; see render_action.
+        """
+    def reset(self):
+        """
+        Starts the records of a new game.
+        """
+    def close(self):
+        """
+        Finishes the records of the current game.
+        """
+
+class MemoryRecordSink(RecordSink):
+    """
+    Keeps every turn record in memory and writes them all to a text file when closed.
+    """
+    def __init__(self, file_name="./records/records.txt") -> None:
+        """
+        Args:
+            file_name (str): The file the records are written to when the sink is closed.
+        """
+        self._file_name = file_name
+        self._players = []
+        self.turns = []
+    def begin(self, players, board):
+        self._players = [player.name for player in players]
+    def write(self, turn):
+        self.turns.append(turn)
+    def reset(self):
+        self.turns = []
+    def close(self):
+        with open(self._file_name, "w") as file:
+            file.write(RECORDS_HEADER)
+            for i, turn in enumerate(self.turns):
+                file.write(format_turn(i, turn, self._players))
+
+class TextRecordSink(RecordSink):
+    """
+    Streams turn records to a text file as the game is played, so memory use does not grow
+    with the length of the game. Records are buffered and written every flush_interval turns.
+    """
+    def __init__(self, file_name="./records/records.txt", flush_interval=64) -> None:
+        """
+        Args:
+            file_name (str): The file the records are written to.
+            flush_interval (int): The number of turns buffered before they are written to the file.
+
+        Raises:
+            ValueError: If the flush interval is not positive.
+        """
+        if flush_interval <= 0:
+            raise ValueError(f"Flush interval {flush_interval} is invalid.")
+        self._file_name = file_name
+        self._flush_interval = flush_interval
+        self._file = None
+        self._buffer = []
+        self._count = 0
+        self._players = []
+    def begin(self, players, board):
+        self._players = [player.name for player in players]
+    def write(self, turn):
+        if self._file is None:
+            self.reset()
+        self._buffer.append(format_turn(self._count, turn, self._players))
+        self._count += 1
+        if len(self._buffer) >= self._flush_interval:
+            self.flush()
+    def flush(self):
+        """
+        Writes the buffered records to the file.
+        """
+        self._file.write("".join(self._buffer))
+        self._file.flush()
+        self._buffer = []
+    def reset(self):
+        # A new game starts a new file
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self._file_name, "w")
+        self._file.write(RECORDS_HEADER)
+        self._buffer = []
+        self._count = 0
+    def close(self):
+        if self._file is None:
+            self.reset()
+        self.flush()
+        self._file.close()
+        self._file = None
+
+class NullRecordSink(RecordSink):
+    """
+    Drops every turn. The game does not build turn records at all.
+    """
+    enabled = False
+    def write(self, turn):
+        pass
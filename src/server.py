@@ -0,0 +1,279 @@
+import argparse
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from board import Board
+from dice import ListDice, RandomDice, END, ERROR
+from game import Game, DEFAULT_PLAYERS
+from loader import validate_board, validate_dice
+from records import NullRecordSink, RecordSink, render_action
+
+class StreamRecordSink(RecordSink):
+    """
+    Hands each turn record to a callback as soon as it is played, e.g. to send it to a client.
+    """
+    def __init__(self, emit, describe=False) -> None:
+        """
+        Args:
+            emit (callable): Called with each turn record.
+            describe (bool): Whether the turn records include the action message.
+        """
+        self._emit = emit
+        self._describe = describe
+        self._players = []
+    def begin(self, players, board):
+        self._players = [player.name for player in players]
+    def write(self, turn):
+        if self._describe:
+            turn["action"] = render_action(turn, self._players)
+        self._emit(turn)
+
+class GameServer:
+    """
+    Plays games for clients over a local socket, with one JSON object per line in each direction.
+
+    Each request line holds a board (as in board.json) and either a list of rolls or a seed, and
+    optionally the players, what to do when the rolls run out, and whether to stream the turns:
+
+        {"id": 1, "board": [...], "rolls": [1, 2, 3], "players": ["A", "B"], "stream": true}
+
+    The server answers with one {"id": 1, "type": "turn", ...} line per turn when streaming, then
+    {"id": 1, "type": "result", ...} with the result of the game (as in Game.get_result), or
+    {"id": 1, "type": "error", "error": ...}. A client can send several requests without waiting;
+    the answers to different requests may be interleaved and are told apart by their id.
+
+    Games run on a bounded pool of worker threads so the event loop is never blocked. At most
+    max_pending games are accepted at a time: once they are all taken, the server stops reading
+    requests until a game finishes, so clients that send faster than games are played are slowed
+    down by their socket buffers filling up. Streamed turns go through a bounded queue, so a game
+    is paused while its client is slow to read the turns.
+    """
+    def __init__(self, host="127.0.0.1", port=8765, workers=4, max_pending=None, stream_buffer=256,
+                 max_rolls=100000) -> None:
+        """
+        Args:
+            host (str): The address to listen on.
+            port (int): The port to listen on. 0 picks a free port (see port).
+            workers (int): The number of worker threads playing games.
+            max_pending (int, optional): The number of games accepted at a time. Defaults to twice the workers.
+            stream_buffer (int): The number of turns of a streamed game buffered for a slow client.
+            max_rolls (int): The most rolls a seeded game may ask for, so every game ends.
+
+        Raises:
+            ValueError: If the number of workers, pending games or buffered turns is not positive.
+        """
+        max_pending = max_pending if max_pending is not None else workers * 2
+        if workers <= 0 or max_pending <= 0 or stream_buffer <= 0:
+            raise ValueError("Workers, pending games and stream buffer must be positive.")
+        self._host = host
+        self._port = port
+        self._workers = workers
+        self._max_pending = max_pending
+        self._stream_buffer = stream_buffer
+        self._max_rolls = max_rolls
+        self._executor = None
+        self._slots = None
+        self._server = None
+    @property
+    def port(self):
+        """
+        The port the server is listening on.
+        """
+        return self._server.sockets[0].getsockname()[1] if self._server is not None else self._port
+    async def start(self):
+        """
+        Starts listening for clients.
+        """
+        self._executor = ThreadPoolExecutor(max_workers=self._workers)
+        self._slots = asyncio.Semaphore(self._max_pending)
+        # Board payloads can be long lines
+        self._server = await asyncio.start_server(self._handle_client, self._host, self._port, limit=2 ** 26)
+    async def serve_forever(self):
+        """
+        Starts the server if needed and serves clients until cancelled.
+        """
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+    async def close(self):
+        """
+        Stops listening and waits for the games being played to finish.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+    def build_game(self, request, emit=None):
+        """
+        Validates a request and creates its game.
+
+        Args:
+            request (dict): The decoded request.
+            emit (callable, optional): Called with each turn record when the turns are streamed.
+
+        Returns:
+            Game: The game, ready for play_game.
+
+        Raises:
+            ValueError: If the request is invalid.
+        """
+        if not isinstance(request, dict):
+            raise ValueError("Request must be a JSON object.")
+        board_data = request.get("board")
+        validate_board(board_data)
+        players = request.get("players", DEFAULT_PLAYERS)
+        if not isinstance(players, list) or not players or not all(isinstance(name, str) for name in players):
+            raise ValueError("Players must be a non-empty list of names.")
+        if len(set(players)) != len(players):
+            raise ValueError("Player names must be unique.")
+        on_exhausted = request.get("on_exhausted", ERROR)
+        # Rolls that start again could keep a game going forever
+        if on_exhausted not in (END, ERROR):
+            raise ValueError(f"on_exhausted must be '{END}' or '{ERROR}'.")
+        if "rolls" in request:
+            validate_dice(request["rolls"])
+            dice = ListDice(request["rolls"], on_exhausted)
+        elif isinstance(request.get("seed"), int):
+            max_rolls = request.get("max_rolls", self._max_rolls)
+            if not isinstance(max_rolls, int) or not 0 <= max_rolls <= self._max_rolls:
+                raise ValueError(f"max_rolls must be between 0 and {self._max_rolls}.")
+            dice = RandomDice(request["seed"], request.get("game_index", 0), request.get("dice_faces", 6),
+                              request.get("dice_count", 1), max_rolls, on_exhausted)
+        else:
+            raise ValueError("Request must have 'rolls' or an integer 'seed'.")
+        records = StreamRecordSink(emit, bool(request.get("describe"))) if emit is not None else NullRecordSink()
+        return Game(None, None, players, board=Board(board_data), dice=dice, records=records, jump_ahead=True)
+    def _play(self, request, emit):
+        """
+        Plays the game of a request on a worker thread.
+
+        Returns:
+            dict: The result of the game.
+        """
+        game = self.build_game(request, emit)
+        game.play_game()
+        return game.get_result()
+    async def _handle_client(self, reader, writer):
+        """
+        Reads the requests of a client, starting a game for each of them.
+        """
+        lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, ValueError):
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                # Wait for a free slot before reading the next request
+                await self._slots.acquire()
+                task = asyncio.create_task(self._serve_request(line, writer, lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+    async def _serve_request(self, line, writer, lock):
+        """
+        Plays the game of one request and sends its turns and result to the client.
+        """
+        request_id = None
+        try:
+            request = json.loads(line)
+            if isinstance(request, dict):
+                request_id = request.get("id")
+            loop = asyncio.get_running_loop()
+            if isinstance(request, dict) and request.get("stream"):
+                result = await self._play_streamed(request, request_id, writer, lock)
+            else:
+                result = await loop.run_in_executor(self._executor, self._play, request, None)
+            await self._send(writer, lock, {"id": request_id, "type": "result", **result})
+        except ConnectionError:
+            pass
+        except Exception as e:
+            try:
+                await self._send(writer, lock, {"id": request_id, "type": "error", "error": str(e)})
+            except ConnectionError:
+                pass
+        finally:
+            self._slots.release()
+    async def _play_streamed(self, request, request_id, writer, lock):
+        """
+        Plays a game on a worker thread, sending each turn to the client as it is played.
+
+        Returns:
+            dict: The result of the game.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(self._stream_buffer)
+        cancelled = threading.Event()
+        finished = object()
+        def emit(turn):
+            if cancelled.is_set():
+                raise ConnectionError("Client disconnected.")
+            # Blocks the worker while the client is behind
+            asyncio.run_coroutine_threadsafe(queue.put(dict(turn)), loop).result()
+        def play():
+            try:
+                return self._play(request, emit)
+            finally:
+                asyncio.run_coroutine_threadsafe(queue.put(finished), loop).result()
+        future = loop.run_in_executor(self._executor, play)
+        index = 0
+        try:
+            while True:
+                turn = await queue.get()
+                if turn is finished:
+                    break
+                await self._send(writer, lock, {"id": request_id, "type": "turn", "turn": index, **turn})
+                index += 1
+        except BaseException:
+            # Stop the game and let the worker finish
+            cancelled.set()
+            while await queue.get() is not finished:
+                pass
+            raise
+        return await future
+    async def _send(self, writer, lock, message):
+        """
+        Sends one JSON line to a client.
+        """
+        async with lock:
+            if writer.is_closing():
+                raise ConnectionError("Client disconnected.")
+            writer.write(json.dumps(message).encode() + b"\n")
+            await writer.drain()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve Pronto Woven Monopoly games as line-delimited JSON")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=4, help="Number of worker threads playing games")
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help="Number of games accepted at a time before requests stop being read (default: 2 x workers)")
+    parser.add_argument("--stream-buffer", type=int, default=256,
+                        help="Number of streamed turns buffered for a slow client")
+    args = parser.parse_args()
+
+    server = GameServer(args.host, args.port, args.workers, args.max_pending, args.stream_buffer)
+    async def main():
+        await server.start()
+        print(f"Serving on {args.host}:{server.port}")
+        await server.serve_forever()
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"Error: {e}")
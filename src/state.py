@@ -0,0 +1,214 @@
+from array import array
+from tables import GO
+
+class GameState:
+    """
+    A compact, array-backed representation of everything that changes during a game: the owner
+    of each square (the owning seat, or -1), each player's balance and position, the number of
+    squares of each colour each player owns, and the number of turns played. Copying the state
+    only copies a few flat arrays, so games can be reset or forked cheaply.
+    """
+    __slots__ = ("owners", "balances", "positions", "colour_counts", "turn")
+    def __init__(self, num_players, board_len, num_colours, balance=16) -> None:
+        """
+        Initializes the state of a new game: every player on GO with the starting balance and no
+        square owned.
+
+        Args:
+            num_players (int): The number of players.
+            board_len (int): The number of squares on the board.
+            num_colours (int): The number of colour sets on the board.
+            balance (int): The starting balance of each player.
+        """
+        self.owners = array("h", [-1]) * board_len
+        self.balances = array("q", [balance]) * num_players
+        self.positions = array("q", [0]) * num_players
+        # colour_counts[seat * num_colours + colour] is the number of squares of that colour the seat owns
+        self.colour_counts = array("i", [0]) * (num_players * num_colours)
+        self.turn = 0
+    def copy(self):
+        """
+        Makes an independent copy of the state, e.g. to snapshot or fork a game.
+
+        Returns:
+            GameState: The copy.
+        """
+        state = GameState.__new__(GameState)
+        state.restore(self)
+        return state
+    def restore(self, snapshot):
+        """
+        Overwrites the state with a copy taken earlier.
+
+        Args:
+            snapshot (GameState): The state to restore.
+        """
+        self.owners = array("h", snapshot.owners)
+        self.balances = array("q", snapshot.balances)
+        self.positions = array("q", snapshot.positions)
+        self.colour_counts = array("i", snapshot.colour_counts)
+        self.turn = snapshot.turn
+
+class StateActions:
+    """
+    The same actions as Actions (passing GO, paying rent and buying properties), working on a
+    GameState with square and seat indices instead of Player and Property objects.
+    """
+    __slots__ = ("_board_len", "_is_property", "_price", "_rent", "_colour", "_colour_size", "_num_colours")
+    def __init__(self, board) -> None:
+        """
+        Uses the per-square arrays of the board's tables (see BoardTables).
+
+        Args:
+            board (Board): The game board.
+        """
+        tables = board.tables
+        self._board_len = board.get_board_len()
+        self._num_colours = len(tables.colour_names)
+        self._is_property = array("b", [code != GO for code in tables.types])
+        # The layout arrays never change, so they are shared rather than copied
+        self._price = tables.prices
+        self._rent = tables.rents
+        self._colour = tables.colours
+        self._colour_size = tables.colour_sizes
+    def new_state(self, num_players):
+        """
+        Creates the state of a new game on this board.
+
+        Args:
+            num_players (int): The number of players.
+
+        Returns:
+            GameState: Every player on GO with the starting balance and no square owned.
+        """
+        return GameState(num_players, self._board_len, self._num_colours)
+    def state_from_game(self, game):
+        """
+        Captures the current state of a Game played with Player and Property objects.
+
+        Args:
+            game (Game): The game to capture.
+
+        Returns:
+            GameState: The state of the game.
+        """
+        state = self.new_state(len(game._players))
+        for seat, player in enumerate(game._players):
+            state.balances[seat] = player.get_balance()
+            state.positions[seat] = player.get_current_position()
+            for owned_property in player._owned_properties:
+                self._set_owner(state, owned_property.index, seat)
+        state.turn = game._current_turn
+        return state
+    def apply_to_game(self, state, game):
+        """
+        Writes a state back into a Game's Player and Property objects.
+
+        Args:
+            state (GameState): The state to apply.
+            game (Game): The game to update. It must use the same board and number of players.
+        """
+        board = game._board
+        for player in game._players:
+            for owned_property in player._owned_properties:
+                owned_property.set_owner(None)
+        for seat, player in enumerate(game._players):
+            player._balance = state.balances[seat]
+            player._current_position = state.positions[seat]
+            player._owned_properties = []
+        for square, seat in enumerate(state.owners):
+            if seat >= 0:
+                owned_property = board.get_property(square)
+                owned_property.set_owner(game._players[seat])
+                game._players[seat]._owned_properties.append(owned_property)
+        game._current_turn = state.turn
+        game._current_player = game._players[state.turn % len(game._players)]
+    def pass_go(self, state, seat, steps):
+        """
+        Pays the player $1 if the move passes GO.
+
+        Returns:
+            bool: True if the player passed GO.
+        """
+        if state.positions[seat] + steps >= self._board_len:
+            state.balances[seat] += 1
+            return True
+        return False
+    def rent(self, state, seat, square):
+        """
+        Makes the player pay rent if the square is owned, doubled when the owner has the whole colour set.
+
+        Returns:
+            int: The rent paid, or 0 if the square is not owned.
+        """
+        owner = state.owners[square]
+        if owner < 0:
+            return 0
+        rent = self._rent[square]
+        colour = self._colour[square]
+        if state.colour_counts[owner * self._num_colours + colour] == self._colour_size[colour]:
+            rent *= 2
+        state.balances[owner] += rent
+        state.balances[seat] -= rent
+        return rent
+    def buy_property(self, state, seat, square):
+        """
+        Makes the player buy the square if it is not owned.
+
+        Returns:
+            int: The price paid, or 0 if the square is already owned.
+        """
+        if state.owners[square] >= 0:
+            return 0
+        price = self._price[square]
+        state.balances[seat] -= price
+        self._set_owner(state, square, seat)
+        return price
+    def play_turn(self, state, seat, steps):
+        """
+        Plays a turn: moves the player, then pays rent or buys the property landed on.
+
+        Raises:
+            ValueError: If the number of steps is invalid (less than or equal to zero).
+            IndexError: If the move ends off the board.
+        """
+        if steps <= 0:
+            raise ValueError(f"Rolls {steps} is out of bounds.")
+        self.pass_go(state, seat, steps)
+        position = state.positions[seat] + steps
+        if position >= self._board_len:
+            position -= self._board_len
+        if position >= self._board_len:
+            raise IndexError(f"Position {position} is out of bounds. Board size: {self._board_len}")
+        state.positions[seat] = position
+        if self._is_property[position]:
+            if not self.rent(state, seat, position):
+                self.buy_property(state, seat, position)
+        state.turn += 1
+    def play_game(self, state, dice):
+        """
+        Plays turns until a player is bankrupt, following the same rules as Game.play_game.
+
+        Args:
+            state (GameState): The state to play from.
+            dice (DiceSource): The dice rolls.
+        """
+        balances = state.balances
+        num_players = len(balances)
+        # Only the player whose turn it is can lose money, so only they need checking after a turn
+        bankrupt = any(balance <= 0 for balance in balances)
+        while not bankrupt:
+            steps = dice.next_roll()
+            if steps is None:
+                break
+            seat = state.turn % num_players
+            self.play_turn(state, seat, steps)
+            bankrupt = state.balances[seat] <= 0
+    def _set_owner(self, state, square, seat):
+        """
+        Records a new owner for an unowned square.
+        """
+        state.owners[square] = seat
+        colour = self._colour[square]
+        if colour >= 0:
+            state.colour_counts[seat * self._num_colours + colour] += 1
@@ -0,0 +1,263 @@
+from bisect import bisect_left
+import json
+import os
+from aggregate import ResultAggregator
+from batch import BatchRunner
+from dice import random_roll_sequences
+from game import Game
+
+# Version of the checkpoint file layout
+CHECKPOINT_VERSION = 1
+
+def write_atomic(file_name, text):
+    """
+    Replaces a file with new content so that a crash leaves either the old or the new file,
+    never a partly written one: the content is written to a temporary file next to it, flushed
+    to disk and then renamed over it.
+
+    Args:
+        file_name (str): The file to replace.
+        text (str): The new content.
+    """
+    temporary_path = f"{file_name}.{os.getpid()}.tmp"
+    with open(temporary_path, "w") as file:
+        file.write(text)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, file_name)
+def pending_ranges(completed, games):
+    """
+    Works out the games of a sweep that are still to be played.
+
+    Args:
+        completed (list): The [start, stop) ranges of the games already played, in order and not overlapping.
+        games (int): The number of games of the sweep.
+
+    Returns:
+        list[list[int]]: The [start, stop) ranges of the games still to be played, in order.
+    """
+    pending = []
+    start = 0
+    for done_start, done_stop in completed:
+        if done_start > start:
+            pending.append([start, min(done_start, games)])
+        start = max(start, done_stop)
+    if start < games:
+        pending.append([start, games])
+    return [[first, stop] for first, stop in pending if first < stop]
+def add_completed(completed, game):
+    """
+    Marks a game as played, extending or joining the completed ranges around it.
+
+    Args:
+        completed (list): The [start, stop) ranges of the games already played, in order and not
+                          overlapping. Updated in place.
+        game (int): The index of the game, not in any of the ranges.
+    """
+    i = bisect_left(completed, [game + 1])
+    if i and completed[i - 1][1] == game:
+        completed[i - 1][1] = game + 1
+        # Join the next range if the game filled the gap between them
+        if i < len(completed) and completed[i][0] == game + 1:
+            completed[i - 1][1] = completed.pop(i)[1]
+    elif i < len(completed) and completed[i][0] == game + 1:
+        completed[i][0] = game
+    else:
+        completed.insert(i, [game, game + 1])
+
+class SweepRunner:
+    """
+    Plays a long sweep of games with generated rolls, saving a checkpoint every so many games so
+    an interrupted sweep can be resumed where it stopped instead of starting over.
+
+    A checkpoint records the ranges of games played, the summary statistics of those games, the
+    dice cursor and how much of the result rows file was written. The dice of a game only depend
+    on the seed and the game index (see RandomDice), so the index of the next game is the whole
+    dice cursor. Checkpoints are taken between games and replace the previous one atomically.
+    Result rows written after the last checkpoint are dropped on resume and the games played
+    again, so an interrupted sweep gives the same rows and summary as one played in one go.
+    """
+    def __init__(self, board_file_name, players, seed, games, checkpoint_file_name, checkpoint_every=10000,
+                 output_file_name=None, dice_settings=None, workers=None, chunk_size=64, max_turns=None,
+                 stop_when_decided=False) -> None:
+        """
+        Stores the sweep settings. The board is loaded when the sweep runs.
+
+        Args:
+            board_file_name (str): The file name containing the board layout (e.g., 'board.json').
+            players (list): A list of player names to be included in each game.
+            seed (int): The seed of the generated rolls.
+            games (int): The number of games of the sweep.
+            checkpoint_file_name (str): The checkpoint file, resumed from if it exists.
+            checkpoint_every (int): The number of games played between checkpoints.
+            output_file_name (str, optional): The file the result rows are written to as JSON lines.
+                                              Defaults to keeping only the summary statistics.
+            dice_settings (dict, optional): Further RandomDice settings (faces, count, max_rolls,
+                                            on_exhausted, use_numpy).
+            workers (int, optional): Play the games on this many worker processes (see ParallelRunner).
+            chunk_size (int): With workers, the number of games sent to a worker at a time.
+            max_turns (int, optional): Stop each game after this many turns (see BatchRunner).
+            stop_when_decided (bool): Stop each game once its winner can no longer change (see BatchRunner).
+
+        Raises:
+            ValueError: If the number of games or the checkpoint interval is invalid.
+        """
+        if games < 0:
+            raise ValueError(f"Number of games {games} is invalid.")
+        if checkpoint_every <= 0:
+            raise ValueError(f"Checkpoint interval {checkpoint_every} is invalid.")
+        self._board_file_name = board_file_name
+        self._players = list(players)
+        self._seed = seed
+        self._games = games
+        self._checkpoint_file_name = checkpoint_file_name
+        self._checkpoint_every = checkpoint_every
+        self._output_file_name = output_file_name
+        self._dice_settings = dict(dice_settings or {})
+        self._workers = workers
+        self._chunk_size = chunk_size
+        self._max_turns = max_turns
+        self._stop_when_decided = stop_when_decided
+    def settings(self):
+        """
+        Returns:
+            dict: The settings a checkpoint must have been saved with to be resumed by this sweep.
+                  The number of games is not one of them, so a finished sweep can be extended.
+        """
+        return {
+            "board": self._board_file_name,
+            "players": self._players,
+            "seed": self._seed,
+            "dice": self._dice_settings,
+            "max_turns": self._max_turns,
+            "stop_when_decided": self._stop_when_decided,
+            "output": self._output_file_name,
+        }
+    def load_checkpoint(self):
+        """
+        Reads the checkpoint of an earlier run of this sweep.
+
+        Returns:
+            dict: The checkpoint, or None if there is none yet.
+
+        Raises:
+            ValueError: If the checkpoint is of another sweep or another layout, or played more games than
+                        this sweep has.
+        """
+        if not os.path.exists(self._checkpoint_file_name):
+            return None
+        with open(self._checkpoint_file_name) as file:
+            checkpoint = json.load(file)
+        if checkpoint.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Checkpoint '{self._checkpoint_file_name}' has unsupported version "
+                             f"{checkpoint.get('version')}.")
+        # Compare through JSON so tuples and lists are alike
+        if checkpoint["settings"] != json.loads(json.dumps(self.settings())):
+            raise ValueError(f"Checkpoint '{self._checkpoint_file_name}' is of a sweep with other settings.")
+        if checkpoint["completed"] and checkpoint["completed"][-1][1] > self._games:
+            raise ValueError(f"Checkpoint '{self._checkpoint_file_name}' has played more than {self._games} games.")
+        return checkpoint
+    def run(self, max_games=None):
+        """
+        Plays the games of the sweep not played yet, resuming from the checkpoint if there is one.
+
+        Args:
+            max_games (int, optional): Stop after playing this many games, e.g. to spread a sweep over
+                                       several runs. Defaults to finishing the sweep.
+
+        Returns:
+            ResultAggregator: The summary statistics of every game played so far, including earlier runs.
+
+        Raises:
+            ValueError: If the checkpoint cannot be resumed, or the result rows file is shorter than the
+                        checkpoint says.
+        """
+        checkpoint = self.load_checkpoint()
+        if checkpoint is None:
+            completed, aggregator, output_offset = [], ResultAggregator(self._players), 0
+        else:
+            completed = checkpoint["completed"]
+            aggregator = ResultAggregator.from_dict(checkpoint["summary"])
+            output_offset = checkpoint["output_offset"]
+        work = pending_ranges(completed, self._games)
+        if max_games is not None:
+            work = self._limit(work, max_games)
+        output = self._open_output(output_offset) if self._output_file_name else None
+        try:
+            runner = self._runner() if work else None
+            since_checkpoint = 0
+            for start, stop in work:
+                roll_sequences = random_roll_sequences(self._seed, stop - start, start, **self._dice_settings)
+                for result in runner.run(roll_sequences, start):
+                    aggregator.add(result)
+                    if output is not None:
+                        output.write((json.dumps(result) + "\n").encode())
+                    add_completed(completed, result["game"])
+                    since_checkpoint += 1
+                    if since_checkpoint == self._checkpoint_every:
+                        self._save_checkpoint(completed, aggregator, output)
+                        since_checkpoint = 0
+            if since_checkpoint or checkpoint is None:
+                self._save_checkpoint(completed, aggregator, output)
+        finally:
+            if output is not None:
+                output.close()
+        return aggregator
+    def _runner(self):
+        """
+        Creates the runner playing the games, on the worker pool if workers were asked for.
+        """
+        board = Game.get_board(self._board_file_name)
+        if self._workers:
+            from parallel import ParallelRunner
+            return ParallelRunner(None, self._players, self._workers, self._chunk_size, board=board,
+                                  max_turns=self._max_turns, stop_when_decided=self._stop_when_decided)
+        return BatchRunner(None, self._players, board=board, max_turns=self._max_turns,
+                           stop_when_decided=self._stop_when_decided)
+    def _open_output(self, offset):
+        """
+        Opens the result rows file for appending after the rows of the games already checkpointed,
+        dropping any rows written after the checkpoint.
+        """
+        if offset == 0:
+            return open(self._output_file_name, "wb")
+        output = open(self._output_file_name, "r+b")
+        if output.seek(0, os.SEEK_END) < offset:
+            output.close()
+            raise ValueError(f"Result rows file '{self._output_file_name}' is shorter than its checkpoint.")
+        output.truncate(offset)
+        output.seek(offset)
+        return output
+    def _save_checkpoint(self, completed, aggregator, output):
+        """
+        Saves the progress of the sweep, once the result rows it covers are safely on disk.
+        """
+        output_offset = 0
+        if output is not None:
+            output.flush()
+            os.fsync(output.fileno())
+            output_offset = output.tell()
+        pending = pending_ranges(completed, self._games)
+        write_atomic(self._checkpoint_file_name, json.dumps({
+            "version": CHECKPOINT_VERSION,
+            "settings": self.settings(),
+            "games": self._games,
+            "completed": completed,
+            # Where the dice of the sweep continue from
+            "dice": {"seed": self._seed, "next_game": pending[0][0] if pending else self._games},
+            "output_offset": output_offset,
+            "summary": aggregator.to_dict(),
+        }))
+    @staticmethod
+    def _limit(work, max_games):
+        """
+        Cuts the ranges of games to play down to the first max_games games.
+        """
+        limited = []
+        for start, stop in work:
+            if max_games <= 0:
+                break
+            stop = min(stop, start + max_games)
+            limited.append([start, stop])
+            max_games -= stop - start
+        return limited
@@ -0,0 +1,254 @@
+from array import array
+from collections import Counter
+
+# Type code of GO squares in BoardTables.types. Every other type is played as a property.
+GO = 0
+
+class BoardTables:
+    """
+    The board as flat per-square arrays, indexed by square: the type code, price, rent and
+    colour id of each square, and the id of its owner (-1 if unowned). Owners are given ids
+    the first time they own a square. The number of squares of each colour each owner holds
+    is kept as squares change hands, so a landing is resolved with a few indexed reads.
+
+    The layout arrays never change, so copies share them; only the ownership arrays are new.
+    The names only need to be indexable, so a large board can build them on demand (see
+    compact.SquareNames and compact.ColourNames).
+    """
+    __slots__ = ("names", "types", "type_names", "prices", "rents", "colours", "colour_names", "_colour_ids",
+                 "colour_sizes", "num_colours", "num_properties", "owners", "owner_objects", "_owner_ids",
+                 "owned_counts", "unowned")
+    def __init__(self, positions) -> None:
+        """
+        Builds the tables from board data.
+
+        Args:
+            positions (list): List of dictionaries containing board data, one per square
+                              (name, type, and price and colour for properties).
+        """
+        names = []
+        type_names = ["go"]
+        colour_names = []
+        types, prices, colours = [], [], []
+        type_codes = {"go": GO}
+        colour_ids = {}
+        for position in positions:
+            property_type = position["type"]
+            names.append(position["name"])
+            if property_type not in type_codes:
+                type_codes[property_type] = len(type_names)
+                type_names.append(property_type)
+            types.append(type_codes[property_type])
+            if property_type == "go":
+                prices.append(0)
+                colours.append(-1)
+            else:
+                colour = position["colour"]
+                prices.append(position["price"])
+                if colour not in colour_ids:
+                    colour_ids[colour] = len(colour_names)
+                    colour_names.append(colour)
+                colours.append(colour_ids[colour])
+        self._set_layout(names, array("b", types), type_names, array("q", prices), array("i", colours), colour_names)
+    @classmethod
+    def from_columns(cls, names, types, type_names, prices, colours, colour_names, colour_sizes=None):
+        """
+        Builds the tables from per-square columns, e.g. those of a compact board (see compact.py).
+
+        Args:
+            names (sequence): The name of each square.
+            types (array): The type code of each square, indexing type_names; GO squares have code GO.
+            type_names (list[str]): The name of each type code, starting with "go".
+            prices (array): The price of each square (0 for GO squares), as 64-bit integers.
+            colours (array): The colour id of each square, indexing colour_names (-1 for GO squares).
+            colour_names (sequence): The name of each colour id.
+            colour_sizes (array, optional): The number of squares of each colour, if already known.
+
+        Returns:
+            BoardTables: The tables, with no square owned.
+        """
+        tables = cls.__new__(cls)
+        tables._set_layout(names, types, type_names, prices, colours, colour_names, colour_sizes)
+        return tables
+    def _set_layout(self, names, types, type_names, prices, colours, colour_names, colour_sizes=None):
+        """
+        Sets the layout arrays and works out the size of each colour set.
+        """
+        self.names = names
+        self.types = types
+        self.type_names = type_names
+        self.prices = prices
+        self.rents = prices[:]      # rent is the price of the property
+        self.colours = colours
+        self.colour_names = colour_names
+        # Built the first time a colour is looked up by name
+        self._colour_ids = None
+        self.num_colours = len(colour_names)
+        if colour_sizes is None:
+            colour_sizes = array("i", [0]) * self.num_colours
+            for colour, size in Counter(colours).items():
+                if colour >= 0:
+                    colour_sizes[colour] = size
+        self.colour_sizes = colour_sizes
+        self.num_properties = sum(self.colour_sizes)
+        self._reset_ownership()
+    def copy(self):
+        """
+        Creates tables with the same layout and no square owned.
+
+        Returns:
+            BoardTables: The copy.
+        """
+        tables = BoardTables.__new__(BoardTables)
+        for name in ("names", "types", "type_names", "prices", "rents", "colours", "colour_names", "_colour_ids",
+                     "colour_sizes", "num_colours", "num_properties"):
+            setattr(tables, name, getattr(self, name))
+        tables._reset_ownership()
+        return tables
+    def squares(self, colour):
+        """
+        Finds the squares of a colour. The search stops once every square of the colour is found.
+
+        Args:
+            colour (str): The colour name, or None for the GO squares.
+
+        Returns:
+            list[int]: The indices of the squares, in board order.
+        """
+        if colour is None:
+            return _find_all(self.types, GO, len(self.names) - self.num_properties)
+        colour_id = self.colour_id(colour)
+        if colour_id < 0:
+            return []
+        return _find_all(self.colours, colour_id, self.colour_sizes[colour_id])
+    def colour_id(self, colour):
+        """
+        Looks up a colour by name. Colour names that can look themselves up (see compact.ColourNames)
+        are asked directly; otherwise a dict of the names is built the first time.
+
+        Args:
+            colour (str): The colour name.
+
+        Returns:
+            int: The colour id, or -1 if no square has the colour.
+        """
+        find = getattr(self.colour_names, "find", None)
+        if find is not None:
+            return find(colour)
+        if self._colour_ids is None:
+            self._colour_ids = {name: i for i, name in enumerate(self.colour_names)}
+        return self._colour_ids.get(colour, -1)
+    def owner_id(self, owner, create=True):
+        """
+        Gets the id of an owner, giving it one if it is new.
+
+        Args:
+            owner (object): The owner, usually a Player.
+            create (bool): Whether to give a new owner an id. When False, -1 is returned for a new owner.
+
+        Returns:
+            int: The owner's id.
+        """
+        owner_id = self._owner_ids.get(owner)
+        if owner_id is None:
+            if not create:
+                return -1
+            owner_id = self._owner_ids[owner] = len(self.owner_objects)
+            self.owner_objects.append(owner)
+            self.owned_counts.extend(array("i", [0]) * self.num_colours)
+        return owner_id
+    def owner(self, square):
+        """
+        Returns:
+            object: The owner of the square, or None if it is unowned.
+        """
+        owner_id = self.owners[square]
+        return self.owner_objects[owner_id] if owner_id >= 0 else None
+    def set_owner(self, square, owner):
+        """
+        Changes the owner of a square, keeping the colour counts in step.
+
+        Args:
+            square (int): The index of the square.
+            owner (object): The new owner, or None to make the square unowned.
+        """
+        colour = self.colours[square]
+        previous_id = self.owners[square]
+        if previous_id >= 0:
+            self.owned_counts[previous_id * self.num_colours + colour] -= 1
+            self.unowned += 1
+        if owner is None:
+            self.owners[square] = -1
+            return
+        owner_id = self.owner_id(owner)
+        self.owners[square] = owner_id
+        self.owned_counts[owner_id * self.num_colours + colour] += 1
+        self.unowned -= 1
+    def has_monopoly(self, owner_id, colour):
+        """
+        Checks whether an owner holds every square of a colour.
+
+        Args:
+            owner_id (int): The owner's id.
+            colour (int): The colour id.
+
+        Returns:
+            bool: True if the owner holds the whole colour set.
+        """
+        return self.owned_counts[owner_id * self.num_colours + colour] == self.colour_sizes[colour]
+    def rent_due(self, square):
+        """
+        Works out the rent for landing on a square.
+
+        Args:
+            square (int): The index of the square.
+
+        Returns:
+            tuple[int, int]: The rent (doubled when the owner holds the whole colour set) and the owner's
+                             id, or (0, -1) if the square is not owned.
+        """
+        owner_id = self.owners[square]
+        if owner_id < 0:
+            return 0, -1
+        colour = self.colours[square]
+        rent = self.rents[square]
+        if self.owned_counts[owner_id * self.num_colours + colour] == self.colour_sizes[colour]:
+            rent *= 2
+        return rent, owner_id
+    def _reset_ownership(self):
+        """
+        Makes every square unowned.
+        """
+        self.owners = array("i", [-1]) * len(self.names)
+        self.owner_objects = []
+        self._owner_ids = {}
+        # owned_counts[owner_id * number of colours + colour] is the number of squares of that colour the owner holds
+        self.owned_counts = array("i")
+        self.unowned = self.num_properties
+
+def _find_all(column, value, count):
+    """
+    Finds where a value is in an array column, searching its bytes rather than comparing
+    one square at a time.
+
+    Args:
+        column (array): The column.
+        value (int): The value to find.
+        count (int): The number of times the value is in the column; the search stops once all are found.
+
+    Returns:
+        list[int]: The indices of the value, in order.
+    """
+    data = column.tobytes()
+    pattern = array(column.typecode, [value]).tobytes()
+    size = column.itemsize
+    found = []
+    offset = data.find(pattern)
+    while offset >= 0 and len(found) < count:
+        # Only matches on an item boundary are the value itself
+        if offset % size == 0:
+            found.append(offset // size)
+            offset = data.find(pattern, offset + size)
+        else:
+            offset = data.find(pattern, offset + 1)
+    return found
@@ -0,0 +1,176 @@
+from collections import namedtuple
+import argparse
+import json
+import mmap
+import struct
+from records import RECORDS_HEADER, RecordSink, format_turn, render_action
+
+# File layout: magic, format version, length of the JSON metadata (player and square names),
+# the metadata itself, then one fixed-width record per turn.
+MAGIC = b"PWTL"
+VERSION = 2
+HEADER = struct.Struct("<4sHI")
+# seat, roll, from square, to square, balance, event flags, rent or price paid, rent owner's seat.
+# Balances and amounts are 64-bit, like the board's prices
+RECORD = struct.Struct("<HIIIqBqi")
+# Record layout of each format version that can be read; version 1 had 32-bit balances and amounts
+RECORDS = {1: struct.Struct("<HIIIiBii"), VERSION: RECORD}
+
+TurnRecord = namedtuple("TurnRecord", ["seat", "roll", "from_square", "to_square", "balance", "flags", "amount", "counterparty"])
+
+class BinaryRecordSink(RecordSink):
+    """
+    Streams turn records to a compact binary turn log. Each turn is a fixed-width record of
+    integers, without the action messages, which can be rebuilt from the record by
+    TurnLogReader.to_text.
+    """
+    def __init__(self, file_name="./records/records.bin", flush_interval=1024) -> None:
+        """
+        Args:
+            file_name (str): The file the turn log is written to.
+            flush_interval (int): The number of turns buffered before they are written to the file.
+
+        Raises:
+            ValueError: If the flush interval is not positive.
+        """
+        if flush_interval <= 0:
+            raise ValueError(f"Flush interval {flush_interval} is invalid.")
+        self._file_name = file_name
+        self._flush_interval = flush_interval
+        self._metadata = b"{}"
+        self._file = None
+        self._buffer = []
+    def begin(self, players, board):
+        # Read from the tables, so no square objects are created for the names
+        squares = list(board.tables.names)
+        self._metadata = json.dumps({"players": [player.name for player in players], "squares": squares}).encode()
+    def write(self, turn):
+        if self._file is None:
+            self.reset()
+        self._buffer.append(RECORD.pack(turn["seat"], turn["roll"], turn["from"], turn["to"], turn["balance"],
+                                        turn["flags"], turn["amount"], turn["counterparty"]))
+        if len(self._buffer) >= self._flush_interval:
+            self.flush()
+    def flush(self):
+        """
+        Writes the buffered records to the file.
+        """
+        self._file.write(b"".join(self._buffer))
+        self._file.flush()
+        self._buffer = []
+    def reset(self):
+        # A new game starts a new file
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self._file_name, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, len(self._metadata)))
+        self._file.write(self._metadata)
+        self._buffer = []
+    def close(self):
+        if self._file is None:
+            self.reset()
+        self.flush()
+        self._file.close()
+        self._file = None
+
+class TurnLogReader:
+    """
+    Reads a binary turn log written by BinaryRecordSink. The file is memory-mapped, so turns can
+    be iterated or sliced without loading the whole log.
+    """
+    def __init__(self, file_name) -> None:
+        """
+        Opens the turn log and reads its header.
+
+        Args:
+            file_name (str): The file name of the turn log.
+
+        Raises:
+            ValueError: If the file is not a turn log or its size does not match whole records.
+        """
+        with open(file_name, "rb") as file:
+            size = file.seek(0, 2)
+            # mmap cannot map an empty file
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        if size < HEADER.size:
+            raise ValueError(f"'{file_name}' is not a turn log.")
+        magic, version, metadata_size = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version not in RECORDS:
+            raise ValueError(f"'{file_name}' is not a turn log.")
+        self._record = RECORDS[version]
+        metadata = json.loads(bytes(self._data[HEADER.size:HEADER.size + metadata_size]))
+        self.players = metadata["players"]
+        self.squares = metadata["squares"]
+        self._offset = HEADER.size + metadata_size
+        self._count, remainder = divmod(size - self._offset, self._record.size)
+        if remainder:
+            raise ValueError(f"Turn log '{file_name}' is truncated.")
+    def __len__(self):
+        return self._count
+    def __getitem__(self, index):
+        """
+        Retrieves a turn, or a list of turns for a slice.
+
+        Args:
+            index (int or slice): The number of the turn, starting from 0.
+
+        Returns:
+            TurnRecord or list[TurnRecord]: The requested turn(s).
+
+        Raises:
+            IndexError: If the turn number is out of bounds.
+        """
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if index < 0 or index >= self._count:
+            raise IndexError(f"Turn {index} is out of bounds. Number of turns: {self._count}")
+        return TurnRecord._make(self._record.unpack_from(self._data, self._offset + index * self._record.size))
+    def __iter__(self):
+        for fields in self._record.iter_unpack(memoryview(self._data)[self._offset:]):
+            yield TurnRecord._make(fields)
+    def close(self):
+        """
+        Releases the memory map.
+        """
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+    def describe(self, turn):
+        """
+        Rebuilds the record of a turn in the format of the text records.
+
+        Args:
+            turn (TurnRecord): The turn to describe.
+
+        Returns:
+            dict: The turn record (see RecordSink.write), with its action message.
+        """
+        record = {"player": self.players[turn.seat], "roll": turn.roll, "balance": turn.balance,
+                  "position": self.squares[turn.to_square], "seat": turn.seat, "from": turn.from_square,
+                  "to": turn.to_square, "flags": turn.flags, "amount": turn.amount, "counterparty": turn.counterparty}
+        record["action"] = render_action(record, self.players)
+        return record
+    def to_text(self, file_name):
+        """
+        Converts the turn log to the text records format.
+
+        Args:
+            file_name (str): The file the text records are written to.
+        """
+        with open(file_name, "w") as file:
+            file.write(RECORDS_HEADER)
+            for i, turn in enumerate(self):
+                file.write(format_turn(i, self.describe(turn)))
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a binary turn log to the text records format")
+    parser.add_argument("log_file", type=str, help="Path to the binary turn log")
+    parser.add_argument("text_file", type=str, help="Path of the text records file to write")
+    args = parser.parse_args()
+
+    try:
+        reader = TurnLogReader(args.log_file)
+        reader.to_text(args.text_file)
+        reader.close()
+    except Exception as e:
+        print(f"Error: {e}")
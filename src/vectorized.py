@@ -0,0 +1,189 @@
+from itertools import islice
+from dice import DiceSource
+from game import Game
+from tables import GO
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional and only needed by this module
+    np = None
+
+class VectorizedRunner:
+    """
+    Plays many games on the same board in lockstep with NumPy arrays instead of Player and
+    Property objects. Every game of a block advances by one turn per step: positions and
+    balances are (games x players) arrays and ownership is a (games x squares) array holding
+    the owning seat, or -1 for an unowned square. Games stop taking turns as soon as one of
+    their players is bankrupt. The rules and results are the same as Game.play_game.
+
+    Ownership and colour counts use the narrowest integer types that hold them, and dice rolls
+    are read a window of turns at a time, so the memory of a block does not depend on how many
+    rolls each game could use.
+    """
+    def __init__(self, board_file_name, players, block_size=4096, board=None, window=256) -> None:
+        """
+        Loads the board and converts it into per-square arrays.
+
+        Args:
+            board_file_name (str): The file name containing the board layout (e.g., 'board.json').
+            players (list): A list of player names to be included in each game.
+            block_size (int): The number of games simulated together.
+            board (Board, optional): An already loaded board. When given, board_file_name is not read.
+            window (int): The number of turns of dice rolls read at a time for each game of a block.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+            ValueError: If the block size or the window is not positive.
+        """
+        if np is None:
+            raise ImportError("The vectorized engine requires NumPy.")
+        if block_size <= 0 or window <= 0:
+            raise ValueError(f"Block size {block_size} or window {window} is invalid.")
+        if board is None:
+            board = Game.get_board(board_file_name)
+        self._players = list(players)
+        self._block_size = block_size
+        self._window = window
+        tables = board.tables
+        self._names = tables.names
+        self._is_property = np.frombuffer(tables.types, dtype=np.int8) != GO
+        self._price = np.array(tables.prices, dtype=np.int64)
+        self._rent = np.array(tables.rents, dtype=np.int64)
+        # GO squares get colour 0; they are never owned, so their colour is never used
+        self._colour = np.maximum(np.array(tables.colours, dtype=np.int64), 0)
+        self._colour_size = np.bincount(self._colour[self._is_property], minlength=max(len(tables.colour_names), 1))
+    def play_block(self, tapes):
+        """
+        Plays a block of games in lockstep.
+
+        Args:
+            tapes (list): The dice rolls of each game, as a list or a DiceSource.
+
+        Returns:
+            tuple: Arrays of final balances (games x players), final positions (games x players)
+                   and the number of turns played per game.
+
+        Raises:
+            ValueError: If a roll is not positive or moves a player off the board.
+            IndexError: If a game runs out of dice rolls before a player is bankrupt.
+        """
+        games = len(tapes)
+        num_players = len(self._players)
+        board_len = len(self._names)
+        readers = [_rolls(tape) for tape in tapes]
+        # The rolls of the current window of turns, and how many of them each game has
+        rolls = np.zeros((games, self._window), dtype=np.int64)
+        available = np.zeros(games, dtype=np.int64)
+        balances = np.full((games, num_players), 16, dtype=np.int64)
+        positions = np.zeros((games, num_players), dtype=np.int64)
+        # The smallest signed type holding every seat and -1 for unowned squares
+        owners = np.full((games, board_len), -1, dtype=np.min_scalar_type(-num_players))
+        # Number of squares of each colour owned by each player, for constant-time monopoly checks
+        colour_counts = np.zeros((games, num_players, len(self._colour_size)), dtype=np.int32)
+        turns = np.zeros(games, dtype=np.int64)
+        turn = 0
+        while True:
+            active = np.flatnonzero((balances > 0).all(axis=1))
+            if active.size == 0:
+                break
+            offset = turn % self._window
+            if offset == 0:
+                # Read the next window of rolls of the games still playing
+                for game in active.tolist():
+                    window = list(islice(readers[game], self._window))
+                    rolls[game, :len(window)] = window
+                    available[game] = len(window)
+            if (available[active] <= offset).any():
+                raise IndexError(f"Game {int(active[available[active] <= offset][0])} ran out of dice rolls.")
+            seat = turn % num_players
+            steps = rolls[active, offset]
+            if (steps <= 0).any():
+                raise ValueError(f"Rolls {int(steps[steps <= 0][0])} is out of bounds.")
+            # Move, collecting $1 when passing GO
+            new_position = positions[active, seat] + steps
+            passed_go = new_position >= board_len
+            new_position = np.where(passed_go, new_position - board_len, new_position)
+            if (new_position >= board_len).any():
+                raise ValueError(f"Position {int(new_position.max())} is out of bounds. Board size: {board_len}")
+            balances[active, seat] += passed_go
+            positions[active, seat] = new_position
+            is_property = self._is_property[new_position]
+            owner = owners[active, new_position]
+            colour = self._colour[new_position]
+            # Pay rent, doubled when the owner has the whole colour set
+            pays_rent = is_property & (owner >= 0)
+            renters = active[pays_rent]
+            rent_owner = owner[pays_rent]
+            rent_colour = colour[pays_rent]
+            rent = self._rent[new_position[pays_rent]]
+            monopoly = colour_counts[renters, rent_owner, rent_colour] == self._colour_size[rent_colour]
+            rent = np.where(monopoly, rent * 2, rent)
+            balances[renters, rent_owner] += rent
+            balances[renters, seat] -= rent
+            # Buy unowned properties
+            buys = is_property & (owner < 0)
+            buyers = active[buys]
+            bought = new_position[buys]
+            balances[buyers, seat] -= self._price[bought]
+            owners[buyers, bought] = seat
+            colour_counts[buyers, seat, colour[buys]] += 1
+            turns[active] += 1
+            turn += 1
+        return balances, positions, turns
+    def run(self, roll_sequences):
+        """
+        Plays one game per dice roll sequence, block by block.
+
+        Args:
+            roll_sequences (iterable): Pairs of (sequence name, dice rolls), e.g. from read_roll_sequences.
+
+        Yields:
+            dict: One result row per game, in the same format as BatchRunner.run.
+        """
+        sequences = iter(roll_sequences)
+        index = 0
+        while True:
+            block = list(islice(sequences, self._block_size))
+            if not block:
+                return
+            balances, positions, turns = self.play_block([dice for _, dice in block])
+            for game, (source, _) in enumerate(block):
+                max_balance = balances[game].max()
+                yield {
+                    "game": index,
+                    "source": source,
+                    "turns": int(turns[game]),
+                    "winners": [name for seat, name in enumerate(self._players) if balances[game, seat] == max_balance],
+                    "players": [
+                        {
+                            "name": name,
+                            "balance": int(balances[game, seat]),
+                            "position": self._names[positions[game, seat]],
+                        }
+                        for seat, name in enumerate(self._players)
+                    ],
+                }
+                index += 1
+
+def _rolls(tape):
+    """
+    Iterates over the dice rolls of a game until they run out.
+
+    Args:
+        tape (list or DiceSource): The dice rolls.
+
+    Returns:
+        iterator: The rolls.
+    """
+    if not isinstance(tape, DiceSource):
+        return iter(tape)
+    def source_rolls():
+        try:
+            roll = tape.next_roll()
+            while roll is not None:
+                yield roll
+                roll = tape.next_roll()
+        except IndexError:
+            # The game ran out of rolls; the block reports it if the game needed them
+            return
+    return source_rolls()
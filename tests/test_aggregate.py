@@ -0,0 +1,84 @@
+from aggregate import Histogram, ResultAggregator, RunningStats
+from batch import BatchRunner
+from dice import random_roll_sequences
+import csv
+import json
+import statistics
+import pytest
+
+PLAYERS = ["Peter", "Billy", "Charlotte", "Sweedal"]
+
+@pytest.fixture(scope="module")
+def results():
+    """Results of seeded games on the shipped board"""
+    runner = BatchRunner("board/board.json", PLAYERS)
+    return list(runner.run(random_roll_sequences(3, 200, max_rolls=2000, on_exhausted="end")))
+def test_running_stats():
+    """Running statistics match the statistics module, also after merging."""
+    values = [3, 1, 4, 1, 5, 9, 2, 6, 5, 3, 5]
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+    assert stats.count == len(values)
+    assert stats.mean == pytest.approx(statistics.mean(values))
+    assert stats.variance == pytest.approx(statistics.variance(values))
+    assert (stats.min, stats.max) == (1, 9)
+    left, right = RunningStats(), RunningStats()
+    for value in values[:4]:
+        left.add(value)
+    for value in values[4:]:
+        right.add(value)
+    left.merge(right)
+    assert left.mean == pytest.approx(stats.mean)
+    assert left.variance == pytest.approx(stats.variance)
+    assert (left.min, left.max) == (1, 9)
+def test_histogram():
+    histogram = Histogram(0, 10, 3)
+    for value in (-1, 0, 9, 10, 29, 30, 100):
+        histogram.add(value)
+    assert histogram.buckets() == [("<0", 1), ("[0,10)", 2), ("[10,20)", 1), ("[20,30)", 1), (">=30", 2)]
+    with pytest.raises(ValueError):
+        histogram.merge(Histogram(0, 5, 3))
+def test_aggregate(results):
+    aggregator = ResultAggregator(PLAYERS)
+    assert list(aggregator.consume(results)) == results
+    assert aggregator.games == len(results)
+    assert sum(aggregator.outright_wins) <= len(results) <= sum(aggregator.wins)
+    assert aggregator.game_length.mean == pytest.approx(statistics.mean(result["turns"] for result in results))
+    assert sum(aggregator.finishing_squares[0].values()) == len(results)
+    assert sum(count for _, count in aggregator.balance_histograms[2].buckets()) == len(results)
+def test_merge_matches_single_pass(results):
+    """Aggregating halves separately and merging gives the same statistics."""
+    whole, first, second = ResultAggregator(PLAYERS), ResultAggregator(PLAYERS), ResultAggregator(PLAYERS)
+    for result in results:
+        whole.add(result)
+    for result in results[:77]:
+        first.add(result)
+    for result in results[77:]:
+        second.add(result)
+    first.merge(second)
+    merged, single = first.to_dict(), whole.to_dict()
+    assert merged["length_histogram"] == single["length_histogram"]
+    assert merged["game_length"]["mean"] == pytest.approx(single["game_length"]["mean"])
+    for mine, theirs in zip(merged["players"], single["players"]):
+        assert mine["wins"] == theirs["wins"]
+        assert mine["balance_histogram"] == theirs["balance_histogram"]
+        assert mine["finishing_squares"] == theirs["finishing_squares"]
+        assert mine["balance"]["variance"] == pytest.approx(theirs["balance"]["variance"])
+def test_round_trip_and_export(results, tmp_path):
+    aggregator = ResultAggregator(PLAYERS)
+    for result in results:
+        aggregator.add(result)
+    assert ResultAggregator.from_dict(json.loads(json.dumps(aggregator.to_dict()))).to_dict() == aggregator.to_dict()
+    aggregator.write(str(tmp_path / "summary.json"))
+    assert json.loads((tmp_path / "summary.json").read_text())["games"] == len(results)
+    aggregator.write(str(tmp_path / "summary.csv"))
+    with open(tmp_path / "summary.csv") as file:
+        rows = list(csv.DictReader(file))
+    assert rows[0] == {"metric": "games", "player": "", "key": "", "value": str(len(results))}
+    assert {row["player"] for row in rows if row["metric"] == "win_rate"} == set(PLAYERS)
+def test_mismatched_players(results):
+    with pytest.raises(ValueError):
+        ResultAggregator(["Peter", "Billy"]).add(results[0])
+    with pytest.raises(ValueError):
+        ResultAggregator(PLAYERS).merge(ResultAggregator(["Peter", "Billy"]))
@@ -0,0 +1,57 @@
+from analysis import LandingAnalysis, roll_distribution
+from board import Board
+from game import Game
+import analysis as analysis_module
+import pytest
+
+@pytest.fixture
+def board():
+    """The shipped board"""
+    return Game.get_board("board/board.json")
+@pytest.fixture(params=["numpy", "python"])
+def engine(request, monkeypatch):
+    """Run with NumPy if it is installed, and with the pure Python versions."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(analysis_module, "np", None)
+    return request.param
+def test_roll_distribution():
+    assert roll_distribution(6, 1) == pytest.approx([0] + [1 / 6] * 6)
+    two_dice = roll_distribution(6, 2)
+    assert sum(two_dice) == pytest.approx(1)
+    assert two_dice[7] == pytest.approx(6 / 36)
+    assert two_dice[:2] == [0, 0]
+    with pytest.raises(ValueError):
+        roll_distribution(0, 1)
+def test_transition_matrix(board, engine):
+    matrix = LandingAnalysis(board).transition_matrix()
+    assert [sum(row) for row in matrix] == pytest.approx([1.0] * board.get_board_len())
+    assert matrix[8][0] == pytest.approx(1 / 6)
+    assert matrix[0][0] == 0
+def test_stationary_is_uniform(board, engine):
+    """Without jumps every square is equally likely in the long run, even for a periodic chain."""
+    size = board.get_board_len()
+    assert LandingAnalysis(board).stationary() == pytest.approx([1 / size] * size, abs=1e-9)
+    assert LandingAnalysis(board, 1, 2).stationary() == pytest.approx([1 / size] * size, abs=1e-9)
+def test_first_turn(board, engine):
+    """The first landing is the dice total away from GO."""
+    assert LandingAnalysis(board).landing_probabilities(1) == pytest.approx([0] + [1 / 6] * 6 + [0, 0])
+def test_expected_rent(board, engine):
+    rows = LandingAnalysis(board).expected_rent()
+    assert len(rows) == board.get_board_len() - 1
+    assert rows[-1]["name"] == "Massizim"
+    assert rows[-1]["expected_rent"] == pytest.approx(4 / 9)
+    assert rows[-1]["expected_monopoly_rent"] == pytest.approx(8 / 9)
+def test_matches_simulation(board, engine):
+    """The squares landed on in sampled games agree with the analysis."""
+    analysis = LandingAnalysis(board)
+    sink = analysis.simulate(300, seed=5)
+    assert sum(sink.landings) == sum(turns * players for turns, players in sink.turn_counts.items())
+    comparison = analysis.compare(sink)
+    assert sum(row["expected"] for row in comparison["squares"]) == pytest.approx(1)
+    assert comparison["total_variation"] < 0.02
+def test_rolls_too_large():
+    """Rolls that could move a player off the board are rejected."""
+    with pytest.raises(ValueError):
+        LandingAnalysis(Board([{"name": "GO", "type": "go"}, {"name": "A", "price": 1, "colour": "Red", "type": "property"}]))
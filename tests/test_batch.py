@@ -0,0 +1,58 @@
+from batch import BatchRunner, read_roll_sequences
+from parallel import ParallelRunner
+import json
+import pytest
+
+@pytest.fixture
+def runner():
+    """Batch runner on the shipped board"""
+    return BatchRunner("board/board.json", ["Peter", "Billy", "Charlotte", "Sweedal"])
+def test_read_rolls_directory():
+    """Every rolls JSON file in a directory is read in name order."""
+    sequences = list(read_roll_sequences("rolls"))
+    assert [name for name, _ in sequences] == ["rolls_1.json", "rolls_2.json"]
+    assert all(isinstance(dice, list) for _, dice in sequences)
+def test_read_rolls_jsonl(tmp_path):
+    """A JSONL file gives one sequence per non-empty line."""
+    jsonl = tmp_path / "rolls.jsonl"
+    jsonl.write_text("[1, 2, 3]\n\n[4, 5]\n")
+    assert list(read_roll_sequences(str(jsonl))) == [("line 1", [1, 2, 3]), ("line 3", [4, 5])]
+def test_read_rolls_jsonl_invalid(tmp_path):
+    """A line that is not a list of integers is rejected."""
+    jsonl = tmp_path / "rolls.jsonl"
+    jsonl.write_text('[1, 2]\n{"roll": 3}\n')
+    with pytest.raises(ValueError, match="line 2"):
+        list(read_roll_sequences(str(jsonl)))
+def test_batch_matches_single_games(runner):
+    """Games played back to back give the same results as the shipped results.txt."""
+    results = list(runner.run(read_roll_sequences("rolls")))
+    assert [result["game"] for result in results] == [0, 1]
+    assert results[0]["winners"] == ["Peter"]
+    assert [(p["balance"], p["position"]) for p in results[0]["players"]] == [
+        (40, "Massizim"), (14, "GO"), (-1, "Gami Chicken"), (1, "Gami Chicken")]
+    assert results[1]["winners"] == ["Charlotte"]
+    assert [(p["balance"], p["position"]) for p in results[1]["players"]] == [
+        (5, "Lanzhou Beef Noodle"), (20, "Fast Kebabs"), (31, "GO"), (-2, "Massizim")]
+def test_batch_outcomes():
+    """Batch games can be capped, and then say why they stopped."""
+    runner = BatchRunner("board/board.json", ["Peter", "Billy", "Charlotte", "Sweedal"], max_turns=5)
+    with open("rolls/rolls_1.json") as file:
+        dice = json.load(file)
+    assert runner.run_game(dice)["stopped"] == "cap"
+    assert runner.run_outcome(dice).turns == 5
+def test_batch_resets_between_games(runner):
+    """Replaying the same rolls gives the same result every time."""
+    with open("rolls/rolls_1.json") as file:
+        dice = json.load(file)
+    assert runner.run_game(dice) == runner.run_game(dice)
+def test_parallel_matches_batch(runner):
+    """Games played on worker processes come back in input order with the same results."""
+    sequences = list(read_roll_sequences("rolls")) * 3
+    parallel = ParallelRunner("board/board.json", ["Peter", "Billy", "Charlotte", "Sweedal"], workers=2, chunk_size=1)
+    assert list(parallel.run(sequences)) == list(runner.run(sequences))
+def test_parallel_invalid_settings():
+    """Worker count and chunk size must be positive."""
+    with pytest.raises(ValueError):
+        ParallelRunner("board/board.json", ["Peter"], workers=0)
+    with pytest.raises(ValueError):
+        ParallelRunner("board/board.json", ["Peter"], chunk_size=0)
@@ -0,0 +1,19 @@
+from benchmarks.suite import make_board_data, percentiles, run_suite
+from board import Board
+
+def test_generated_board():
+    """Generated boards start with GO and group properties into colour sets."""
+    board = Board(make_board_data(10, colour_size=3))
+    assert board.get_board_len() == 10
+    assert board.get_property(0).type == "go"
+    assert len(board.get_property_set("Colour 0")) == 3
+def test_percentiles():
+    """Percentiles use the nearest rank."""
+    assert percentiles(list(range(1, 101))) == {"p50": 50, "p90": 90, "p99": 99}
+def test_quick_suite():
+    """Every benchmark runs and reports its throughput."""
+    results = run_suite(quick=True)
+    assert set(results) == {"play_turn", "rent", "board_load", "compact_board_load", "records", "full_games"}
+    assert results["play_turn"]["no_records"]["turns_per_second"] > 0
+    assert results["full_games"]["board.json"]["latency_seconds"]["p50"] > 0
+    assert results["full_games"]["board.json"]["peak_memory_bytes"] > 0
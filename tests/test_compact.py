@@ -0,0 +1,157 @@
+from array import array
+from compact import build_tables, read_column
+from board import Board
+from game import Game
+from loader import Loader
+from records import MemoryRecordSink
+from turnlog import BinaryRecordSink
+import json
+import pytest
+
+PLAYERS = ["Peter", "Billy", "Charlotte", "Sweedal"]
+
+def write_npy(path, dtype, values):
+    """Write a one-dimensional .npy file without NumPy"""
+    column = array({"<i2": "h", "<i4": "i", "<i8": "q"}[dtype], values)
+    header = repr({"descr": dtype, "fortran_order": False, "shape": (len(values),)})
+    header += " " * (63 - (len(header) + 10) % 64) + "\n"
+    with open(path, "wb") as file:
+        file.write(b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header.encode("latin1"))
+        file.write(column.tobytes())
+def write_board(tmp_path, segments):
+    path = tmp_path / "board.json"
+    path.write_text(json.dumps({"segments": segments}))
+    return str(path)
+def test_compact_shipped_board(tmp_path):
+    """The shipped board written compactly plays exactly like board.json."""
+    with open("board/board.json") as file:
+        squares = json.load(file)
+    path = write_board(tmp_path, [squares[0], {"repeat": 1, "segments": squares[1:]}])
+    records = tmp_path / "records.txt"
+    game = Game(path, "rolls/rolls_1.json", PLAYERS, records=MemoryRecordSink(str(records)))
+    game.play_game()
+    game.records_turns()
+    with open("records/records_1.txt") as file:
+        assert records.read_text() == file.read()
+def test_generated_groups(tmp_path):
+    """Generated properties come in colour groups with cycling prices and templated names."""
+    board = Loader().load_board(write_board(tmp_path, [
+        {"name": "GO", "type": "go"},
+        {"generate": 10, "group_size": 4, "price": [1, 2, 3], "name": "Street {index}", "colour": "Block {group}"},
+    ]))
+    tables = board._tables
+    assert board.get_board_len() == 11
+    assert [board.get_property(i).name for i in (0, 1, 10)] == ["GO", "Street 1", "Street 10"]
+    assert list(tables.prices) == [0, 1, 2, 3, 1, 2, 3, 1, 2, 3, 1]
+    assert [board.get_property(i).get_colour() for i in (1, 4, 5, 10)] == ["Block 1", "Block 1", "Block 2", "Block 3"]
+    assert list(tables.colour_sizes) == [4, 4, 2]
+    assert [square.name for square in board.get_property_set("Block 3")] == ["Street 9", "Street 10"]
+def test_repeat(tmp_path):
+    """Repeated squares are copies in the same colour groups; names with braces are kept as they are."""
+    tables = build_tables({"segments": [
+        {"repeat": 3, "segments": [
+            {"name": "GO {x}", "type": "go"},
+            {"name": "Lot", "type": "property", "price": 2, "colour": "Red"},
+            {"generate": 2, "price": 1, "name": "Street {index}", "colour": "Blue {group}"},
+        ]},
+    ]})
+    assert len(tables.names) == 12
+    assert [tables.names[i] for i in range(4)] == ["GO {x}", "Lot", "Street 2", "Street 3"]
+    assert tables.names[6] == "Street 6" and tables.names[-1] == "Street 11"
+    assert list(tables.names) == [tables.names[i] for i in range(12)]
+    assert [tables.colour_names[colour] for colour in tables.colours[1:4]] == ["Red", "Blue 1", "Blue 2"]
+    assert list(tables.colour_sizes) == [3, 3, 3]
+    assert tables.unowned == 9
+def test_columns(tmp_path):
+    """Columns are read from .npy and raw binary files without NumPy."""
+    write_npy(tmp_path / "prices.npy", "<i8", [5, 6, 7, 8])
+    write_npy(tmp_path / "groups.npy", "<i2", [10, 10, 0, 20])
+    (tmp_path / "go.bin").write_bytes(bytes([0, 0, 1, 0]))
+    board = Loader().load_board(write_board(tmp_path, [
+        {"name": "GO", "type": "go"},
+        {"columns": {"price": "prices.npy", "group": "groups.npy", "go": {"file": "go.bin", "dtype": "u1"}},
+         "name": "Lot {index}", "colour": "Zone {group}"},
+    ]))
+    tables = board._tables
+    assert list(tables.prices) == [0, 5, 6, 0, 8]
+    assert [board.get_property(i).get_colour() for i in range(5)] == [None, "Zone 10", "Zone 10", None, "Zone 20"]
+    assert board.get_property(3).type == "go"
+    assert list(tables.colour_sizes) == [2, 1]
+def test_big_endian_column(tmp_path):
+    """Raw columns can be in either byte order."""
+    (tmp_path / "prices.bin").write_bytes((1).to_bytes(4, "big") + (258).to_bytes(4, "big"))
+    assert list(read_column({"file": "prices.bin", "dtype": ">i4"}, str(tmp_path))) == [1, 258]
+def test_numpy_columns(tmp_path):
+    """Columns saved by NumPy are read the same."""
+    np = pytest.importorskip("numpy")
+    np.save(tmp_path / "prices.npy", np.array([3, 4], dtype=">i4"))
+    assert list(read_column("prices.npy", str(tmp_path))) == [3, 4]
+@pytest.mark.parametrize("segments", [
+    [],
+    [{"generate": 0, "price": 1}],
+    [{"generate": 3}],
+    [{"generate": 3, "price": 1, "name": "Street {square}"}],
+    [{"repeat": 0, "segments": [{"name": "GO", "type": "go"}]}],
+    [{"name": "Lot", "type": "property"}],
+    [{"columns": {"price": "missing.npy"}}],
+])
+def test_invalid_compact_board(segments):
+    with pytest.raises(ValueError):
+        build_tables({"segments": segments})
+@pytest.mark.parametrize("segments", [
+    [{"generate": 4, "group_size": 2, "price": 1}, {"generate": 4, "group_size": 2, "price": 2}],
+    [{"name": "Lot", "type": "property", "price": 1, "colour": "Block 2"},
+     {"generate": 4, "group_size": 2, "price": 1, "colour": "Block {group}"}],
+    [{"generate": 4, "group_size": 2, "price": 1, "colour": "Red"}],
+    [{"generate": 2, "price": 1, "colour": "Block {group:02}"}, {"generate": 9, "price": 1, "colour": "Block 0{group}"}],
+])
+def test_duplicate_colour_names(segments):
+    """Colour groups made by different segments cannot share a name."""
+    with pytest.raises(ValueError, match="Colour"):
+        build_tables({"segments": segments})
+def test_colour_templates_per_segment(tmp_path):
+    """Segments with their own colour templates are told apart by name."""
+    board = Loader().load_board(write_board(tmp_path, [
+        {"name": "Lot", "type": "property", "price": 1, "colour": "Block 0"},
+        {"generate": 4, "group_size": 2, "price": 1},
+        {"generate": 4, "group_size": 2, "price": 2, "colour": "Block {group}"},
+        {"generate": 2, "price": 3, "colour": "Block {group:03}"},
+    ]))
+    assert [square.name for square in board.get_property_set("Colour 1")] == ["Square 1", "Square 2"]
+    assert [square.name for square in board.get_property_set("Block 1")] == ["Square 5", "Square 6"]
+    assert [square.name for square in board.get_property_set("Block 002")] == ["Square 10"]
+    assert [square.name for square in board.get_property_set("Block 0")] == ["Lot"]
+    assert board.get_property_set("Block 3") == board.get_property_set("Colour 01") == []
+def test_invalid_column(tmp_path):
+    (tmp_path / "prices.bin").write_bytes(b"\x00" * 6)
+    with pytest.raises(ValueError):
+        read_column({"file": "prices.bin", "dtype": "<i4"}, str(tmp_path))
+    with pytest.raises(ValueError):
+        read_column({"file": "prices.bin", "dtype": "<f8"}, str(tmp_path))
+    with pytest.raises(FileNotFoundError):
+        read_column("missing.npy", str(tmp_path))
+def test_million_squares(tmp_path):
+    """A board of a million squares loads quickly, creating square objects only when asked for."""
+    path = write_board(tmp_path, [{"name": "GO", "type": "go"},
+                                  {"generate": 999999, "group_size": 4, "price": [1, 2, 3, 4, 5, 6]}])
+    board = Loader().load_board(path)
+    assert board.get_board_len() == 1000000
+    assert all(square is None for square in board._positions)
+    square = board.get_property(999999)
+    assert board.get_property(999999) is square
+    # The binary turn log reads the square names without creating square objects
+    sink = BinaryRecordSink(str(tmp_path / "records.bin"))
+    sink.begin([], board)
+    assert sum(square is not None for square in board._positions) == 1
+    assert (square.name, square.get_colour(), square.get_price()) == ("Square 999999", "Colour 250000", 3)
+    assert board.has_monopoly("Peter", "Colour 1") is False
+    assert [square.name for square in board.get_property_set("Colour 250000")] == [
+        "Square 999997", "Square 999998", "Square 999999"]
+    # Colours are looked up through their templates, without a dict of every name
+    assert board._tables._colour_ids is None
+def test_lazy_squares_on_small_boards():
+    """Square objects are created on demand on every board."""
+    board = Board([{"name": "GO", "type": "go"}, {"name": "Lot", "type": "property", "price": 1, "colour": "Red"}])
+    assert board._positions == [None, None]
+    assert board.get_property(1).name == "Lot"
+    assert board.copy()._positions == [None, None]
@@ -0,0 +1,102 @@
+from dice import BinaryDice, DiceSource, JsonStreamDice, LineDice, ListDice, RandomDice, END, WRAP, ERROR, open_dice, random_roll_sequences
+from batch import BatchRunner
+from game import Game
+import json
+import pytest
+
+def rolls(source, count):
+    """Take up to count rolls from a dice source"""
+    return [source.next_roll() for _ in range(count)]
+def test_exhaustion_behaviours():
+    """Running out of rolls ends the game, wraps around, or raises."""
+    assert rolls(ListDice([1, 2], on_exhausted=END), 3) == [1, 2, None]
+    assert rolls(ListDice([1, 2], on_exhausted=WRAP), 5) == [1, 2, 1, 2, 1]
+    source = ListDice([1, 2], on_exhausted=ERROR)
+    rolls(source, 2)
+    with pytest.raises(IndexError):
+        source.next_roll()
+    assert source.position == 2
+    with pytest.raises(ValueError):
+        ListDice([1], on_exhausted="repeat")
+def test_source_without_rolls():
+    """A dice source that does not provide its rolls cannot be created."""
+    class Incomplete(DiceSource):
+        pass
+    with pytest.raises(TypeError):
+        Incomplete()
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 1 << 16])
+def test_json_stream(tmp_path, chunk_size):
+    """A JSON list is streamed correctly whatever the chunk size."""
+    path = tmp_path / "rolls.json"
+    path.write_text(" [12, 3,\n 456 ,7]\n")
+    source = JsonStreamDice(str(path), on_exhausted=END, chunk_size=chunk_size)
+    assert rolls(source, 5) == [12, 3, 456, 7, None]
+@pytest.mark.parametrize("text", ["[1, 2.5]", "{}", "[1 2]", "[1,,2]", "[1, 2", "[1] 2"])
+def test_json_stream_invalid(tmp_path, text):
+    """Anything but a JSON list of integers is rejected."""
+    path = tmp_path / "rolls.json"
+    path.write_text(text)
+    with pytest.raises(ValueError):
+        rolls(JsonStreamDice(str(path), on_exhausted=END, chunk_size=2), 4)
+def test_line_and_binary_files(tmp_path):
+    """Line-delimited and byte-per-roll files are picked by extension."""
+    lines = tmp_path / "rolls.txt"
+    lines.write_text("1\n2\n\n3\n")
+    binary = tmp_path / "rolls.bin"
+    binary.write_bytes(bytes([1, 2, 3]))
+    assert isinstance(open_dice(str(lines)), LineDice)
+    assert isinstance(open_dice(str(binary)), BinaryDice)
+    assert rolls(open_dice(str(lines), END), 4) == [1, 2, 3, None]
+    assert rolls(open_dice(str(binary), WRAP), 4) == [1, 2, 3, 1]
+def test_game_with_streamed_rolls(tmp_path):
+    """A game fed from a byte-per-roll tape plays the same as from the shipped JSON."""
+    with open("rolls/rolls_1.json") as file:
+        dice = json.load(file)
+    tape = tmp_path / "rolls.u8"
+    tape.write_bytes(bytes(dice))
+    players = ["Peter", "Billy", "Charlotte", "Sweedal"]
+    expected = Game("board/board.json", "rolls/rolls_1.json", players)
+    expected.play_game()
+    streamed = Game("board/board.json", None, players, dice=open_dice(str(tape)))
+    streamed.play_game()
+    assert streamed.get_result() == expected.get_result()
+def test_game_ends_when_rolls_run_out():
+    """With END the game stops when the rolls run out."""
+    game = Game("board/board.json", None, ["Peter", "Billy", "Charlotte", "Sweedal"], dice=ListDice([1, 1], END))
+    game.play_game()
+    assert game.get_result()["turns"] == 2
+# Generated rolls
+def test_random_dice_reproducible():
+    """Rolls depend only on the seed and game index."""
+    first = rolls(RandomDice(42, 3), 50)
+    assert rolls(RandomDice(42, 3), 50) == first
+    assert rolls(RandomDice(42, 4), 50) != first
+    assert all(1 <= roll <= 6 for roll in first)
+    source = RandomDice(42, 3)
+    rolls(source, 10)
+    source.rewind()
+    assert rolls(source, 50) == first
+def test_random_dice_settings():
+    """Dice faces, count and maximum rolls are applied."""
+    generated = rolls(RandomDice(1, faces=4, count=3, max_rolls=100, on_exhausted=END), 101)
+    assert generated[-1] is None
+    assert all(3 <= roll <= 12 for roll in generated[:-1])
+    assert RandomDice(1, max_rolls=5).to_list() == rolls(RandomDice(1), 5)
+    with pytest.raises(ValueError):
+        RandomDice(1).to_list()
+    with pytest.raises(ValueError):
+        RandomDice(1, faces=0)
+def test_random_dice_numpy():
+    """Rolls generated with NumPy in blocks are reproducible too."""
+    pytest.importorskip("numpy")
+    first = rolls(RandomDice(42, 3, use_numpy=True, block_size=7), 20)
+    assert rolls(RandomDice(42, 3, use_numpy=True, block_size=7), 20) == first
+    assert all(1 <= roll <= 6 for roll in first)
+def test_random_sweep_in_batch():
+    """Generated rolls can be used by the batch runner and give the same result as a single game."""
+    players = ["Peter", "Billy", "Charlotte", "Sweedal"]
+    results = list(BatchRunner("board/board.json", players).run(random_roll_sequences(9, 3)))
+    game = Game("board/board.json", None, players, dice=RandomDice(9, 2))
+    game.play_game()
+    assert results[2]["source"] == "seed 9 game 2"
+    assert {key: results[2][key] for key in ("turns", "winners", "players")} == game.get_result()
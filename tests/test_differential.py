@@ -0,0 +1,54 @@
+from board import Board
+from dice import ListDice
+from differential import ENGINES, compare, random_case, run
+from state import StateActions
+import random
+
+class NoDoublingActions(StateActions):
+    """Array engine with a bug: rent is never doubled for a whole colour set."""
+    __slots__ = ()
+    def rent(self, state, seat, square):
+        owner = state.owners[square]
+        if owner < 0:
+            return 0
+        rent = self._rent[square]
+        state.balances[owner] += rent
+        state.balances[seat] -= rent
+        return rent
+def no_doubling_engine(board_data, players, tapes):
+    actions = NoDoublingActions(Board(board_data))
+    outcomes = []
+    for tape in tapes:
+        state = actions.new_state(len(players))
+        try:
+            actions.play_game(state, ListDice(list(tape)))
+        except IndexError:
+            outcomes.append({"error": "IndexError"})
+            continue
+        balances = list(state.balances)
+        outcomes.append({"turns": state.turn, "balances": balances, "positions": list(state.positions),
+                         "winners": [name for name, balance in zip(players, balances) if balance == max(balances)]})
+    return outcomes
+def test_engines_agree():
+    """Every engine matches the reference on random boards and rolls."""
+    report = run(150, seed=11)
+    assert report["games"] == 600
+    assert report["mismatches"] == []
+def test_random_cases_are_valid():
+    rng = random.Random(3)
+    for _ in range(50):
+        case = random_case(rng)
+        assert case["board"][0]["type"] == "go"
+        assert all(1 <= roll <= len(case["board"]) for tape in case["tapes"] for roll in tape)
+def test_finds_and_shrinks_a_bug():
+    """A broken engine is caught and its failure shrunk to a small game that still fails."""
+    report = run(40, seed=5, engines={"broken": no_doubling_engine})
+    assert report["mismatches"]
+    shrunk = report["shrunk"]
+    assert shrunk["engine"] == "broken"
+    assert len(shrunk["board"]) <= 4
+    assert len(shrunk["players"]) <= 2
+    assert len(shrunk["tape"]) < len(report["mismatches"][0]["tape"])
+    case = {"board": shrunk["board"], "players": shrunk["players"], "tapes": [shrunk["tape"]]}
+    assert compare(case, {"broken": no_doubling_engine})
+    assert not compare(case, {"state": ENGINES["state"]})
@@ -1,6 +1,11 @@
-from game import Game
+from game import Game, player_names, BANKRUPT, DECIDED, OUT_OF_ROLLS, TURN_CAP
 from board import Board
 import pytest
+from dice import END, ListDice, RandomDice
+from state import StateActions
+from records import MemoryRecordSink, NullRecordSink
+
+PLAYERS = ["Peter", "Billy", "Charlotte", "Sweedal"]
 
 @pytest.fixture
 def game():
@@ -20,7 +25,11 @@ def test_game_initialization(game):
 def test_board_load(game):
     """ Verify board is loaded correctly from JSON
     """
+    # Board._positions holds the square objects created so far; squares are created by get_property
+    assert game._board._positions[0] is None
+    assert game._board.get_property(0).name == "GO"
     assert game._board._positions[0].name == "GO"
+    assert game._board.get_property(game._board.get_board_len() - 1).name == "Massizim"
     assert game._board._positions[-1].name == "Massizim"
 def test_dice_load(game):
     """Test that dice rolls are loaded correctly."""
@@ -88,6 +97,21 @@ def test_double_rent(game):
     game._current_player = game._players[1]
     game.play_turn(1)
     assert player._balance == 18  # Rent = 2x for full ownership
+def test_property_set_index(game):
+    """Test colour sets are looked up from the board index."""
+    assert [p.name for p in game._board.get_property_set("Brown")] == ["The Burvale", "Fast Kebabs"]
+    assert game._board.get_property_set("Purple") == []
+def test_monopoly_tracking(game):
+    """Test colour set ownership is tracked as owners change."""
+    player = game._players[0]
+    board = game._board
+    board.get_property(1).set_owner(player)
+    assert not board.has_monopoly(player, "Brown")
+    board.get_property(2).set_owner(player)
+    assert board.has_monopoly(player, "Brown")
+    board.get_property(2).set_owner(game._players[1])
+    assert not board.has_monopoly(player, "Brown")
+    assert not board.has_monopoly(game._players[1], "Brown")
 # Turn
 def test_player_turn_rotation(game):
     """Test correct turn rotation."""
@@ -124,6 +148,22 @@ def test_tie_breaker(game):
     winners = game.determine_winner()
     assert len(winners) == 2
     assert [winner for winner in winners] == ["Peter", "Billy"]
+def test_leader_tracking(game):
+    """Test the leader is kept up to date as balances change."""
+    assert game.determine_winner() == ["Peter", "Billy", "Charlotte", "Sweedal"]
+    game._players[2].receive(3)
+    assert game.determine_winner() == ["Charlotte"]
+    game._players[2].pay(3)
+    game._players[3].pay(1)
+    assert game.determine_winner() == ["Peter", "Billy", "Charlotte"]
+def test_bankruptcy_tracking(game):
+    """Test bankruptcy is detected as soon as a balance reaches zero and cleared when it recovers."""
+    player = game._players[3]
+    assert game.check_bankrupt() == False
+    player.pay(16)
+    assert game.check_bankrupt() == True
+    player.receive(1)
+    assert game.check_bankrupt() == False
 # Edge Cases
 @pytest.fixture
 def mock_game(mock_board, mock_dice):
@@ -167,4 +207,113 @@ def test_wraps_board(game):
     game._current_player = player
     player._current_position = game._board.get_board_len() - 1  # Last position
     game.play_turn(2)  # Move past last position
-    assert player._current_position == 1  # Wrap around
\ No newline at end of file
+    assert player._current_position == 1  # Wrap around
+# Player counts
+@pytest.mark.parametrize("num_players", [2, 3, 7, 64])
+def test_any_number_of_players(num_players):
+    """Turns rotate through every seat and the result matches the array state engine."""
+    players = player_names(count=num_players)
+    rolls = RandomDice(num_players, max_rolls=100000).to_list()
+    game = Game("board/board.json", None, players, dice=rolls, records=NullRecordSink())
+    game.play_game()
+    actions = StateActions(game._board)
+    state = actions.new_state(num_players)
+    actions.play_game(state, ListDice(rolls))
+    assert game._current_turn == state.turn
+    assert game._current_player is game._players[state.turn % num_players]
+    assert [player.get_balance() for player in game._players] == list(state.balances)
+def test_resume_with_more_players():
+    """A restored game carries on from the right seat."""
+    players = player_names(count=5)
+    rolls = RandomDice(5, max_rolls=100000).to_list()
+    expected = Game("board/board.json", None, players, dice=rolls, records=NullRecordSink())
+    expected.play_game()
+    game = Game("board/board.json", None, players, dice=ListDice(rolls[:13], END), records=NullRecordSink())
+    game.play_game()
+    resumed = Game.from_snapshot(Game.get_board("board/board.json"), game.snapshot(), rolls, NullRecordSink())
+    resumed.resume_game()
+    assert resumed.get_result() == expected.get_result()
+def test_player_names():
+    assert player_names() == ["Peter", "Billy", "Charlotte", "Sweedal"]
+    assert player_names("Ann, Bob,Cy") == ["Ann", "Bob", "Cy"]
+    assert player_names(count=2) == ["Player 1", "Player 2"]
+    with pytest.raises(ValueError):
+        player_names("Ann")
+    with pytest.raises(ValueError):
+        player_names("Ann,Ann")
+def test_no_players():
+    with pytest.raises(ValueError):
+        Game("board/board.json", None, [], dice=[])
+# Jump-ahead
+@pytest.mark.parametrize("seed", range(20))
+def test_jump_ahead_matches_turn_by_turn(seed):
+    """Resolving the turns after every property is owned gives the same game."""
+    rolls = RandomDice(seed, max_rolls=2000).to_list()
+    games = []
+    for jump_ahead in (False, True):
+        game = Game("board/board.json", None, PLAYERS, dice=ListDice(rolls, END), records=NullRecordSink(),
+                    jump_ahead=jump_ahead)
+        game.play_game()
+        games.append((game.get_result(), game._current_player, game._dice_source.position))
+    assert games[0][0] == games[1][0]
+    assert games[0][1].name == games[1][1].name
+    assert games[0][2] == games[1][2]
+def test_jump_ahead_invalid_roll():
+    """A roll the fast path cannot play fails the same way as in a normal turn."""
+    board = Game.get_board("board/board.json")
+    game = Game(None, None, PLAYERS, board=board, dice=[1, 2, 0], records=NullRecordSink(), jump_ahead=True)
+    for square in range(1, board.get_board_len()):
+        board.get_property(square).set_owner(game._players[square % 2])
+    assert board.all_owned()
+    with pytest.raises(ValueError, match="Rolls 0"):
+        game.play_game()
+    assert game._current_turn == 2
+    assert game._players[2].get_current_position() == 0
+def test_all_owned():
+    board = Game.get_board("board/board.json")
+    owner = Game(None, None, PLAYERS, board=board, dice=[])._players[0]
+    for square in range(1, board.get_board_len()):
+        assert not board.all_owned()
+        board.get_property(square).set_owner(owner)
+    assert board.all_owned()
+    assert not board.copy().all_owned()
+    board.get_property(1).set_owner(None)
+    assert not board.all_owned()
+# Outcome-only mode
+def test_outcome_matches_full_game():
+    """The outcome is that of the full game, without building any turn records."""
+    records = MemoryRecordSink()
+    game = Game("board/board.json", "rolls/rolls_1.json", PLAYERS, records=records)
+    outcome = game.play_outcome()
+    assert records.turns == []
+    assert outcome.winners == ("Peter",) and outcome.stopped == BANKRUPT
+    game = Game("board/board.json", "rolls/rolls_1.json", PLAYERS, records=NullRecordSink())
+    game.play_game()
+    assert outcome.turns == game._current_turn
+    assert list(outcome.balances) == [player.get_balance() for player in game._players]
+    assert list(outcome.positions) == [player.get_current_position() for player in game._players]
+def test_outcome_turn_cap():
+    game = Game("board/board.json", "rolls/rolls_1.json", PLAYERS, records=NullRecordSink())
+    outcome = game.play_outcome(max_turns=10)
+    assert (outcome.turns, outcome.stopped) == (10, TURN_CAP)
+    game = Game("board/board.json", None, PLAYERS, dice=ListDice([1, 2], END), records=NullRecordSink())
+    assert game.play_outcome(max_turns=10).stopped == OUT_OF_ROLLS
+@pytest.mark.parametrize("jump_ahead", [False, True])
+def test_stop_when_decided(jump_ahead):
+    """Stopping once the winner is decided never changes the winner."""
+    stopped = []
+    for seed in range(60):
+        full = Game("board/board.json", None, PLAYERS, dice=RandomDice(seed, max_rolls=80, on_exhausted=END),
+                    records=NullRecordSink(), jump_ahead=jump_ahead).play_outcome(max_turns=70)
+        early = Game("board/board.json", None, PLAYERS, dice=RandomDice(seed, max_rolls=80, on_exhausted=END),
+                     records=NullRecordSink(), jump_ahead=jump_ahead).play_outcome(max_turns=70, stop_when_decided=True)
+        assert early.winners == full.winners
+        assert early.turns <= full.turns
+        stopped.append(early.stopped)
+    assert DECIDED in stopped
+def test_stop_when_decided_needs_a_bound():
+    """Without a turn cap or a known number of rolls the game is played to the end."""
+    game = Game("board/board.json", "rolls/rolls_1.json", PLAYERS, records=NullRecordSink())
+    assert game.play_outcome(stop_when_decided=True).stopped == BANKRUPT
+    solo = Game("board/board.json", None, ["Peter"], dice=[1, 2, 3], records=NullRecordSink())
+    assert solo.play_outcome(stop_when_decided=True) == (0, ("Peter",), (16,), (0,), DECIDED)
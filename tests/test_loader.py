@@ -0,0 +1,59 @@
+from loader import Loader
+import json
+import os
+import pytest
+
+@pytest.fixture
+def rolls_file(tmp_path):
+    """A small rolls file"""
+    path = tmp_path / "rolls.json"
+    path.write_text("[1, 2, 3]")
+    return path
+def test_board_cached_but_fresh():
+    """The board file is parsed once but every load gives a board with no owners."""
+    loader = Loader()
+    board = loader.load_board("tests/test_board.json")
+    board.get_property(1).set_owner("Peter")
+    again = loader.load_board("tests/test_board.json")
+    assert again is not board
+    assert not again.get_property(1).is_owned()
+    assert len(loader._cache) == 1
+def test_dice_copy(rolls_file):
+    """Changing the loaded rolls does not change the cached rolls."""
+    loader = Loader()
+    dice = loader.load_dice(str(rolls_file))
+    dice.append(4)
+    assert loader.load_dice(str(rolls_file)) == [1, 2, 3]
+def test_reload_after_change(rolls_file):
+    """A file is parsed again once it changes."""
+    loader = Loader()
+    assert loader.load_dice(str(rolls_file)) == [1, 2, 3]
+    rolls_file.write_text("[4, 5, 6, 1]")
+    os.utime(rolls_file, ns=(0, 10**18))
+    assert loader.load_dice(str(rolls_file)) == [4, 5, 6, 1]
+def test_lru_eviction(tmp_path):
+    """Only the most recently used files are kept in memory."""
+    loader = Loader(max_entries=2)
+    for i in range(3):
+        path = tmp_path / f"rolls_{i}.json"
+        path.write_text(json.dumps([i + 1]))
+        loader.load_dice(str(path))
+    assert len(loader._cache) == 2
+def test_disk_cache(rolls_file, tmp_path, monkeypatch):
+    """A second loader reads the parsed file from the on-disk cache."""
+    cache_dir = tmp_path / "cache"
+    Loader(cache_dir=str(cache_dir)).load_dice(str(rolls_file))
+    assert len(os.listdir(cache_dir)) == 1
+    loader = Loader(cache_dir=str(cache_dir))
+    monkeypatch.setattr(loader, "_parse_dice", lambda file_name: pytest.fail("file parsed again"))
+    assert loader.load_dice(str(rolls_file)) == [1, 2, 3]
+def test_invalid_files(tmp_path):
+    """Invalid files are reported and not cached."""
+    loader = Loader()
+    board = tmp_path / "board.json"
+    board.write_text(json.dumps([{"name": "GO", "type": "go"}, {"name": "Lane", "type": "property"}]))
+    with pytest.raises(ValueError, match="Invalid property structure"):
+        loader.load_board(str(board))
+    with pytest.raises(FileNotFoundError):
+        loader.load_dice(str(tmp_path / "missing.json"))
+    assert not loader._cache
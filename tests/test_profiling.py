@@ -0,0 +1,50 @@
+from game import Game
+from actions import Actions
+from dice import RandomDice
+from records import NullRecordSink
+from profiling import Instrumentation
+import pytest
+
+PLAYERS = ["Peter", "Billy", "Charlotte", "Sweedal"]
+
+@pytest.mark.parametrize("records", [None, NullRecordSink()])
+def test_counters(tmp_path, records):
+    """Counters match the shipped rolls_1 game with or without records."""
+    with Instrumentation() as profile:
+        game = Game("board/board.json", "rolls/rolls_1.json", PLAYERS, records=records)
+        game.play_game()
+    assert profile.counters == {"turns": 27, "rents_paid": 17, "purchases": 7, "go_passes": 7,
+                                "turns_jumped_ahead": 0}
+    assert profile.timings["turns"] >= profile.timings["rent"] > 0
+    assert profile.timings["loading board"] > 0
+    assert "Rents paid: 17" in profile.summary()
+def test_results_unchanged():
+    """Instrumented games give the same result."""
+    expected = Game("board/board.json", "rolls/rolls_2.json", PLAYERS)
+    expected.play_game()
+    with Instrumentation():
+        game = Game("board/board.json", "rolls/rolls_2.json", PLAYERS)
+        game.play_game()
+    assert game.get_result() == expected.get_result()
+def test_uninstall():
+    """The original methods are back once instrumentation is removed."""
+    rent = Actions.__dict__["rent"]
+    get_board = Game.__dict__["get_board"]
+    with Instrumentation():
+        assert Actions.__dict__["rent"] is not rent
+    assert Actions.__dict__["rent"] is rent
+    assert Game.__dict__["get_board"] is get_board
+@pytest.mark.parametrize("seed", [4, 9])
+def test_jump_ahead_turns_counted(seed):
+    """Turns resolved by jumping ahead count as turns, with their rents and GO passes."""
+    counters = {}
+    for jump_ahead in (False, True):
+        with Instrumentation() as profile:
+            game = Game("board/board.json", None, PLAYERS, dice=RandomDice(seed), records=NullRecordSink(),
+                        jump_ahead=jump_ahead)
+            game.play_game()
+        assert profile.counters["turns"] == game._current_turn
+        counters[jump_ahead] = profile.counters
+    assert counters[True].pop("turns_jumped_ahead") > 0
+    assert counters[False].pop("turns_jumped_ahead") == 0
+    assert counters[True] == counters[False]
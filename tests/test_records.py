@@ -0,0 +1,114 @@
+from game import Game
+from records import MemoryRecordSink, NullRecordSink, RecordSink, TextRecordSink, render_action
+from turnlog import HEADER, MAGIC, RECORDS, BinaryRecordSink, TurnLogReader
+from actions import BUY
+from board import Board
+import json
+import pytest
+
+PLAYERS = ["Peter", "Billy", "Charlotte", "Sweedal"]
+
+def play(records):
+    """Play the shipped rolls_1 game with the given record sink"""
+    game = Game("board/board.json", "rolls/rolls_1.json", PLAYERS, records=records)
+    game.play_game()
+    game.records_turns()
+    return game
+def test_memory_records_match_shipped(tmp_path):
+    """Records kept in memory are written in the shipped format."""
+    path = tmp_path / "records.txt"
+    play(MemoryRecordSink(str(path)))
+    with open("records/records_1.txt") as file:
+        assert path.read_text() == file.read()
+@pytest.mark.parametrize("flush_interval", [1, 5, 1000])
+def test_streamed_records_match_shipped(tmp_path, flush_interval):
+    """Streamed records are the same whatever the flush interval."""
+    path = tmp_path / "records.txt"
+    play(TextRecordSink(str(path), flush_interval))
+    with open("records/records_1.txt") as file:
+        assert path.read_text() == file.read()
+def test_streamed_records_flush(tmp_path):
+    """Records are written to disk while the game is still being played."""
+    path = tmp_path / "records.txt"
+    sink = TextRecordSink(str(path), flush_interval=2)
+    game = Game("board/board.json", "rolls/rolls_1.json", PLAYERS, records=sink)
+    game._current_player = game._players[0]
+    game.play_turn(1)
+    assert "Turn " not in path.read_text()
+    game._current_player = game._players[1]
+    game.play_turn(3)
+    assert path.read_text().count("Turn ") == 2
+def test_no_records(tmp_path):
+    """Without records the game plays the same."""
+    game = play(NullRecordSink())
+    assert game.determine_winner() == ["Peter"]
+def test_sink_without_write():
+    """A sink that does not implement write cannot be created."""
+    class Incomplete(RecordSink):
+        pass
+    with pytest.raises(TypeError):
+        Incomplete()
+def test_invalid_flush_interval():
+    """The flush interval must be positive."""
+    with pytest.raises(ValueError):
+        TextRecordSink("records.txt", flush_interval=0)
+# Binary turn log
+def test_binary_log_converts_to_shipped(tmp_path):
+    """A binary turn log converts back to exactly the shipped text records."""
+    log = tmp_path / "records.bin"
+    text = tmp_path / "records.txt"
+    play(BinaryRecordSink(str(log), flush_interval=7))
+    reader = TurnLogReader(str(log))
+    reader.to_text(str(text))
+    with open("records/records_1.txt") as file:
+        assert text.read_text() == file.read()
+    assert log.stat().st_size < text.stat().st_size / 4
+    reader.close()
+def test_binary_log_slicing(tmp_path):
+    """Turns can be read by index, slice or iteration."""
+    log = tmp_path / "records.bin"
+    game = play(BinaryRecordSink(str(log)))
+    reader = TurnLogReader(str(log))
+    assert len(reader) == game._current_turn
+    turns = list(reader)
+    assert reader[0] == turns[0]
+    assert reader[-1] == turns[-1]
+    assert reader[2:5] == turns[2:5]
+    assert reader.players == PLAYERS
+    first = reader[0]
+    assert (first.seat, first.roll, first.from_square, first.to_square, first.balance) == (0, 1, 0, 1, 15)
+    assert first.flags == BUY and first.amount == 1
+    with pytest.raises(IndexError):
+        reader[len(reader)]
+    reader.close()
+def test_binary_log_large_amounts(tmp_path):
+    """Prices and balances beyond 32 bits are logged, and logs of the 32-bit version are still read."""
+    board = Board([{"name": "GO", "type": "go"},
+                   {"name": "Tower", "type": "property", "price": 3 * 2 ** 40, "colour": "Gold"}])
+    log = tmp_path / "records.bin"
+    game = Game(None, None, PLAYERS, board=board, dice=[1, 1], records=BinaryRecordSink(str(log)))
+    game.play_game()
+    game.records_turns()
+    reader = TurnLogReader(str(log))
+    assert (reader[0].amount, reader[0].balance) == (3 * 2 ** 40, 16 - 3 * 2 ** 40)
+    reader.close()
+    old = tmp_path / "old.bin"
+    metadata = json.dumps({"players": PLAYERS, "squares": ["GO", "Lot"]}).encode()
+    old.write_bytes(HEADER.pack(MAGIC, 1, len(metadata)) + metadata + RECORDS[1].pack(0, 1, 0, 1, 15, BUY, 1, -1))
+    reader = TurnLogReader(str(old))
+    assert list(reader) == [(0, 1, 0, 1, 15, BUY, 1, -1)]
+    reader.close()
+def test_binary_log_invalid(tmp_path):
+    """Files that are not turn logs are rejected."""
+    path = tmp_path / "records.txt"
+    path.write_text("Game Turns:\n")
+    with pytest.raises(ValueError):
+        TurnLogReader(str(path))
+def test_turns_render_action_on_demand(tmp_path):
+    """Turn records hold only events; the action message is built from them when asked for."""
+    game = play(MemoryRecordSink(str(tmp_path / "records.txt")))
+    turn = game._records.turns[2]
+    assert "action" not in turn
+    assert render_action(turn, PLAYERS) == ("\nCharlotte's turn! Rolling dice: 1 \n"
+                                            "Charlotte moves from 0 to 1 (The Burvale)\n"
+                                            "Charlotte pays $1 rent to Peter.")
@@ -0,0 +1,90 @@
+from game import Game
+from server import GameServer
+import asyncio
+import json
+
+PLAYERS = ["Peter", "Billy", "Charlotte", "Sweedal"]
+
+with open("board/board.json") as file:
+    BOARD = json.load(file)
+with open("rolls/rolls_1.json") as file:
+    ROLLS = json.load(file)
+
+def expected_result():
+    game = Game("board/board.json", "rolls/rolls_1.json", PLAYERS)
+    game.play_game()
+    return game.get_result()
+async def exchange(server, requests, answers):
+    """Sends requests to the server and reads the given number of answer lines."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+    for request in requests:
+        writer.write(json.dumps(request).encode() + b"\n")
+    await writer.drain()
+    lines = [json.loads(await reader.readline()) for _ in range(answers)]
+    writer.close()
+    await writer.wait_closed()
+    return lines
+def serve(test, **settings):
+    """Runs a test coroutine against a server on a free port."""
+    async def main():
+        server = GameServer(port=0, **settings)
+        await server.start()
+        try:
+            return await test(server)
+        finally:
+            await server.close()
+    return asyncio.run(main())
+def test_result():
+    """A game played by the server has the same result as a local game."""
+    answers = serve(lambda server: exchange(server, [{"id": 7, "board": BOARD, "rolls": ROLLS}], 1))
+    assert answers == [{"id": 7, "type": "result", **expected_result()}]
+def test_stream_turns():
+    """Every turn is streamed, in order, before the result."""
+    request = {"id": "a", "board": BOARD, "rolls": ROLLS, "stream": True, "describe": True}
+    result = expected_result()
+    answers = serve(lambda server: exchange(server, [request], result["turns"] + 1))
+    assert [answer["type"] for answer in answers] == ["turn"] * result["turns"] + ["result"]
+    assert [answer["turn"] for answer in answers[:-1]] == list(range(result["turns"]))
+    assert answers[0]["player"] == "Peter" and "Peter's turn!" in answers[0]["action"]
+    assert answers[-1]["winners"] == result["winners"]
+def test_many_requests_with_backpressure():
+    """More requests than pending slots are all answered, each under its own id."""
+    requests = [{"id": i, "board": BOARD, "seed": i, "players": ["A", "B", "C"], "max_rolls": 1000,
+                 "on_exhausted": "end", "stream": i % 2 == 0} for i in range(12)]
+    async def collect(server):
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        for request in requests:
+            writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        results = {}
+        while len(results) < len(requests):
+            answer = json.loads(await reader.readline())
+            if answer["type"] == "result":
+                results[answer["id"]] = answer
+        writer.close()
+        await writer.wait_closed()
+        return results
+    results = serve(collect, workers=2, max_pending=1, stream_buffer=4)
+    assert sorted(results) == list(range(12))
+    assert all(result["players"][0]["name"] == "A" for result in results.values())
+def test_errors():
+    requests = [{"id": 1, "board": [], "rolls": ROLLS}, {"id": 2, "board": BOARD}, {"id": 3, "board": BOARD, "rolls": [1]},
+                {"id": 4, "board": BOARD, "rolls": [1], "on_exhausted": "wrap"}]
+    answers = serve(lambda server: exchange(server, requests, 4))
+    errors = {answer["id"]: answer for answer in answers}
+    assert all(answer["type"] == "error" for answer in answers)
+    assert "Board data is invalid." in errors[1]["error"]
+    assert "seed" in errors[2]["error"]
+    assert "ran out" in errors[3]["error"]
+def test_client_disconnects_while_streaming():
+    """A client leaving mid-stream does not stall the server."""
+    async def test(server):
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        request = {"board": BOARD, "seed": 1, "max_rolls": 100000, "on_exhausted": "end", "stream": True}
+        writer.write(json.dumps(request).encode() + b"\n")
+        await reader.readline()
+        writer.close()
+        await writer.wait_closed()
+        return await exchange(server, [{"id": 2, "board": BOARD, "rolls": ROLLS}], 1)
+    answers = serve(test, workers=1, max_pending=1, stream_buffer=2)
+    assert answers[0]["type"] == "result"
@@ -0,0 +1,65 @@
+from game import Game
+from dice import ListDice, RandomDice
+import json
+import pytest
+
+PLAYERS = ["Peter", "Billy", "Charlotte", "Sweedal"]
+
+def play_turns(game, count):
+    """Play the first count turns of a game"""
+    game._current_player = game._players[0]
+    game._current_turn = 0
+    for _ in range(count):
+        game.play_turn(game._dice[game._current_turn])
+        game._current_turn += 1
+        game._current_player = game._players[game._current_turn % len(game._players)]
+@pytest.fixture
+def finished():
+    """The shipped rolls_1 game played to the end"""
+    game = Game("board/board.json", "rolls/rolls_1.json", PLAYERS)
+    game.play_game()
+    return game.get_result()
+def test_snapshot_resume(finished):
+    """A game restored from a saved snapshot finishes exactly like the original."""
+    game = Game("board/board.json", "rolls/rolls_1.json", PLAYERS)
+    play_turns(game, 10)
+    saved = json.loads(json.dumps(game.snapshot()))
+    assert saved["turn"] == 10 and saved["dice_position"] == 10
+    resumed = Game.from_snapshot(Game.get_board("board/board.json"), saved, Game.get_dice("rolls/rolls_1.json"))
+    resumed.resume_game()
+    assert resumed.get_result() == finished
+def test_fork_same_rolls(finished):
+    """A fork continuing the same rolls finishes like the original, and leaves it untouched."""
+    game = Game("board/board.json", "rolls/rolls_1.json", PLAYERS)
+    play_turns(game, 12)
+    before = game.snapshot()
+    fork = game.fork()
+    fork.resume_game()
+    assert fork.get_result() == finished
+    assert game.snapshot() == before
+    game.resume_game()
+    assert game.get_result() == finished
+def test_fork_new_rolls():
+    """A fork with new rolls plays like the shared prefix followed by the new rolls."""
+    with open("rolls/rolls_1.json") as file:
+        prefix = json.load(file)[:8]
+    game = Game("board/board.json", None, PLAYERS, dice=prefix)
+    play_turns(game, 8)
+    continuation = RandomDice(3, max_rolls=2000).to_list()
+    fork = game.fork(dice=ListDice(continuation))
+    fork.resume_game()
+    whole = Game("board/board.json", None, PLAYERS, dice=prefix + continuation)
+    whole.play_game()
+    assert fork.get_result() == whole.get_result()
+    assert fork._board.has_monopoly(fork._players[0], "Brown") == whole._board.has_monopoly(whole._players[0], "Brown")
+def test_fork_dice_source_needs_dice():
+    """A game reading from a dice source cannot share it with a fork."""
+    game = Game("board/board.json", None, PLAYERS, dice=RandomDice(1))
+    with pytest.raises(ValueError):
+        game.fork()
+def test_restore_wrong_players():
+    """Snapshots only fit games with the same number of players."""
+    game = Game("board/board.json", "rolls/rolls_1.json", PLAYERS)
+    small = Game("board/board.json", "rolls/rolls_1.json", PLAYERS[:2])
+    with pytest.raises(ValueError):
+        small.restore(game.snapshot())
@@ -0,0 +1,67 @@
+from board import Board
+from compact import build_tables
+from game import Game
+from dice import ListDice
+from state import StateActions
+import pytest
+
+PLAYERS = ["Peter", "Billy", "Charlotte", "Sweedal"]
+
+@pytest.fixture
+def game():
+    """Game on the shipped board and rolls"""
+    return Game("board/board.json", "rolls/rolls_1.json", PLAYERS)
+def test_slots():
+    """Game objects have no per-instance dictionary."""
+    game = Game("tests/test_board.json", "tests/test_rolls.json", PLAYERS)
+    for obj in (game._players[0], game._board, game._board.get_property(1), game._ledger):
+        assert not hasattr(obj, "__dict__")
+@pytest.mark.parametrize("rolls_file", ["rolls/rolls_1.json", "rolls/rolls_2.json"])
+def test_state_game_matches_objects(rolls_file):
+    """Playing on the array state gives the same result as playing with objects."""
+    game = Game("board/board.json", rolls_file, PLAYERS)
+    actions = StateActions(game._board)
+    state = actions.new_state(len(PLAYERS))
+    actions.play_game(state, ListDice(game._dice))
+    game.play_game()
+    assert state.turn == game._current_turn
+    assert list(state.balances) == [player.get_balance() for player in game._players]
+    assert list(state.positions) == [player.get_current_position() for player in game._players]
+def test_state_round_trip(game):
+    """A state captured from a game and applied to a fresh game reproduces it."""
+    for steps in game._dice[:10]:
+        game._current_player = game._players[game._current_turn % len(PLAYERS)]
+        game.play_turn(steps)
+        game._current_turn += 1
+    actions = StateActions(game._board)
+    state = actions.state_from_game(game)
+    fresh = Game("board/board.json", "rolls/rolls_1.json", PLAYERS)
+    actions.apply_to_game(state, fresh)
+    assert [p.get_balance() for p in fresh._players] == [p.get_balance() for p in game._players]
+    assert [[q.name for q in p._owned_properties] for p in fresh._players] == \
+        [[q.name for q in p._owned_properties] for p in game._players]
+    assert fresh._board.has_monopoly(fresh._players[0], "Brown") == game._board.has_monopoly(game._players[0], "Brown")
+    assert fresh._current_turn == 10
+def test_snapshot_restore(game):
+    """A copy is independent of the state it was taken from and can be restored."""
+    actions = StateActions(game._board)
+    state = actions.new_state(len(PLAYERS))
+    actions.play_turn(state, 0, 1)
+    snapshot = state.copy()
+    actions.play_turn(state, 1, 1)
+    assert state.balances[1] != snapshot.balances[1]
+    state.restore(snapshot)
+    assert list(state.balances) == list(snapshot.balances)
+    assert state.turn == 1
+    assert state.owners[1] == 0
+def test_large_colour_set():
+    """A seat can own more squares of one colour than fit in 16 bits."""
+    board = Board.from_tables(build_tables({"segments": [{"name": "GO", "type": "go"},
+                                                         {"generate": 40000, "group_size": 40000, "price": 1}]}))
+    actions = StateActions(board)
+    state = actions.new_state(2)
+    for square in range(1, 40001):
+        actions.buy_property(state, 0, square)
+    assert state.colour_counts[0] == 40000
+    assert actions.rent(state, 1, 1) == 2
+    assert state.copy().colour_counts[0] == 40000
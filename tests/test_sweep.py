@@ -0,0 +1,95 @@
+from batch import BatchRunner
+from dice import random_roll_sequences
+from sweep import SweepRunner, add_completed, pending_ranges, write_atomic
+import json
+import os
+import pytest
+
+PLAYERS = ["Peter", "Billy", "Charlotte", "Sweedal"]
+DICE = {"max_rolls": 500, "on_exhausted": "end"}
+
+def sweep(tmp_path, games=50, every=7, **settings):
+    """Sweep of seeded games on the shipped board, checkpointed in tmp_path"""
+    return SweepRunner("board/board.json", PLAYERS, 5, games, str(tmp_path / "sweep.json"), every,
+                       output_file_name=str(tmp_path / "results.jsonl"), dice_settings=DICE, **settings)
+def finish(tmp_path, aggregator):
+    """The result rows and summary of a finished sweep"""
+    aggregator.write(str(tmp_path / "summary.json"))
+    return (tmp_path / "results.jsonl").read_bytes(), (tmp_path / "summary.json").read_bytes()
+@pytest.fixture
+def uninterrupted(tmp_path_factory):
+    path = tmp_path_factory.mktemp("whole")
+    return finish(path, sweep(path).run())
+def test_ranges():
+    """Completed ranges are kept joined up, and the rest of the sweep is pending."""
+    completed = []
+    for game in (3, 0, 1, 5, 4, 2):
+        add_completed(completed, game)
+    assert completed == [[0, 6]]
+    completed = [[0, 2], [5, 6]]
+    add_completed(completed, 4)
+    assert completed == [[0, 2], [4, 6]]
+    assert pending_ranges(completed, 10) == [[2, 4], [6, 10]]
+    assert pending_ranges([[0, 10]], 10) == []
+def test_same_rows_as_batch(tmp_path, uninterrupted):
+    """A sweep writes the same result rows as the batch runner."""
+    rows = [json.loads(line) for line in uninterrupted[0].decode().splitlines()]
+    runner = BatchRunner("board/board.json", PLAYERS)
+    assert rows == list(runner.run(random_roll_sequences(5, 50, **DICE)))
+def test_resume_in_steps(tmp_path, uninterrupted):
+    """A sweep played a few games at a time ends with the same rows and summary."""
+    for _ in range(4):
+        aggregator = sweep(tmp_path).run(max_games=13)
+    assert aggregator.games == 50
+    assert finish(tmp_path, aggregator) == uninterrupted
+    checkpoint = json.loads((tmp_path / "sweep.json").read_text())
+    assert checkpoint["completed"] == [[0, 50]]
+    assert checkpoint["dice"] == {"seed": 5, "next_game": 50}
+def test_resume_after_crash(tmp_path, uninterrupted, monkeypatch):
+    """Games played after the last checkpoint before a crash are played again, and their rows written once."""
+    run_game = BatchRunner.run_game
+    played = []
+    def crash(runner, dice):
+        if len(played) == 24:
+            raise RuntimeError("crash")
+        played.append(dice)
+        return run_game(runner, dice)
+    monkeypatch.setattr(BatchRunner, "run_game", crash)
+    with pytest.raises(RuntimeError):
+        sweep(tmp_path).run()
+    checkpoint = json.loads((tmp_path / "sweep.json").read_text())
+    assert checkpoint["completed"] == [[0, 21]]
+    # Rows of games 21 to 23 were written but not checkpointed
+    assert os.path.getsize(tmp_path / "results.jsonl") > checkpoint["output_offset"]
+    monkeypatch.setattr(BatchRunner, "run_game", run_game)
+    assert finish(tmp_path, sweep(tmp_path).run()) == uninterrupted
+def test_finished_sweep_is_skipped_or_extended(tmp_path, uninterrupted, monkeypatch):
+    """A finished sweep plays nothing when run again, and only the new games when extended."""
+    sweep(tmp_path, games=30).run()
+    extended = sweep(tmp_path).run()
+    monkeypatch.setattr(BatchRunner, "run_game", None)
+    assert finish(tmp_path, sweep(tmp_path).run()) == uninterrupted
+    assert extended.games == 50
+def test_parallel_sweep(tmp_path, uninterrupted):
+    sweep(tmp_path, workers=2, chunk_size=4).run(max_games=20)
+    assert finish(tmp_path, sweep(tmp_path, workers=2, chunk_size=4).run()) == uninterrupted
+def test_checkpoint_of_another_sweep(tmp_path):
+    sweep(tmp_path, games=10).run()
+    with pytest.raises(ValueError, match="other settings"):
+        SweepRunner("board/board.json", PLAYERS, 6, 10, str(tmp_path / "sweep.json"),
+                    output_file_name=str(tmp_path / "results.jsonl"), dice_settings=DICE).run()
+    with pytest.raises(ValueError, match="more than"):
+        sweep(tmp_path, games=5).run()
+    (tmp_path / "results.jsonl").write_text("")
+    with pytest.raises(ValueError, match="shorter"):
+        sweep(tmp_path, games=20).run()
+def test_write_atomic(tmp_path, monkeypatch):
+    """A failed replacement leaves the previous file as it was."""
+    path = tmp_path / "checkpoint.json"
+    write_atomic(str(path), "old")
+    def fail(source, destination):
+        raise OSError("disk full")
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError):
+        write_atomic(str(path), "new")
+    assert path.read_text() == "old"
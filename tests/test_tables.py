@@ -0,0 +1,75 @@
+from game import Game
+from array import array
+from tables import GO, BoardTables, _find_all
+import pickle
+import pytest
+
+PLAYERS = ["Peter", "Billy", "Charlotte", "Sweedal"]
+
+@pytest.fixture
+def game():
+    """Game on the shipped board"""
+    return Game("board/board.json", "rolls/rolls_1.json", PLAYERS)
+def test_tables_layout(game):
+    tables = game._board._tables
+    assert tables.names[0] == "GO" and tables.names[-1] == "Massizim"
+    assert tables.types[0] == GO and all(code != GO for code in tables.types[1:])
+    assert list(tables.prices) == [0, 1, 1, 2, 2, 3, 3, 4, 4]
+    assert list(tables.rents) == list(tables.prices)
+    assert tables.colours[0] == -1
+    assert [tables.colour_names[colour] for colour in tables.colours[1:3]] == ["Brown", "Brown"]
+    assert list(tables.colour_sizes) == [2] * 4
+    assert tables.unowned == 8
+def test_properties_are_views(game):
+    """Property objects read and write the tables."""
+    board = game._board
+    tables = board._tables
+    player = game._players[0]
+    square = board.get_property(3)
+    assert (square.name, square.type, square.get_price(), square.get_rent(), square.get_colour()) == \
+        ("The Grand Tofu", "property", 2, 2, "Red")
+    assert board.get_property(0).get_price() is None and board.get_property(0).get_colour() is None
+    square.set_owner(player)
+    assert tables.owner_objects[tables.owners[3]] is player
+    assert square.get_owner() is player and square.is_owned()
+    tables.set_owner(3, None)
+    assert not square.is_owned()
+    assert tables.unowned == 8
+def test_rent_due(game):
+    """Rent doubles once the owner holds the whole colour set."""
+    board = game._board
+    tables = board._tables
+    owner = game._players[1]
+    assert tables.rent_due(1) == (0, -1)
+    board.get_property(1).set_owner(owner)
+    assert tables.rent_due(1) == (1, tables.owner_id(owner))
+    board.get_property(2).set_owner(owner)
+    assert tables.rent_due(1) == (2, tables.owner_id(owner))
+    assert board.has_monopoly(owner, "Brown")
+    assert not board.has_monopoly(game._players[2], "Brown")
+    assert tables.owner_id(game._players[2], create=False) == -1
+def test_copy_shares_layout(game):
+    board = game._board
+    board.get_property(1).set_owner(game._players[0])
+    copy = board.copy()
+    assert copy._tables.prices is board._tables.prices
+    assert copy._tables.owners is not board._tables.owners
+    assert not copy.get_property(1).is_owned()
+    assert copy.get_property(1)._board is copy
+def test_pickle(game):
+    """Boards can be sent to worker processes with their tables."""
+    game._board.get_property(4).set_owner("Peter")
+    board = pickle.loads(pickle.dumps(game._board))
+    assert board.get_property(4).get_owner() == "Peter"
+    assert board.get_property(4).name == "Lanzhou Beef Noodle"
+def test_unknown_types_are_properties():
+    tables = BoardTables([{"name": "GO", "type": "go"},
+                          {"name": "Station", "type": "station", "price": 2, "colour": "Black"}])
+    assert tables.type_names[tables.types[1]] == "station"
+    assert tables.unowned == 1
+def test_find_all():
+    """Values are found on item boundaries only, and the search stops at the given count."""
+    column = array("i", [0x01000000, 0, 256, 7, 256])
+    assert _find_all(column, 256, 2) == [2, 4]
+    assert _find_all(column, 256, 1) == [2]
+    assert _find_all(column, 5, 1) == []
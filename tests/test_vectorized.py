@@ -0,0 +1,52 @@
+from batch import BatchRunner, read_roll_sequences
+from dice import random_roll_sequences
+import random
+import tracemalloc
+import pytest
+
+np = pytest.importorskip("numpy")
+from vectorized import VectorizedRunner
+
+PLAYERS = ["Peter", "Billy", "Charlotte", "Sweedal"]
+
+def test_vectorized_matches_shipped_rolls():
+    """The vectorized kernel gives the same results as the object engine on the shipped rolls."""
+    sequences = list(read_roll_sequences("rolls"))
+    expected = list(BatchRunner("board/board.json", PLAYERS).run(sequences))
+    assert list(VectorizedRunner("board/board.json", PLAYERS).run(sequences)) == expected
+def test_vectorized_matches_random_rolls():
+    """Games of different lengths in one block stop independently."""
+    rng = random.Random(7)
+    sequences = [(str(i), [rng.randint(1, 6) for _ in range(5000)]) for i in range(200)]
+    expected = list(BatchRunner("board/board.json", PLAYERS).run(sequences))
+    assert list(VectorizedRunner("board/board.json", PLAYERS, block_size=64).run(sequences)) == expected
+def test_vectorized_invalid_roll():
+    """Non-positive rolls are rejected like in the object engine."""
+    runner = VectorizedRunner("board/board.json", PLAYERS)
+    with pytest.raises(ValueError):
+        runner.play_block([[1, 0, 2]])
+@pytest.mark.parametrize("window", [1, 7, 256])
+def test_vectorized_roll_windows(window):
+    """Rolls read a window at a time, from lists or dice sources, give the same results."""
+    settings = {"max_rolls": 3000, "on_exhausted": "error"}
+    expected = list(BatchRunner("board/board.json", PLAYERS).run(random_roll_sequences(2, 50, **settings)))
+    runner = VectorizedRunner("board/board.json", PLAYERS, block_size=16, window=window)
+    assert list(runner.run(random_roll_sequences(2, 50, **settings))) == expected
+    # Seeded dice without a maximum number of rolls are read only as far as each game goes
+    unlimited = list(BatchRunner("board/board.json", PLAYERS).run(random_roll_sequences(2, 50)))
+    assert list(runner.run(random_roll_sequences(2, 50))) == unlimited
+def test_vectorized_block_memory():
+    """The memory of a block does not grow with the number of rolls each game could use."""
+    runner = VectorizedRunner("board/board.json", PLAYERS, block_size=64)
+    tracemalloc.start()
+    try:
+        # Whole tapes of these rolls would take over 50 MB
+        list(runner.run(random_roll_sequences(3, 64, max_rolls=100000, on_exhausted="error")))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 5_000_000
+def test_vectorized_runs_out_of_rolls():
+    runner = VectorizedRunner("board/board.json", PLAYERS, window=2)
+    with pytest.raises(IndexError, match="ran out"):
+        runner.play_block([[1, 2, 3]])